@@ -0,0 +1,214 @@
+import os
+import sys
+import json
+import time
+import socket
+import random
+import argparse
+import tempfile
+import requests
+from concurrent.futures import Future, wait
+from eth_utils import keccak
+from loguru import logger as logging
+from requests.adapters import HTTPAdapter
+
+import config
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Офлайн бенчмарк на локальном JSON-RPC и фейковых Odos/1inch')
+    parser.add_argument('--wallets', type=int, default=3)
+    parser.add_argument('--transactions', type=int, default=5, help='транзакций на кошелек в прогонах раннера')
+    parser.add_argument('--rounds', type=int, default=2, help='кругов eth -> usdc -> eth на кошелек для каждого DEX')
+    parser.add_argument('--rpc-latency', type=float, default=0, help='задержка RPC в мс')
+    parser.add_argument('--rpc-endpoints', type=int, default=1, help='кол-во локальных RPC с общим состоянием цепи')
+    parser.add_argument('--rpc-slow', type=float, default=0, help='дополнительная задержка первого RPC в мс')
+    parser.add_argument('--rpc-failures', type=float, default=0, help='доля ответов 503 от первого RPC')
+    parser.add_argument('--hedge-delay', type=float, default=config.RPC_HEDGE_DELAY * 1000, help='RPC_HEDGE_DELAY в мс')
+    parser.add_argument('--api-latency', type=float, default=0, help='задержка API Odos/1inch в мс')
+    parser.add_argument('--block-time', type=float, default=0.05, help='время блока в секундах')
+    parser.add_argument('--deposit-blocks', type=int, default=20, help='через сколько блоков исполняется депозит из моста')
+    parser.add_argument('--approve-headroom', type=float, default=config.APPROVE_HEADROOM, help='APPROVE_HEADROOM')
+    parser.add_argument('--pipeline-approve', action='store_true', help='PIPELINE_APPROVE = True')
+    parser.add_argument('--balance-indexer', action='store_true', help='запустить индекс балансов по eth_getLogs')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--phases', default='base_runner,volumes_runner,odos,inch,woofi,spacefi,syncswap',
+                        help='через запятую, также доступен bridge (мост и прогрев всех кошельков в планировщике)')
+    parser.add_argument('--json', help='сохранить результаты в JSON файл')
+    parser.add_argument('--verbose', action='store_true')
+    return parser.parse_args()
+
+
+args = parse_args()
+rpc_urls = [f'http://127.0.0.1:{free_port()}' for _ in range(args.rpc_endpoints)]
+
+config.RPC = config.ETHEREUM_RPC = rpc_urls
+config.RPC_HEDGE_DELAY = args.hedge_delay / 1000
+config.APPROVE_HEADROOM = args.approve_headroom
+config.PIPELINE_APPROVE = args.pipeline_approve or config.PIPELINE_APPROVE
+config.SLEEP_TRANSACTIONS = [0, 0]
+config.SLEEP_WALLETS = [0, 0]
+config.RECEIPT_POLL_INTERVAL = args.block_time / 2
+config.DEPOSIT_POLL_INTERVAL = args.block_time
+config.INDEXER_POLL_INTERVAL = args.block_time
+config.RPC_METRICS_PATH = ''
+config.PLAN_SEED = args.seed
+
+from benchmark.metrics import metrics
+from benchmark import fake_chain, fake_api
+from src import store
+from src.api import api_client
+from src.pools import pool_cache
+from src.indexer import balance_indexer
+from src.plan import fleet_plan
+from src.runner import Runner
+from src.scheduler import Scheduler
+from src.account import Account
+from src.providers import get_web3, endpoint_stats
+from src.rpc_metrics import rpc_stats, rpc_tags, tag_steps
+
+
+class Redirect(HTTPAdapter):
+    def __init__(self, prefix: str, target: str):
+        super().__init__()
+        self.prefix = prefix
+        self.target = target
+
+    def send(self, request, **kwargs):
+        request.url = self.target + request.url[len(self.prefix):]
+        return super().send(request, **kwargs)
+
+
+def timed_send(send):
+    def wrapper(session, request, **kwargs):
+        started = time.perf_counter()
+        try:
+            return send(session, request, **kwargs)
+        finally:
+            metrics.latency('rpc' if request.url.startswith(tuple(rpc_urls)) else 'api', time.perf_counter() - started)
+    return wrapper
+
+
+def counted(swap):
+    def wrapper(*swap_args, **swap_kwargs):
+        started = time.perf_counter()
+        status = yield from swap(*swap_args, **swap_kwargs)
+        metrics.swap(time.perf_counter() - started, bool(status))
+        return status
+    return wrapper
+
+
+def skipped(steps):
+    for delay in steps:
+        if not isinstance(delay, Future):
+            metrics.sleep(delay)
+            delay = 0
+        yield delay
+
+
+def play(steps):
+    for delay in skipped(steps):
+        if isinstance(delay, Future):
+            wait([delay])
+
+
+def create_db(accounts: list[Account], volumes: bool, bridge: bool = False) -> dict:
+    db = {
+        account.address: {
+            'bridge': bridge, 'volumes': volumes, 'transactions': args.transactions,
+            'spacefi_deposit': 1, 'syncswap_deposit': 1
+        }
+        for account in accounts
+    }
+    store.get_store().replace(db)
+    fleet_plan.compile(db, args.seed)
+    return db
+
+
+def run_runner(accounts: list[Account], volumes: bool):
+    db = create_db(accounts, volumes)
+    for account in accounts:
+        account.init_db(db)
+        runner = Runner(account)
+        for dapp in runner.dapps.values():
+            dapp.swap = counted(dapp.swap)
+        play(tag_steps(runner.steps(), wallet=account.address))
+
+
+def run_bridge(accounts: list[Account]):
+    db = create_db(accounts, False, True)
+    scheduler = Scheduler(workers=len(accounts))
+    for account in accounts:
+        account.init_db(db)
+        runner = Runner(account)
+        for dapp in runner.dapps.values():
+            dapp.swap = counted(dapp.swap)
+        scheduler.add(account.address, skipped(tag_steps(runner.steps(), wallet=account.address)))
+    scheduler.run()
+
+
+def run_adapter(accounts: list[Account], name: str):
+    create_db(accounts, False)
+    amounts = {'eth': 10 ** 15, 'usdc': 2 * 10 ** 6}
+    for account in accounts:
+        dapp = Runner(account).dapps[name]
+        swap = counted(dapp.swap)
+        with rpc_tags(wallet=account.address):
+            for _ in range(args.rounds):
+                play(swap('eth', 'usdc', amounts['eth']))
+                play(swap('usdc', 'eth', amounts['usdc']))
+
+
+def main():
+    logging.remove()
+    logging.add(sys.stderr, level='INFO' if args.verbose else 'WARNING',
+                format="<white>{time:HH:mm:ss}</white> | <level>{level: <2}</level> | <level>{message}</level>")
+
+    chain = fake_chain.FakeChain(args.block_time, args.deposit_blocks)
+    for i, rpc_url in enumerate(rpc_urls):
+        latency = (args.rpc_latency + (args.rpc_slow if i == 0 else 0)) / 1000
+        fake_chain.serve(chain, latency, int(rpc_url.rsplit(':', 1)[1]), args.rpc_failures if i == 0 else 0)
+    api_server = fake_api.serve(fake_api.FakeApi(), args.api_latency / 1000)
+    api_url = f'http://127.0.0.1:{api_server.server_port}'
+
+    workdir = tempfile.mkdtemp(prefix='zksync-bench-')
+    store._store = store.ProgressStore(os.path.join(workdir, 'progress.db'), os.path.join(workdir, 'db.json'))
+
+    for prefix in ['https://api.odos.xyz', 'https://api-defillama.1inch.io']:
+        api_client.session.mount(prefix, Redirect(prefix, api_url))
+    requests.Session.send = timed_send(requests.Session.send)
+
+    accounts = [Account('0x' + keccak(f'benchmark-{i}'.encode()).hex()) for i in range(args.wallets)]
+    metrics.run('warmup', lambda: pool_cache.warm(get_web3()))
+    if args.balance_indexer:
+        metrics.run('indexer', lambda: balance_indexer.start(get_web3(), [account.address for account in accounts]))
+
+    for phase in args.phases.split(','):
+        random.seed(args.seed)
+        if phase == 'base_runner':
+            metrics.run(phase, lambda: run_runner(accounts, False))
+        elif phase == 'bridge':
+            metrics.run(phase, lambda: run_bridge(accounts))
+        elif phase == 'volumes_runner':
+            metrics.run(phase, lambda: run_runner(accounts, True))
+        else:
+            metrics.run(f'swap:{phase}', lambda: run_adapter(accounts, phase))
+
+    balance_indexer.stop()
+    print(metrics.report())
+    print('\n'.join(rpc_stats.summary()))
+    for row in endpoint_stats():
+        print(f'{row["endpoint"]}: {row["requests"]} запросов, {row["errors"]} ошибок, {row["latency"] * 1000:.1f} мс')
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(metrics.snapshot(), file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+import json
+import time
+import uuid
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from benchmark.metrics import metrics
+from benchmark.fake_chain import CHAIN_ID, GAS_PRICE, DECIMALS, PRICES, symbol_of, units
+from config import ODOS_ROUTER_ADDRESS, INCH_ROUTER_ADDRESS
+
+ODOS_GAS = 450000
+INCH_GAS = 400000
+
+
+def convert(from_token: str, to_token: str, amount: int) -> int:
+    from_symbol, to_symbol = symbol_of(from_token), symbol_of(to_token)
+    usd = amount / 10 ** DECIMALS[from_symbol] * PRICES[from_symbol] * 0.998
+    return units(to_symbol, usd)
+
+
+class FakeApi:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.paths = dict()
+
+    def odos_quote(self, body: dict) -> dict:
+        token_in, token_out = body['inputTokens'][0], body['outputTokens'][0]
+        amount_out = convert(token_in['tokenAddress'], token_out['tokenAddress'], int(token_in['amount']))
+        path_id = uuid.uuid4().hex
+        with self.lock:
+            self.paths[path_id] = (body['userAddr'], token_in['tokenAddress'], int(token_in['amount']), amount_out)
+        return {'pathId': path_id, 'outAmounts': [str(amount_out)], 'gasEstimate': ODOS_GAS, 'blockNumber': 1}
+
+    def odos_assemble(self, body: dict) -> dict:
+        with self.lock:
+            user, token_in, amount, amount_out = self.paths.pop(body['pathId'])
+        return {
+            'outputTokens': [{'amount': str(amount_out)}],
+            'transaction': {
+                'from': user, 'to': ODOS_ROUTER_ADDRESS, 'data': '0x83bd37f9' + '00' * 64, 'gas': ODOS_GAS,
+                'gasPrice': GAS_PRICE, 'value': str(amount if symbol_of(token_in) == 'eth' else 0), 'nonce': 0,
+                'chainId': CHAIN_ID
+            }
+        }
+
+    def inch(self, path: str, query: dict) -> dict:
+        amount = int(query['amount'])
+        amount_out = convert(query['fromTokenAddress'], query['toTokenAddress'], amount)
+        response = {'toTokenAmount': str(amount_out), 'estimatedGas': INCH_GAS}
+        if path.endswith('/swap'):
+            response['tx'] = {
+                'from': query['fromAddress'], 'to': INCH_ROUTER_ADDRESS, 'data': '0x12aa3caf' + '00' * 64,
+                'value': str(amount if symbol_of(query['fromTokenAddress']) == 'eth' else 0), 'gas': INCH_GAS,
+                'gasPrice': str(GAS_PRICE)
+            }
+        return response
+
+    def handle(self, method: str, url: str, body: dict):
+        parsed = urlparse(url)
+        query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+
+        if parsed.path.startswith('/pricing/token/'):
+            return {'price': 1 / PRICES['eth']}
+        if parsed.path == '/sor/quote/v2' and method == 'POST':
+            return self.odos_quote(body)
+        if parsed.path == '/sor/assemble' and method == 'POST':
+            return self.odos_assemble(body)
+        if parsed.path.startswith('/v5.0/'):
+            return self.inch(parsed.path, query)
+
+
+def serve(api: FakeApi, latency: float = 0) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def respond(self, method: str):
+            body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            if latency:
+                time.sleep(latency)
+
+            try:
+                response = api.handle(method, self.path, json.loads(body) if body else None)
+            except Exception:
+                response = None
+
+            data = json.dumps(response if response is not None else {'error': 'bad request'}).encode()
+            metrics.http('api', len(body) + len(self.path), len(data), [])
+            self.send_response(200 if response is not None else 400)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self.respond('GET')
+
+        def do_POST(self):
+            self.respond('POST')
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
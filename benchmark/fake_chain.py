@@ -0,0 +1,356 @@
+import json
+import time
+import rlp
+import random
+import threading
+from web3 import Web3
+from eth_abi import encode, decode
+from eth_utils import keccak, function_signature_to_4byte_selector, to_checksum_address
+from eth_account import Account as EvmAccount
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from benchmark.metrics import metrics
+from src.quotes import classic_amount_out, stable_amount_out, spacefi_amount_out
+from src.deposits import NEW_PRIORITY_REQUEST
+from src.state import L2_ETH_TOKEN, TRANSFER, MINT
+from config import TOKENS, SYNCSWAP_STABLE_POOL_FACTORY_ADDRESS, OFFICIAL_BRIDGE
+
+CHAIN_ID = 324
+GAS_PRICE = 250000000
+GAS_ESTIMATE = 580000
+ETH_BALANCE = 5 * 10 ** 16
+NATIVE = '0xeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeee'
+SPACEFI_FACTORY = '0x0700fb51560cfc8f896b2c812499d17c5b0bf6a7'
+BOOTLOADER = '0x0000000000000000000000000000000000008001'
+
+DECIMALS = {'eth': 18, 'usdc': 6, 'usdt': 6, 'busd': 18}
+PRICES = {'eth': 1800, 'usdc': 1, 'usdt': 1, 'busd': 1}
+BALANCES = {'eth': 0, 'usdc': 150, 'usdt': 80, 'busd': 60}
+LIQUIDITY = 2_000_000
+
+
+APPROVE = function_signature_to_4byte_selector('approve(address,uint256)')
+REQUEST_L2_TRANSACTION = function_signature_to_4byte_selector(
+    'requestL2Transaction(address,uint256,bytes,uint256,uint256,bytes[],address)'
+)
+
+
+def decode_transaction(raw: bytes) -> dict:
+    if raw[0] >= 0x80:
+        fields, to = rlp.decode(raw), 3
+    else:
+        fields, to = rlp.decode(raw[1:]), {1: 4, 2: 5}[raw[0]]
+    return {'to': fields[to], 'data': fields[to + 2]}
+
+
+def symbol_of(address: str) -> str:
+    address = address.lower()
+    if address in (NATIVE, TOKENS['zero_address']):
+        return 'eth'
+    for symbol, token in TOKENS.items():
+        if token.lower() == address:
+            return symbol
+
+
+def units(symbol: str, usd: float) -> int:
+    return int(usd / PRICES[symbol] * 10 ** DECIMALS[symbol])
+
+
+def derive_address(*parts: str) -> str:
+    return to_checksum_address(keccak(''.join(parts).lower().encode())[-20:])
+
+
+class FakeChain:
+    def __init__(self, block_time: float = 0.05, deposit_blocks: int = 20):
+        self.block_time = block_time
+        self.deposit_blocks = deposit_blocks
+        self.started = time.monotonic()
+        self.lock = threading.Lock()
+        self.pools = dict()
+        self.transactions = dict()
+        self.allowances = dict()
+        self.handlers = {
+            function_signature_to_4byte_selector(signature): (argument_types(signature), handler)
+            for signature, handler in [
+                ('aggregate3((address,bool,bytes)[])', self.aggregate3),
+                ('getEthBalance(address)', lambda to, args: encode(['uint256'], [ETH_BALANCE])),
+                ('getBlockNumber()', lambda to, args: encode(['uint256'], [self.block_number()])),
+                ('balanceOf(address)', self.balance_of),
+                ('decimals()', lambda to, args: encode(['uint8'], [DECIMALS[symbol_of(to)]])),
+                ('allowance(address,address)', self.allowance),
+                ('getPool(address,address)', self.get_pool),
+                ('getPair(address,address)', self.get_pair),
+                ('factory()', lambda to, args: encode(['address'], [SPACEFI_FACTORY])),
+                ('token0()', lambda to, args: encode(['address'], [self.pool(to)['tokens'][0]])),
+                ('token1()', lambda to, args: encode(['address'], [self.pool(to)['tokens'][1]])),
+                ('poolType()', lambda to, args: encode(['uint16'], [2 if self.pool(to)['stable'] else 1])),
+                ('token0PrecisionMultiplier()', lambda to, args: encode(['uint256'], [self.pool(to)['multipliers'][0]])),
+                ('token1PrecisionMultiplier()', lambda to, args: encode(['uint256'], [self.pool(to)['multipliers'][1]])),
+                ('getReserves()', self.get_reserves),
+                ('getSwapFee(address,address,address,address,bytes)', self.get_swap_fee),
+                ('getAmountOut(address,uint256,address)', self.pool_amount_out),
+                ('getAmountsOut(uint256,address[])', self.router_amounts_out),
+                ('tryQuerySwap(address,address,uint256)', self.try_query_swap),
+                ('l2TransactionBaseCost(uint256,uint256,uint256)', lambda to, args: encode(['uint256'], [args[0] * args[1]])),
+            ]
+        }
+
+    def block_number(self) -> int:
+        return int((time.monotonic() - self.started) / self.block_time) + 1
+
+    def register_pool(self, address: str, token_a: str, token_b: str, stable: bool, kind: str) -> str:
+        tokens = sorted([to_checksum_address(token_a), to_checksum_address(token_b)], key=str.lower)
+        symbols = [symbol_of(token) for token in tokens]
+        with self.lock:
+            self.pools.setdefault(address.lower(), {
+                'tokens': tokens,
+                'stable': stable,
+                'kind': kind,
+                'reserves': [units(symbol, LIQUIDITY) for symbol in symbols],
+                'multipliers': [10 ** (18 - DECIMALS[symbol]) if stable else 1 for symbol in symbols],
+                'fee': 40 if stable else 300
+            })
+        return address
+
+    def pool(self, address: str) -> dict:
+        return self.pools[address.lower()]
+
+    def aggregate3(self, to, args):
+        results = []
+        for target, allow_failure, data in args[0]:
+            try:
+                results.append((True, self.call(target, data)))
+            except Exception:
+                if not allow_failure:
+                    raise
+                results.append((False, b''))
+        return encode(['(bool,bytes)[]'], [results])
+
+    def balance_of(self, to, args):
+        symbol = symbol_of(to)
+        return encode(['uint256'], [units(symbol, BALANCES[symbol] * PRICES[symbol])])
+
+    def allowance(self, to, args):
+        with self.lock:
+            return encode(['uint256'], [self.allowances.get((to.lower(), args[0].lower(), args[1].lower()), 0)])
+
+    def get_pool(self, to, args):
+        stable = to.lower() == SYNCSWAP_STABLE_POOL_FACTORY_ADDRESS.lower()
+        address = derive_address(to, *sorted(args, key=str.lower))
+        return encode(['address'], [self.register_pool(address, *args, stable, 'syncswap')])
+
+    def get_pair(self, to, args):
+        address = derive_address(to, *sorted(args, key=str.lower))
+        return encode(['address'], [self.register_pool(address, *args, False, 'spacefi')])
+
+    def get_reserves(self, to, args):
+        pool = self.pool(to)
+        if pool['kind'] == 'spacefi':
+            return encode(['uint112', 'uint112', 'uint32'], [*pool['reserves'], int(time.time())])
+        return encode(['uint256', 'uint256'], pool['reserves'])
+
+    def get_swap_fee(self, to, args):
+        return encode(['uint24'], [self.pool(args[0])['fee']])
+
+    def pool_amount_out(self, to, args):
+        pool = self.pool(to)
+        token0_in = pool['tokens'][0].lower() == args[0].lower()
+        reserves = pool['reserves'] if token0_in else pool['reserves'][::-1]
+        if pool['stable']:
+            amount_out = stable_amount_out(pool['fee'], args[1], tuple(pool['reserves']), tuple(pool['multipliers']), token0_in)
+        else:
+            amount_out = classic_amount_out(pool['fee'], args[1], *reserves)
+        return encode(['uint256'], [amount_out])
+
+    def router_amounts_out(self, to, args):
+        amount, path = args
+        address = derive_address(SPACEFI_FACTORY, *sorted(path, key=str.lower))
+        pool = self.pool(self.register_pool(address, *path, False, 'spacefi'))
+        reserves = pool['reserves'] if pool['tokens'][0].lower() == path[0].lower() else pool['reserves'][::-1]
+        return encode(['uint256[]'], [[amount, spacefi_amount_out(amount, *reserves)]])
+
+    def try_query_swap(self, to, args):
+        from_symbol, to_symbol = symbol_of(args[0]), symbol_of(args[1])
+        usd = args[2] / 10 ** DECIMALS[from_symbol] * PRICES[from_symbol] * 0.999
+        return encode(['uint256'], [units(to_symbol, usd)])
+
+    def call(self, to: str, data: bytes) -> bytes:
+        selector, payload = data[:4], data[4:]
+        if selector not in self.handlers:
+            raise ValueError(f'unknown selector 0x{selector.hex()}')
+
+        types, handler = self.handlers[selector]
+        return handler(to, decode(types, payload) if types else [])
+
+    def send_raw_transaction(self, raw: str) -> str:
+        raw_bytes = bytes.fromhex(raw[2:])
+        txn_hash = '0x' + keccak(raw_bytes).hex()
+        sender = EvmAccount.recover_transaction(raw_bytes)
+        txn = decode_transaction(raw_bytes)
+        with self.lock:
+            if txn['data'][:4] == APPROVE:
+                spender, amount = decode(['address', 'uint256'], txn['data'][4:])
+                self.allowances[('0x' + txn['to'].hex(), sender.lower(), spender.lower())] = amount
+            else:
+                for key, allowance in self.allowances.items():
+                    if key[1:] == (sender.lower(), '0x' + txn['to'].hex()) and allowance != 2 ** 256 - 1:
+                        self.allowances[key] = 0
+            block = self.block_number() + 1
+            self.transactions[txn_hash] = {'from': sender, 'block': block, 'logs': [{
+                'address': L2_ETH_TOKEN, 'topics': [Web3.to_hex(TRANSFER), '0x' + encode(['address'], [sender]).hex(),
+                                                    '0x' + encode(['address'], [BOOTLOADER]).hex()],
+                'data': '0x' + encode(['uint256'], [GAS_ESTIMATE // 2 * GAS_PRICE]).hex()
+            }]}
+            if txn['data'][:4] == REQUEST_L2_TRANSACTION:
+                l2_hash = '0x' + keccak(f'l2-{txn_hash}'.encode()).hex()
+                l2_value = decode(['address', 'uint256'], txn['data'][4:68])[1]
+                self.transactions[l2_hash] = {'from': sender, 'block': block + self.deposit_blocks, 'logs': [{
+                    'address': L2_ETH_TOKEN, 'topics': [Web3.to_hex(MINT), '0x' + encode(['address'], [sender]).hex()],
+                    'data': '0x' + encode(['uint256'], [l2_value]).hex()
+                }]}
+                self.transactions[txn_hash]['logs'].append({
+                    'address': OFFICIAL_BRIDGE, 'topics': ['0x' + NEW_PRIORITY_REQUEST.hex()],
+                    'data': '0x' + encode(['uint256', 'bytes32', 'uint64'], [len(self.transactions), bytes.fromhex(l2_hash[2:]), 0]).hex()
+                })
+        return txn_hash
+
+    def receipt(self, txn_hash: str):
+        with self.lock:
+            txn = self.transactions.get(txn_hash.lower())
+        if txn is None or txn['block'] > self.block_number():
+            return None
+
+        return {
+            'transactionHash': txn_hash, 'transactionIndex': '0x0', 'blockHash': block_hash(txn['block']),
+            'blockNumber': hex(txn['block']), 'from': txn['from'], 'to': None, 'cumulativeGasUsed': hex(GAS_ESTIMATE // 2),
+            'gasUsed': hex(GAS_ESTIMATE // 2), 'effectiveGasPrice': hex(GAS_PRICE), 'contractAddress': None, 'logs': receipt_logs(txn_hash, txn),
+            'logsBloom': '0x' + '00' * 256, 'status': '0x1', 'type': '0x2'
+        }
+
+    def get_logs(self, log_filter: dict) -> list[dict]:
+        from_block, to_block = int(log_filter['fromBlock'], 16), int(log_filter['toBlock'], 16)
+        addresses = {address.lower() for address in log_filter.get('address', [])}
+        head = self.block_number()
+        with self.lock:
+            transactions = list(self.transactions.items())
+
+        logs = []
+        for txn_hash, txn in transactions:
+            if not from_block <= txn['block'] <= min(to_block, head):
+                continue
+            for log in receipt_logs(txn_hash, txn):
+                if addresses and log['address'].lower() not in addresses:
+                    continue
+                if topics_match(log['topics'], log_filter.get('topics', [])):
+                    logs.append(log)
+        return logs
+
+    def dispatch(self, method: str, params: list):
+        if method == 'eth_chainId':
+            return hex(CHAIN_ID)
+        if method == 'eth_blockNumber':
+            return hex(self.block_number())
+        if method == 'eth_gasPrice':
+            return hex(GAS_PRICE)
+        if method == 'eth_getBalance':
+            return hex(ETH_BALANCE)
+        if method == 'eth_getTransactionCount':
+            return '0x0'
+        if method == 'eth_estimateGas':
+            return hex(GAS_ESTIMATE)
+        if method == 'eth_call':
+            return '0x' + self.call(params[0]['to'], bytes.fromhex(params[0]['data'][2:])).hex()
+        if method == 'eth_sendRawTransaction':
+            return self.send_raw_transaction(params[0])
+        if method == 'eth_getTransactionReceipt':
+            return self.receipt(params[0])
+        if method == 'eth_getLogs':
+            return self.get_logs(params[0])
+        raise NotImplementedError(method)
+
+    def handle(self, request: dict) -> dict:
+        response = {'jsonrpc': '2.0', 'id': request.get('id')}
+        try:
+            response['result'] = self.dispatch(request['method'], request.get('params', []))
+        except NotImplementedError as err:
+            response['error'] = {'code': -32601, 'message': f'method not found: {err}'}
+        except Exception as err:
+            response['error'] = {'code': 3, 'message': f'execution reverted: {err}'}
+        return response
+
+
+def block_hash(block: int) -> str:
+    return '0x' + keccak(str(block).encode()).hex()
+
+
+def receipt_logs(txn_hash: str, txn: dict) -> list[dict]:
+    return [
+        {**log, 'logIndex': hex(i), 'transactionIndex': '0x0', 'transactionHash': txn_hash, 'blockHash': block_hash(txn['block']),
+         'blockNumber': hex(txn['block']), 'removed': False}
+        for i, log in enumerate(txn['logs'])
+    ]
+
+
+def topics_match(topics: list[str], expected: list) -> bool:
+    for i, options in enumerate(expected):
+        if options is None:
+            continue
+        options = [options] if isinstance(options, str) else options
+        if i >= len(topics) or topics[i].lower() not in [option.lower() for option in options]:
+            return False
+    return True
+
+
+def argument_types(signature: str) -> list[str]:
+    types = signature[signature.index('(') + 1:-1]
+    if not types:
+        return []
+
+    parts, depth, current = [], 0, ''
+    for char in types:
+        if char == ',' and depth == 0:
+            parts.append(current)
+            current = ''
+            continue
+        depth += char == '('
+        depth -= char == ')'
+        current += char
+    parts.append(current)
+    return parts
+
+
+def serve(chain: FakeChain, latency: float = 0, port: int = 0, failure_rate: float = 0) -> ThreadingHTTPServer:
+    failures = random.Random(port)
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers['Content-Length']))
+            request = json.loads(body)
+            if latency:
+                time.sleep(latency)
+            if failures.random() < failure_rate:
+                self.send_error(503)
+                return
+
+            if isinstance(request, list):
+                response = [chain.handle(item) for item in request]
+                methods = [item['method'] for item in request]
+            else:
+                response = chain.handle(request)
+                methods = [request['method']]
+
+            data = json.dumps(response).encode()
+            metrics.http('rpc', len(body), len(data), methods)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
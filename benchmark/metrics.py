@@ -0,0 +1,127 @@
+import time
+import threading
+from collections import Counter, defaultdict
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+class Phase:
+    def __init__(self, name: str):
+        self.name = name
+        self.wall = 0
+        self.swaps = 0
+        self.failed_swaps = 0
+        self.skipped_sleep = 0
+        self.http_requests = Counter()
+        self.rpc_calls = Counter()
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.latencies = defaultdict(list)
+
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.phases = dict()
+        self.current = self.phase('setup')
+
+    def phase(self, name: str) -> Phase:
+        with self.lock:
+            if name not in self.phases:
+                self.phases[name] = Phase(name)
+            self.current = self.phases[name]
+            return self.current
+
+    def run(self, name: str, action):
+        phase = self.phase(name)
+        started = time.perf_counter()
+        try:
+            action()
+        finally:
+            phase.wall += time.perf_counter() - started
+            self.phase('setup')
+        return phase
+
+    def http(self, server: str, bytes_in: int, bytes_out: int, methods: list[str]):
+        with self.lock:
+            self.current.http_requests[server] += 1
+            self.current.bytes_in += bytes_in
+            self.current.bytes_out += bytes_out
+            self.current.rpc_calls.update(methods)
+
+    def latency(self, kind: str, seconds: float):
+        with self.lock:
+            self.current.latencies[kind].append(seconds)
+
+    def swap(self, seconds: float, status: bool):
+        with self.lock:
+            self.current.swaps += status
+            self.current.failed_swaps += not status
+            self.current.latencies['swap'].append(seconds)
+
+    def sleep(self, seconds: float):
+        with self.lock:
+            self.current.skipped_sleep += seconds
+
+    def report(self) -> str:
+        lines = []
+        header = f'{"phase":<16} {"wall, s":>8} {"swaps":>6} {"rpc":>6} {"rpc/swap":>9} {"http":>6} {"kB in":>8} {"kB out":>8} ' \
+                 f'{"rpc p50/p99, ms":>16} {"api p50/p99, ms":>16} {"swap p50/p99, s":>16}'
+        lines.append(header)
+        lines.append('-' * len(header))
+
+        for phase in self.phases.values():
+            if phase.name == 'setup' and not phase.http_requests:
+                continue
+            rpc = sum(phase.rpc_calls.values())
+            per_swap = f'{rpc / phase.swaps:.1f}' if phase.swaps else '-'
+            lat = {
+                kind: f'{percentile(phase.latencies[kind], 50) * scale:.1f}/{percentile(phase.latencies[kind], 99) * scale:.1f}'
+                for kind, scale in [('rpc', 1000), ('api', 1000), ('swap', 1)]
+            }
+            lines.append(
+                f'{phase.name:<16} {phase.wall:>8.2f} {phase.swaps:>6} {rpc:>6} {per_swap:>9} '
+                f'{sum(phase.http_requests.values()):>6} {phase.bytes_in / 1024:>8.1f} {phase.bytes_out / 1024:>8.1f} '
+                f'{lat["rpc"]:>16} {lat["api"]:>16} {lat["swap"]:>16}'
+            )
+
+        lines.append('')
+        lines.append('RPC calls by method:')
+        for phase in self.phases.values():
+            if not phase.rpc_calls:
+                continue
+            methods = ', '.join(f'{method} {count}' for method, count in phase.rpc_calls.most_common())
+            lines.append(f'  {phase.name}: {methods}')
+            if phase.failed_swaps:
+                lines.append(f'  {phase.name}: failed swaps {phase.failed_swaps}')
+            if phase.skipped_sleep:
+                lines.append(f'  {phase.name}: skipped sleeps {phase.skipped_sleep:.0f} s')
+
+        return '\n'.join(lines)
+
+    def snapshot(self) -> dict:
+        return {
+            phase.name: {
+                'wall': phase.wall,
+                'swaps': phase.swaps,
+                'failed_swaps': phase.failed_swaps,
+                'rpc_calls': dict(phase.rpc_calls),
+                'http_requests': dict(phase.http_requests),
+                'bytes_in': phase.bytes_in,
+                'bytes_out': phase.bytes_out,
+                'skipped_sleep': phase.skipped_sleep,
+                'latency': {
+                    kind: {'p50': percentile(values, 50), 'p99': percentile(values, 99), 'count': len(values)}
+                    for kind, values in phase.latencies.items()
+                }
+            }
+            for phase in self.phases.values()
+        }
+
+
+metrics = Metrics()
@@ -10,6 +10,18 @@ BALANCE_PERCENTAGE = [0.5, 0.6]  # 0.3 == 30%
 # Максимальное кол-во непрерывных транзакций в одном DEX
 MAX_CONTINUOUS_TRANS = 5
 
+# Seed для плана прогона (DEX, токены, суммы) всех кошельков, None - случайный. План составляется при создании
+# базы данных и хранится в data/progress.db (таблица plans)
+PLAN_SEED = None
+
+# Отправлять approve и свап подряд, не дожидаясь подтверждения approve: True (да) или False (нет).
+# Работает, когда лимит газа свапа уже известен из истории (см. GAS_MODEL_MIN_SAMPLES)
+PIPELINE_APPROVE = False
+
+# Во сколько раз одобрять (approve) больше токенов, чем нужно для свапа: 1 - ровно на сумму свапа,
+# 0 - без ограничения (один approve на токен и роутер)
+APPROVE_HEADROOM = 1
+
 # Количество депозитов в пулы: [min, max]
 SYNCSWAP_DEPOSIT = [0, 1]
 SPACEFI_DEPOSIT = [0, 1]
@@ -23,19 +35,124 @@ BRIDGE_AMOUNT = [0.01, 0.015]  # в eth
 # Использовать офф мост при наличии ETH в zkSync Era: True (да) или False (нет)
 BRIDGE = True
 
+# Интервал проверки исполнения депозитов из Ethereum в zkSync Era в секундах
+DEPOSIT_POLL_INTERVAL = 5
+
+# Сколько секунд ждать исполнения депозита в zkSync Era
+DEPOSIT_TIMEOUT = 900
+
 # Ограничение по стоимости газа в GWEI (Код написан под GAS_THRESHOLD <= 20, увеличение может привести к ошибкам)
 GAS_THRESHOLD = 20
 
+# Кол-во кошельков, одновременно выполняющих шаг (размер пула потоков)
+WORKERS = 10
+
+# Интервал вывода статистики планировщика в секундах
+STATS_INTERVAL = 300
+
+# Файл со статистикой RPC запросов по кошелькам, DEX и операциям: .prom (Prometheus) или .json, "" - не сохранять
+RPC_METRICS_PATH = "data/rpc_metrics.prom"
+
+# Асинхронный режим: все кошельки в одном event loop (True) или по одному (False)
+ASYNC_ENGINE = False
+
+# Кол-во кошельков, одновременно работающих в асинхронном режиме
+ASYNC_WALLETS = 50
+
+# Интервал опроса новых блоков при ожидании транзакций в секундах
+RECEIPT_POLL_INTERVAL = 1
+
+# Сколько секунд ждать незавершенные транзакции из журнала при запуске
+RECONCILE_TIMEOUT = 300
+
+# Время жизни закешированной цены газа в секундах
+GAS_PRICE_TTL = 3
+
+# Время жизни снимка балансов кошелька и цены газа в секундах (~один шаг прогона). Между обновлениями балансы
+# меняются локально по логам Transfer из подтвержденных транзакций
+ACCOUNT_STATE_TTL = 20
+
+# Фоновый индекс балансов всех кошельков по логам Transfer (eth_getLogs): True (да) или False (нет).
+# Индекс сохраняется в data/progress.db, кошельки читают балансы из него без запросов к RPC
+BALANCE_INDEXER = True
+
+# Интервал опроса новых блоков индексом балансов в секундах
+INDEXER_POLL_INTERVAL = 2
+
+# Максимальный диапазон блоков в одном запросе eth_getLogs (уменьшается автоматически при ошибках RPC)
+INDEXER_BLOCK_RANGE = 1000
+
+# Как часто сохранять индекс балансов на диск в секундах
+INDEXER_CHECKPOINT_INTERVAL = 60
+
+# Сколько успешных транзакций одного вида (DEX, действие, пара токенов) нужно, чтобы брать лимит газа
+# из истории вместо eth_estimateGas, 0 - всегда оценивать
+GAS_MODEL_MIN_SAMPLES = 3
+
+# Запас к максимальному израсходованному газу из истории: 0.25 == 25%. Лимит не опускается ниже последней оценки
+# eth_estimateGas: в zkSync gasUsed в чеке считается после возврата газа
+GAS_MODEL_MARGIN = 0.25
+
+# Сколько последних транзакций одного вида учитывать
+GAS_MODEL_WINDOW = 20
+
+# Время жизни резервов пулов SpaceFi и SyncSwap для локального расчета котировок в секундах (~1 блок)
+QUOTE_TTL = 1
+
+# Время жизни комиссий пулов SyncSwap в секундах
+QUOTE_FEE_TTL = 600
+
+# Выбирать DEX с лучшей котировкой вместо случайного: True (да) или False (нет)
+BEST_EXECUTION = False
+
+# Сколько секунд ждать котировки от каждого DEX
+QUOTE_DEADLINE = 3
+
+# Кол-во потоков для параллельного запроса котировок
+QUOTE_WORKERS = 20
+
 # Время ожидание между транзакциями в секундах: [min, max]
 SLEEP_TRANSACTIONS = [25, 45]
 
 # Время ожидание между кошельками в секундах: [min, max]
 SLEEP_WALLETS = [60, 180]
 
+# RPC zkSync Era и Ethereum. Можно указать список RPC: ["https://...", "https://..."] - чтение идет через самый
+# быстрый доступный RPC, при ошибках запрос переходит на следующий
 RPC = "https://rpc.ankr.com/zksync_era"
 SCAN = "https://explorer.zksync.io"
 ETHEREUM_RPC = "https://eth.llamarpc.com"
 
+# Размер пула keep-alive соединений на один RPC
+RPC_POOL_SIZE = 20
+
+# Таймауты RPC запросов в секундах: (подключение, чтение)
+RPC_TIMEOUT = (5, 30)
+
+# Через сколько секунд дублировать медленный запрос чтения на следующий RPC из списка, 0 - не дублировать
+RPC_HEDGE_DELAY = 2
+
+# На сколько секунд исключать RPC из ротации после ошибки (удваивается при повторных ошибках, до 8 раз)
+RPC_COOLDOWN = 30
+
+# Кол-во вызовов в одном запросе Multicall3 (на кошелек приходится 4 вызова)
+MULTICALL_BATCH_SIZE = 400
+
+# Таймауты запросов к API Odos и 1inch в секундах: (подключение, чтение)
+API_TIMEOUT = (5, 15)
+
+# Размер пула keep-alive соединений к API Odos и 1inch
+API_POOL_SIZE = 20
+
+# Кол-во повторов запроса к API при ошибке сети, 429 или 5xx
+API_RETRIES = 3
+
+# Базовая задержка между повторами запроса к API в секундах (удваивается с каждой попыткой)
+API_BACKOFF = 1
+
+# Время жизни закешированных котировок и цен из API в секундах
+API_CACHE_TTL = 5
+
 TOKENS = {
     "eth": "0x5AEa5775959fBC2557Cc8789bC1bf90A239D9a91",
     "usdc": "0x3355df6D4c9C3035724Fd0e3914dE96A5a83aaf4",
@@ -44,6 +161,7 @@ TOKENS = {
     "zero_address": "0x0000000000000000000000000000000000000000"
 }
 
+MULTICALL_ADDRESS = "0xF9cda624FfC7B5e1fcc4C7b1b42c9C6C5c36b4Dc"
 OFFICIAL_BRIDGE = "0x32400084C286CF3E17e7B677ea9583e60a000324"
 ODOS_ROUTER_ADDRESS = "0x4bBa932E9792A2b917D47830C93a9BC79320E4f7"
 INCH_ROUTER_ADDRESS = "0x6e2B76966cbD9cF4cC2Fa0D76d24d5241E0ABC2F"
@@ -1,14 +1,27 @@
 import sys
-import time
-import json
+import asyncio
 import random
 from loguru import logger as logging
-from web3 import Web3
-from web3.middleware import geth_poa_middleware
 
-from src.runner import Runner
-from config import SLEEP_WALLETS
-from src.utils import get_accounts, create_db
+from src.runner import wallet_steps
+from src.scheduler import Scheduler
+from src.account import Account
+from src.gas import gas_oracle, gas_model
+from src.allowances import allowance_ledger
+from src.deposits import deposit_tracker
+from src.state import state_stats
+from src.quotes import quote_engine
+from src.rpc_metrics import rpc_stats
+from src.store import get_store
+from src.keys import load_wallets
+from src.journal import reconcile
+from src.pools import pool_cache
+from src.indexer import balance_indexer
+from src.providers import get_web3, endpoint_stats
+from src.aio.account import AsyncAccount
+from src.aio.runner import run_accounts
+from config import ASYNC_ENGINE, BALANCE_INDEXER
+from src.utils import create_db
 
 logging.remove()
 logging.add(sys.stderr, format="<white>{time:HH:mm:ss}</white> | <level>{level: <2}</level> | <level>{message}</level>")
@@ -48,15 +61,13 @@ def options():
 
 
 def main():
-    ether = Web3(Web3.HTTPProvider("https://eth.llamarpc.com"))
-    ether.middleware_onion.inject(geth_poa_middleware, layer=0)
-    accounts = get_accounts('data/keys.txt')
+    accounts = load_wallets('data/keys.txt', AsyncAccount if ASYNC_ENGINE else Account)
 
     if not accounts:
         logging.error("Добавьте приватные ключи в файл data/keys.txt")
         return
 
-    db = json.load(open('data/db.json'))
+    db = get_store().load()
     if len(db) == 0:
         db = create_db(accounts, *options())
         print('База данных создана!', end='\n\n')
@@ -67,17 +78,51 @@ def main():
         selection = int(input('Выберите номер действия: '))
         print()
         if selection == 2:
-            create_db(accounts, *options())
+            db = create_db(accounts, *options())
             print('База данных создана!', end='\n\n')
 
-    while len(db) != 0:
-        random.shuffle(accounts)
+    reconcile(db)
+
+    try:
+        pool_cache.warm(get_web3())
+    except Exception as err:
+        logging.warning(f'Не удалось загрузить пулы SyncSwap: {err}')
+
+    if BALANCE_INDEXER:
+        try:
+            balance_indexer.start(get_web3(), [account.address for account in accounts if account.address in db])
+        except Exception as err:
+            logging.warning(f'Не удалось запустить индекс балансов: {err}')
+
+    random.shuffle(accounts)
+    if ASYNC_ENGINE:
+        asyncio.run(run_accounts(accounts, db))
+    else:
+        scheduler = Scheduler()
         for account in accounts:
-            if account.address not in db:
-                continue
-            account.init_db(db)
-            Runner(account).start()
-            time.sleep(random.randint(*SLEEP_WALLETS))
+            if account.address in db:
+                scheduler.add(account.address, wallet_steps(account, db))
+        scheduler.run()
+
+    balance_indexer.stop()
+    stats = gas_oracle.stats()
+    logging.info(f'Gas oracle | Из кеша: {stats["hits"]} | Запросов к RPC: {stats["misses"]}')
+    stats = gas_model.stats()
+    logging.info(f'Лимит газа | Из истории: {stats["hits"]} | Запросов eth_estimateGas: {stats["misses"]}')
+    stats = allowance_ledger.stats()
+    logging.info(f'Allowance | Из кеша: {stats["hits"]} | Запросов к RPC: {stats["misses"]}')
+    stats = deposit_tracker.stats()
+    if stats['executed'] or stats['expired']:
+        logging.info(f'Депозиты | Исполнено: {stats["executed"]} | Не дождались: {stats["expired"]}')
+    stats = state_stats()
+    logging.info(f'Балансы | Обновлений снимка: {stats["refreshes"]} | Обновлено по логам: {stats["updates"]} | '
+                 f'Из индекса: {balance_indexer.stats()["reads"]}')
+    stats = quote_engine.stats()
+    logging.info(f'Котировки | Из кеша: {stats["hits"]} | Запросов к RPC: {stats["misses"]}')
+    rpc_stats.report()
+    for row in endpoint_stats():
+        logging.info(f'RPC {row["endpoint"]} | Запросов: {row["requests"]} | Ошибок: {row["errors"]} | '
+                     f'Задержка: {round(row["latency"] * 1000)} мс')
 
 
 if __name__ == '__main__':
@@ -1,9 +1,16 @@
-import json
-import random
 from web3 import Web3
 from eth_account import Account as EvmAccount
 
-from config import RPC, TOKENS, MAX_CONTINUOUS_TRANS
+from src import journal
+from src.gas import gas_oracle
+from src.rpc_metrics import rpc_operation
+from src.store import get_store
+from src.state import AccountState, get_state
+from src.indexer import balance_indexer
+from src.providers import get_web3
+from src.contracts import get_contract
+from src.multicall import STABLES, DECIMALS, get_balances, load_decimals
+from config import RPC, TOKENS
 
 
 class Account:
@@ -13,7 +20,8 @@ class Account:
         self.address = Web3.to_checksum_address(self.account.address)
         self.db = dict()
         self.progress = dict()
-        self.w3 = Web3(Web3.HTTPProvider(RPC))
+        self.w3 = get_web3(RPC)
+        self.state = get_state(self.address)
 
     def init_db(self, db):
         self.db = db
@@ -21,27 +29,35 @@ class Account:
 
     def save_db(self):
         if self.progress['transactions'] <= 0:
-            del self.db[self.address]
+            self.db.pop(self.address, None)
+            get_store().delete(self.address, journal.end(self.address))
         else:
             self.db[self.address] = self.progress
+            get_store().save(self.address, self.progress, journal.end(self.address))
 
-        with open('data/db.json', 'w') as file:
-            json.dump(self.db, file, indent='\t')
+    def refresh_state(self) -> AccountState:
+        if not self.state.fresh():
+            load_decimals(self.w3, STABLES)
+            balances = balance_indexer.get(self.address, self.state.block)
+            if balances is None:
+                balances = get_balances(self.w3, [self.address])[self.address]
+            self.state.update(balances, gas_oracle.gas_price(self.w3))
+        return self.state
 
     def check_enough_fee(self) -> bool:
-        fee = self.w3.eth.gas_price * 950000
-        return fee < self.get_native_balance()
+        state = self.refresh_state()
+        return state.gas_price * 950000 < state.balances['eth']
 
     def get_native_balance(self) -> int:
-        wei_balance = self.w3.eth.get_balance(self.address)
-        balance = int(wei_balance / 10 ** 18)
-        return wei_balance
+        return self.refresh_state().balances['eth']
 
     def get_token_data(self, token_address: str) -> dict:
-        token = self.w3.eth.contract(
-            address=Web3.to_checksum_address(token_address),
-            abi=json.load(open('ABIs/erc20_abi.json'))
-        )
+        symbol = self.state.symbol(token_address)
+        if symbol is not None:
+            balance_wei = self.refresh_state().balances[symbol]
+            return {'balance_wei': balance_wei, 'balance': balance_wei / 10 ** DECIMALS[symbol], 'decimals': DECIMALS[symbol]}
+
+        token = get_contract(self.w3, token_address, 'erc20_abi')
 
         decimals = token.functions.decimals().call()
         balance_wei = token.functions.balanceOf(self.address).call()
@@ -49,36 +65,17 @@ class Account:
 
         return {'balance_wei': balance_wei, 'balance': balance, 'decimals': decimals}
 
-    def get_token_balances(self) -> dict[str, int]:
-        balances = dict()
-        for symbol in ['usdc', 'usdt', 'busd']:
-            balances[symbol] = self.get_token_data(TOKENS[symbol])['balance']
+    def get_balances(self) -> dict[str, int]:
+        return dict(self.refresh_state().balances)
 
-        return balances
+    def get_token_balances(self) -> dict[str, float]:
+        balances = self.get_balances()
+        return {symbol: balances[symbol] / 10 ** DECIMALS[symbol] for symbol in STABLES}
 
+    @rpc_operation('balances')
     def get_max_balance_token(self) -> str:
         balances = self.get_token_balances()
         max_symbol = max(balances, key=balances.get)
         if balances[max_symbol] <= 0:
             return 'eth'
         return max_symbol
-
-    def init_iters_per_dapps(self):
-        transactions = self.progress['transactions']
-        threshold = random.randint(10, 13)
-
-        if transactions > threshold:
-            transactions = threshold
-
-        iters_per_dapps = []
-        iters_per_dapp = random.randint(1, MAX_CONTINUOUS_TRANS) if transactions > MAX_CONTINUOUS_TRANS else random.randint(1, transactions)
-
-        for i in range(transactions):
-            summa = sum(iters_per_dapps)
-            if summa > transactions:
-                iters_per_dapps[-1] = iters_per_dapps[-1] - summa + transactions
-            if sum(iters_per_dapps) == transactions:
-                break
-            iters_per_dapps.append(iters_per_dapp)
-
-        return iters_per_dapps
@@ -0,0 +1,60 @@
+from src.gas import gas_oracle
+from src.rpc_metrics import rpc_operation
+from src.account import Account
+from src.state import AccountState
+from src.indexer import balance_indexer
+from src.contracts import get_contract
+from src.aio.providers import get_web3
+from src.aio.multicall import STABLES, DECIMALS, get_balances, load_decimals
+from config import RPC
+
+
+class AsyncAccount(Account):
+    def __init__(self, private_key: str):
+        super().__init__(private_key)
+        self.w3 = get_web3(RPC)
+
+    async def refresh_state(self) -> AccountState:
+        if not self.state.fresh():
+            await load_decimals(self.w3, STABLES)
+            balances = balance_indexer.get(self.address, self.state.block)
+            if balances is None:
+                balances = (await get_balances(self.w3, [self.address]))[self.address]
+            self.state.update(balances, await gas_oracle.gas_price_async(self.w3))
+        return self.state
+
+    async def check_enough_fee(self) -> bool:
+        state = await self.refresh_state()
+        return state.gas_price * 950000 < state.balances['eth']
+
+    async def get_native_balance(self) -> int:
+        return (await self.refresh_state()).balances['eth']
+
+    async def get_token_data(self, token_address: str) -> dict:
+        symbol = self.state.symbol(token_address)
+        if symbol is not None:
+            balance_wei = (await self.refresh_state()).balances[symbol]
+            return {'balance_wei': balance_wei, 'balance': balance_wei / 10 ** DECIMALS[symbol], 'decimals': DECIMALS[symbol]}
+
+        token = get_contract(self.w3, token_address, 'erc20_abi')
+
+        decimals = await token.functions.decimals().call()
+        balance_wei = await token.functions.balanceOf(self.address).call()
+        balance = balance_wei / 10 ** decimals
+
+        return {'balance_wei': balance_wei, 'balance': balance, 'decimals': decimals}
+
+    async def get_balances(self) -> dict[str, int]:
+        return dict((await self.refresh_state()).balances)
+
+    async def get_token_balances(self) -> dict[str, float]:
+        balances = await self.get_balances()
+        return {symbol: balances[symbol] / 10 ** DECIMALS[symbol] for symbol in STABLES}
+
+    @rpc_operation('balances')
+    async def get_max_balance_token(self) -> str:
+        balances = await self.get_token_balances()
+        max_symbol = max(balances, key=balances.get)
+        if balances[max_symbol] <= 0:
+            return 'eth'
+        return max_symbol
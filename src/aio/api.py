@@ -0,0 +1,60 @@
+import asyncio
+import aiohttp
+
+from src.api import RETRY_STATUSES, ResponseCache, get_proxy, cache_key, backoff_delay
+from config import API_POOL_SIZE, API_TIMEOUT, API_RETRIES
+
+_session = None
+_cache = ResponseCache()
+
+
+def get_session() -> aiohttp.ClientSession:
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=API_POOL_SIZE),
+            timeout=aiohttp.ClientTimeout(sock_connect=API_TIMEOUT[0], sock_read=API_TIMEOUT[1])
+        )
+    return _session
+
+
+async def get_api_call_data(url, data=None, proxy=None, cache=False):
+    key = cache_key(url, data)
+    if cache:
+        cached = _cache.get(key)
+        if cached is not None:
+            return cached
+
+    session = get_session()
+    attempt = 0
+    while True:
+        try:
+            request = session.post(url, json=data, proxy=proxy) if data else session.get(url, proxy=proxy)
+            async with request as response:
+                if response.status == 200:
+                    api_data = await response.json()
+                    if cache:
+                        _cache.put(key, api_data)
+                    return api_data
+                status, retry_after = response.status, response.headers.get('Retry-After')
+        except (aiohttp.ClientProxyConnectionError, aiohttp.ClientHttpProxyError):
+            if proxy is None:
+                raise
+            proxy = None
+            continue
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if attempt == API_RETRIES:
+                raise
+            await asyncio.sleep(backoff_delay(attempt))
+            attempt += 1
+            continue
+
+        if status not in RETRY_STATUSES or attempt == API_RETRIES:
+            return False
+        await asyncio.sleep(backoff_delay(attempt, retry_after))
+        attempt += 1
+
+
+async def close_session():
+    if _session is not None:
+        await _session.close()
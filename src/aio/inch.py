@@ -0,0 +1,86 @@
+import random
+import asyncio
+from web3 import Web3
+from loguru import logger as logging
+
+from src.gas import gas_oracle, gas_model, gas_key
+from src.rpc_metrics import rpc_operation
+from src.utils import value_for_logs
+from src.aio.api import get_api_call_data
+from src.aio.account import AsyncAccount
+from src.aio.utils import check_allowance, confirm_approve, send_transaction, wait_for_receipt
+from config import TOKENS, INCH_ROUTER_ADDRESS
+
+
+class Inch:
+    def __init__(self, account: AsyncAccount, retries: int = 1):
+        self.w3 = account.w3
+        self.account = account
+        self.retries = retries
+        self.router_address = Web3.to_checksum_address(INCH_ROUTER_ADDRESS)
+
+    @rpc_operation('swap', 'inch')
+    async def swap(self, from_token: str, to_token: str, amount: int, retry: int = 0) -> bool:
+        eth = "0xEeeeeEeeeEeEeeEeEeEeeEEEeeeeEeeeeeeeEEeE"
+        address = Web3.to_checksum_address(self.account.address)
+
+        try:
+            from_token_address = Web3.to_checksum_address(TOKENS[from_token] if from_token != 'eth' else eth)
+            to_token_address = Web3.to_checksum_address(TOKENS[to_token] if to_token != 'eth' else eth)
+
+            swap_gas = gas_key('inch', 'swap', from_token, to_token)
+            approval = None
+            try:
+                if from_token != 'eth':
+                    approval = await check_allowance(self.w3, from_token_address, address, self.router_address, amount, self.account.key, swap_gas)
+
+                chain_id = await self.w3.eth.chain_id
+                swap_quote = f'https://api-defillama.1inch.io/v5.0/{chain_id}/swap?fromTokenAddress={from_token_address}&toTokenAddress={to_token_address}&amount={amount}&fromAddress={address}&slippage=5'
+
+                if approval:
+                    swap_quote += '&disableEstimate=true'
+
+                tx = await get_api_call_data(swap_quote)
+
+                tx = tx['tx']
+                gas_price = await gas_oracle.gas_price_async(self.w3)
+                tx['to'] = self.router_address
+                tx['value'] = int(tx['value'])
+                tx['maxFeePerGas'] = gas_price
+                tx['maxPriorityFeePerGas'] = gas_price
+                tx['chainId'] = chain_id
+                tx['gas'] = await gas_model.gas_limit_async(self.w3, tx, swap_gas)
+                del tx['gasPrice']
+
+                swap_txn_hash = await send_transaction(self.w3, tx, address, self.account.key, gas_key=swap_gas)
+                status = (await wait_for_receipt(self.w3, swap_txn_hash, address)).status
+            finally:
+                await confirm_approve(self.w3, approval, address)
+
+            if status == 1:
+                trx = f'https://explorer.zksync.io/tx/{swap_txn_hash.hex()}'
+                logging.success(f'{address} | 1inch swap: {from_token} -> {to_token}: '
+                                f'{value_for_logs(from_token, amount)} | TRANSACTION: {trx}')
+                return True
+            else:
+                logging.error(f'{address} | 1inch swap {retry}/{self.retries} | {value_for_logs(from_token, amount)}'
+                              f' -> {to_token}')
+
+        except Exception as err:
+            logging.error(f'{address} | 1inch swap {retry}/{self.retries} | {value_for_logs(from_token, amount)}'
+                          f' -> {to_token} | {err}')
+
+        if retry < self.retries:
+            await asyncio.sleep(random.randint(35, 60))
+            return await self.swap(from_token, to_token, amount, retry + 1)
+        return False
+
+    @rpc_operation('quote', 'inch')
+    async def get_quote(self, from_token: str, to_token: str, amount: int) -> dict:
+        eth = "0xEeeeeEeeeEeEeeEeEeEeeEEEeeeeEeeeeeeeEEeE"
+        from_token_address = Web3.to_checksum_address(TOKENS[from_token] if from_token != 'eth' else eth)
+        to_token_address = Web3.to_checksum_address(TOKENS[to_token] if to_token != 'eth' else eth)
+
+        quote_url = f'https://api-defillama.1inch.io/v5.0/324/quote?fromTokenAddress={from_token_address}&toTokenAddress={to_token_address}&amount={amount}'
+        quote = await get_api_call_data(quote_url, cache=True)
+        return {'amount_out': int(quote['toTokenAmount']), 'gas': quote.get('estimatedGas')}
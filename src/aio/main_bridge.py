@@ -0,0 +1,65 @@
+import random
+from web3 import Web3
+from loguru import logger as logging
+
+from src.gas import gas_oracle, gas_model, gas_key
+from src.rpc_metrics import rpc_operation
+from src.contracts import get_contract
+from src.aio.providers import get_web3
+from src.aio.account import AsyncAccount
+from src.aio.utils import send_transaction, wait_for_receipt
+from config import OFFICIAL_BRIDGE, BRIDGE_AMOUNT, ETHEREUM_RPC
+
+
+class MainBridge:
+    def __init__(self, account: AsyncAccount):
+        self.w3 = get_web3(ETHEREUM_RPC)
+        self.account = account
+        self.router_address = Web3.to_checksum_address(OFFICIAL_BRIDGE)
+        self.router = get_contract(self.w3, self.router_address, 'main_bridge')
+
+    @rpc_operation('deposit', 'bridge')
+    async def deposit(self):
+        gas_limit = random.randint(700000, 850000)
+        amount_for_fee = Web3.to_wei(0.003, 'ether')
+        amount = int(random.uniform(*BRIDGE_AMOUNT) * 10 ** 18)
+
+        try:
+            native_balance = await self.w3.eth.get_balance(self.account.address)
+            if native_balance - amount_for_fee < amount:
+                logging.warning(f'{self.account.address} | Main Bridge | Недостаточно баланса')
+
+            gas_price = await gas_oracle.gas_price_async(self.w3)
+            base_cost = await self.router.functions.l2TransactionBaseCost(gas_price, gas_limit, 800).call()
+
+            txn = await self.router.functions.requestL2Transaction(
+                self.account.address,
+                amount,
+                "0x",
+                gas_limit,
+                800,
+                [],
+                self.account.address
+            ).build_transaction({
+                'from': self.account.address,
+                'value': amount + base_cost,
+                'gas': 0,
+                'gasPrice': gas_price
+            })
+
+            deposit_gas = gas_key('bridge', 'deposit')
+            txn['gas'] = await gas_model.gas_limit_async(self.w3, txn, deposit_gas)
+            txn_hash = await send_transaction(self.w3, txn, self.account.address, self.account.key, gas_key=deposit_gas)
+            receipt = await wait_for_receipt(self.w3, txn_hash, self.account.address)
+
+            if receipt.status == 1:
+                trx = f'https://etherscan.io/tx/{txn_hash.hex()}'
+                logging.success(f'{self.account.address} | Main Bridge | Ethereum -> ZkSync Era | TRANSACTION: {trx}')
+                return receipt
+            else:
+                logging.error(f'{self.account.address} Error Main Bridge')
+                return False
+
+        except Exception as err:
+            logging.error(f'{self.account.address} Error Main Bridge: {err}')
+            return False
@@ -0,0 +1,29 @@
+from web3 import AsyncWeb3
+
+from src.contracts import get_contract
+from src.multicall import STABLES, DECIMALS, split_batches, unpack_results
+from src.multicall import decimals_calls, store_decimals, balance_calls, parse_balances
+from config import MULTICALL_ADDRESS
+
+
+async def aggregate(w3: AsyncWeb3, calls: list[tuple[str, str]]) -> list:
+    multicall = get_contract(w3, MULTICALL_ADDRESS, 'multicall3')
+    results = []
+
+    for batch in split_batches(calls):
+        results.extend(unpack_results(await multicall.functions.aggregate3(batch).call()))
+
+    return results
+
+
+async def load_decimals(w3: AsyncWeb3, symbols: list[str]):
+    missing = [symbol for symbol in symbols if symbol not in DECIMALS]
+    if missing:
+        store_decimals(missing, await aggregate(w3, decimals_calls(w3, missing)))
+
+
+async def get_balances(w3: AsyncWeb3, addresses: list[str], symbols: list[str] = None) -> dict[str, dict[str, int]]:
+    symbols = STABLES if symbols is None else symbols
+    addresses = [AsyncWeb3.to_checksum_address(address) for address in addresses]
+    results = await aggregate(w3, balance_calls(w3, addresses, symbols))
+    return parse_balances(addresses, symbols, results)
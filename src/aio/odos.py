@@ -0,0 +1,120 @@
+import random
+import asyncio
+from web3 import Web3
+from loguru import logger as logging
+
+from src.gas import gas_oracle, gas_model, gas_key
+from src.rpc_metrics import rpc_operation
+from src.utils import value_for_logs
+from src.aio.account import AsyncAccount
+from src.aio.api import get_api_call_data, get_proxy
+from src.aio.utils import check_allowance, confirm_approve, send_transaction, wait_for_receipt
+from config import TOKENS, ODOS_ROUTER_ADDRESS, GAS_THRESHOLD
+
+
+class Odos:
+    def __init__(self, account: AsyncAccount, retries: int = 1):
+        self.w3 = account.w3
+        self.retries = retries
+        self.account = account
+        self.proxy = get_proxy()
+        self.router_address = Web3.to_checksum_address(ODOS_ROUTER_ADDRESS)
+
+    @rpc_operation('swap', 'odos')
+    async def swap(self, from_token: str, to_token: str, amount: int, retry: int = 0) -> bool:
+        address = Web3.to_checksum_address(self.account.address)
+        from_token_address = Web3.to_checksum_address(TOKENS[from_token] if from_token != 'eth' else TOKENS['zero_address'])
+        to_token_address = Web3.to_checksum_address(TOKENS[to_token] if to_token != 'eth' else TOKENS['zero_address'])
+
+        try:
+            swap_gas = gas_key('odos', 'swap', from_token, to_token)
+            approval = None
+            try:
+                if from_token != 'eth':
+                    approval = await check_allowance(self.w3, from_token_address, address, self.router_address, amount, self.account.key, swap_gas)
+
+                quote = await self.quote(address, from_token_address, to_token_address, amount)
+
+                assemble_request_body = {
+                    "userAddr": address,
+                    "pathId": quote["pathId"]
+                }
+
+                swap_txn = await get_api_call_data("https://api.odos.xyz/sor/assemble", assemble_request_body, self.proxy)
+                amountOut = int(swap_txn['outputTokens'][0]['amount'])
+
+                gas_price = await gas_oracle.gas_price_async(self.w3)
+                swap_txn = swap_txn['transaction']
+                swap_txn['to'] = self.router_address
+                swap_txn['chainId'] = await self.w3.eth.chain_id
+                swap_txn['value'] = int(swap_txn['value'])
+                swap_txn['maxFeePerGas'] = gas_price
+                swap_txn['maxPriorityFeePerGas'] = gas_price
+                swap_txn['gas'] = await gas_model.gas_limit_async(self.w3, swap_txn, swap_gas, 0.75)
+                del swap_txn['gasPrice']
+
+                swap_txn_hash = await send_transaction(self.w3, swap_txn, address, self.account.key, gas_key=swap_gas)
+                status = (await wait_for_receipt(self.w3, swap_txn_hash, address)).status
+            finally:
+                await confirm_approve(self.w3, approval, address)
+            await asyncio.sleep(10)
+
+            if status == 1:
+                trx = f'https://explorer.zksync.io/tx/{swap_txn_hash.hex()}'
+                logging.success(f'{address} | Odos swap: {value_for_logs(from_token, amount)} -> '
+                                f'{value_for_logs(to_token, amountOut)} | TRANSACTION: {trx}')
+                return True
+            else:
+                logging.error(f'{address} | Odos swap {retry}/{self.retries} | {value_for_logs(from_token, amount)}'
+                              f' -> {to_token}')
+
+        except Exception as err:
+            logging.error(f'{address} | Odos swap {retry}/{self.retries} | {value_for_logs(from_token, amount)}'
+                          f' -> {to_token} | {err}')
+
+        if retry < self.retries:
+            await asyncio.sleep(random.randint(30, 40))
+            return await self.swap(from_token, to_token, amount, retry + 1)
+        return False
+
+    async def quote(self, address: str, from_token_address: str, to_token_address: str, amount: int, cache: bool = False):
+        quote_url = 'https://api.odos.xyz/sor/quote/v2'
+
+        quote_request_body = {
+            "chainId": 324,
+            "inputTokens": [
+                {
+                    "tokenAddress": from_token_address,
+                    "amount": str(amount),
+                }
+            ],
+            "outputTokens": [
+                {
+                    "tokenAddress": to_token_address,
+                    "proportion": 1
+                }
+            ],
+            "slippageLimitPercent": 0.3,  # slippage (1 = 1%)
+            "userAddr": address,
+            "referralCode": 0,
+            "compact": True,
+        }
+
+        return await get_api_call_data(quote_url, quote_request_body, self.proxy, cache=cache)
+
+    @rpc_operation('check_response', 'odos')
+    async def check_response(self):
+        try:
+            return await get_api_call_data(f'https://api.odos.xyz/pricing/token/324/{TOKENS["usdc"]}?currencyId=ETH', proxy=self.proxy, cache=True)
+        except Exception as err:
+            logging.error(f'Error: {err}')
+            return False
+
+    @rpc_operation('quote', 'odos')
+    async def get_quote(self, from_token: str, to_token: str, amount: int) -> dict:
+        address = Web3.to_checksum_address(self.account.address)
+        from_token_address = Web3.to_checksum_address(TOKENS[from_token] if from_token != 'eth' else TOKENS['zero_address'])
+        to_token_address = Web3.to_checksum_address(TOKENS[to_token] if to_token != 'eth' else TOKENS['zero_address'])
+
+        quote = await self.quote(address, from_token_address, to_token_address, amount, cache=True)
+        return {'amount_out': int(quote['outAmounts'][0]), 'gas': int(quote['gasEstimate'])}
@@ -0,0 +1,113 @@
+import time
+import asyncio
+import aiohttp
+from web3 import AsyncWeb3, AsyncHTTPProvider
+from web3.providers.async_base import AsyncJSONBaseProvider
+
+from src.rpc_metrics import async_rpc_accounting
+from src.providers import BROADCAST_METHODS, Endpoint, EndpointPool, split_endpoints, endpoints_key, check_response
+from src.providers import known_transaction
+from config import RPC, RPC_POOL_SIZE, RPC_TIMEOUT, RPC_HEDGE_DELAY
+
+_providers = dict()
+
+
+class PooledAsyncHTTPProvider(AsyncHTTPProvider):
+    def __init__(self, endpoint_uri: str, pool_size: int = RPC_POOL_SIZE, timeout=RPC_TIMEOUT):
+        super().__init__(endpoint_uri, request_kwargs={
+            'timeout': aiohttp.ClientTimeout(sock_connect=timeout[0], sock_read=timeout[1])
+        })
+        self.pool_size = pool_size
+        self.session = None
+
+    def get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.pool_size))
+        return self.session
+
+    async def make_request(self, method, params):
+        request_data = self.encode_rpc_request(method, params)
+        async with self.get_session().post(self.endpoint_uri, data=request_data, **self.get_request_kwargs()) as response:
+            response.raise_for_status()
+            return self.decode_rpc_response(await response.read())
+
+
+class RoutedAsyncHTTPProvider(AsyncJSONBaseProvider):
+    _middlewares = AsyncHTTPProvider._middlewares
+
+    def __init__(self, endpoints: list[str], hedge_delay: float = RPC_HEDGE_DELAY):
+        super().__init__()
+        self.endpoint_uri = endpoints_key(endpoints)
+        self.pool = EndpointPool([Endpoint(uri, PooledAsyncHTTPProvider(uri)) for uri in endpoints])
+        self.hedge_delay = hedge_delay
+
+    async def call(self, endpoint: Endpoint, method, params):
+        started = time.perf_counter()
+        try:
+            response = await endpoint.provider.make_request(method, params)
+            check_response(response)
+        except asyncio.CancelledError:
+            self.pool.cancelled(endpoint, time.perf_counter() - started)
+            raise
+        except Exception:
+            self.pool.failure(endpoint, time.perf_counter() - started)
+            raise
+
+        self.pool.success(endpoint, time.perf_counter() - started)
+        return response
+
+    async def failover(self, endpoints: list[Endpoint], method, params):
+        for endpoint in endpoints[:-1]:
+            try:
+                return await self.call(endpoint, method, params)
+            except Exception:
+                pass
+        return await self.call(endpoints[-1], method, params)
+
+    async def hedged(self, endpoints: list[Endpoint], method, params):
+        pending, error = set(), None
+        try:
+            for i, endpoint in enumerate(endpoints):
+                pending.add(asyncio.ensure_future(self.call(endpoint, method, params)))
+                timeout = self.hedge_delay if i + 1 < len(endpoints) else None
+                while pending:
+                    done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        if task.exception() is None:
+                            return task.result()
+                        error = task.exception()
+                    if not done or i + 1 < len(endpoints):
+                        break
+
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def make_request(self, method, params):
+        endpoints = self.pool.ranked(method)
+
+        if self.hedge_delay and len(endpoints) > 1 and method not in BROADCAST_METHODS:
+            response = await self.hedged(endpoints, method, params)
+        else:
+            response = await self.failover(endpoints, method, params)
+
+        return known_transaction(method, params, response)
+
+
+def get_web3(endpoint=RPC) -> AsyncWeb3:
+    key = endpoints_key(endpoint)
+    w3 = _providers.get(key)
+    if w3 is None:
+        w3 = AsyncWeb3(RoutedAsyncHTTPProvider(split_endpoints(endpoint)))
+        w3.middleware_onion.inject(async_rpc_accounting, 'rpc_accounting', layer=0)
+        _providers[key] = w3
+
+    return w3
+
+
+async def close_sessions():
+    for w3 in _providers.values():
+        for endpoint in w3.provider.pool.endpoints:
+            if endpoint.provider.session is not None:
+                await endpoint.provider.session.close()
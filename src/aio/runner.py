@@ -0,0 +1,293 @@
+import random
+import asyncio
+from web3 import Web3
+from loguru import logger as logging
+
+from src import journal
+from src.store import offload
+from src.gas import gas_oracle
+from src.plan import fleet_plan, pick
+from src.deposits import deposit_tracker, priority_hash
+from src.rpc_metrics import rpc_operation, rpc_tags
+from src.utils import value_for_logs
+from src.venues import best_venue, format_table
+from src.aio.inch import Inch
+from src.aio.odos import Odos
+from src.aio.woofi import WooFi
+from src.aio.spacefi import SpaceFi
+from src.aio.syncswap import SyncSwap
+from src.aio.main_bridge import MainBridge
+from src.aio.api import close_session
+from src.aio.venues import quote_venues
+from src.keys import WalletHandle
+from src.aio.account import AsyncAccount
+from src.aio.providers import get_web3, close_sessions
+from config import TOKENS, SLEEP_TRANSACTIONS, MIN_BALANCE_FOR_GAS, BALANCE_PERCENTAGE, BRIDGE, GAS_THRESHOLD
+from config import ETHEREUM_RPC, SLEEP_WALLETS, BEST_EXECUTION, ASYNC_WALLETS, SCAN
+
+
+class Runner:
+    def __init__(self, account: AsyncAccount):
+        self.account = account
+        self.w3_eth = get_web3(ETHEREUM_RPC)
+        self.tokens = {'eth': 0.35, 'usdc': 0.25, 'usdt': 0.2, 'busd': 0.2}  # token: proba
+        self.dapps = {
+            'odos': Odos(self.account),
+            'inch': Inch(self.account),
+            'woofi': WooFi(self.account),
+            'spacefi': SpaceFi(self.account),
+            'syncswap': SyncSwap(self.account)
+        }
+
+    async def start(self):
+        address = self.account.address
+        transactions = self.account.db[address]["transactions"]
+
+        logging.info(f'{address} | Запуск')
+
+        response_status = await self.dapps['odos'].check_response()
+        if not response_status and self.account.progress['volumes']:
+            logging.warning(f'{address} | Не удалось установить соединение с Odos, добавьте прокси в config.py')
+            return
+        elif not response_status:
+            del self.dapps['odos']
+
+        if self.account.progress['volumes']:
+            await self.volumes_runner()
+        else:
+            await self.base_runner()
+
+        completed_trx = transactions - self.account.progress["transactions"]
+        if completed_trx == 0:
+            return
+        elif self.account.progress["transactions"] == 0:
+            logging.info(f'{address} | Прогон завершен')
+        else:
+            logging.info(f'{address} | Выполнено {completed_trx} транзакций')
+
+    async def base_runner(self):
+        try:
+            from_token = await self.account.get_max_balance_token()
+            native_balance = await self.account.get_native_balance()
+        except Exception as err:
+            logging.error(f'Проблемы с rpc: {err}')
+            return
+
+        if not BRIDGE and native_balance > 0:
+            self.account.progress['bridge'] = False
+
+        if self.account.progress['bridge']:
+            journal.begin(self.account.address, 'bridge', 'deposit', 'bridge')
+            receipt = await MainBridge(self.account).deposit()
+            self.account.progress['bridge'] = False
+            await offload(self.account.save_db)
+            if receipt:
+                await self.wait_deposit(receipt)
+
+        for dapp_name, steps in self.next_run():
+            await self.gas_tracker()
+            dapp_name = self.plan_dapp(dapp_name, steps)
+            dapp = self.dapps[dapp_name]
+            from_token, to_token = await self.choice_token_pair(dapp_name, self.tokens, from_token, steps[0][0])
+
+            for i, (token_draw, size_draw) in enumerate(steps):
+                amount = await self.get_amount(from_token, fraction=size_draw)
+                if amount < 0 or from_token == to_token:
+                    logging.error(f'{self.account.address} | Недостаточно ETH для оплаты газа')
+                    return
+
+                if BEST_EXECUTION:
+                    dapp_name = await self.choice_best_dapp(from_token, to_token, amount) or dapp_name
+                    dapp = self.dapps[dapp_name]
+
+                journal.begin(self.account.address, dapp_name, 'swap', 'transactions')
+                if not await dapp.swap(from_token, to_token, amount):
+                    await offload(journal.abandon, self.account.address)
+                    break
+
+                self.account.progress['transactions'] -= 1
+                await offload(self.account.save_db)
+
+                await self.stake_runner(dapp, dapp_name, to_token)
+                token_draw = steps[i + 1][0] if i + 1 < len(steps) else token_draw
+                from_token, to_token = await self.choice_token_pair(dapp_name, self.tokens, to_token, token_draw)
+                await asyncio.sleep(random.randint(*SLEEP_TRANSACTIONS))
+
+    async def volumes_runner(self):
+        dapp = self.dapps['odos']
+
+        try:
+            from_token = await self.account.get_max_balance_token()
+        except Exception as err:
+            logging.error(f'Проблемы с rpc: {err}')
+            return
+
+        if from_token == 'usdt':
+            amount = await self.get_amount(from_token, True)
+            if not await dapp.swap(from_token, 'eth', amount):
+                return
+            from_token = 'eth'
+            await asyncio.sleep(random.randint(*SLEEP_TRANSACTIONS))
+
+        odos_tokens = self.tokens
+        del odos_tokens['usdt']
+
+        steps = [step for _, run_steps in self.next_run() for step in run_steps]
+        if not steps:
+            return
+        from_token, to_token = await self.choice_token_pair('odos', odos_tokens, from_token, steps[0][0])
+
+        for i, (token_draw, size_draw) in enumerate(steps):
+            await self.gas_tracker()
+
+            amount = await self.get_amount(from_token, True, size_draw)
+            if amount < 0 or from_token == to_token:
+                logging.error(f'{self.account.address} | Недостаточно ETH для оплаты газа')
+                return
+
+            journal.begin(self.account.address, 'odos', 'swap', 'transactions')
+            if not await dapp.swap(from_token, to_token, amount):
+                await offload(journal.abandon, self.account.address)
+                break
+
+            self.account.progress['transactions'] -= 1
+            await offload(self.account.save_db)
+            token_draw = steps[i + 1][0] if i + 1 < len(steps) else token_draw
+            from_token, to_token = await self.choice_token_pair('odos', odos_tokens, to_token, token_draw)
+            await asyncio.sleep(random.randint(*SLEEP_TRANSACTIONS))
+
+    def next_run(self) -> list:
+        index = self.account.progress.get('run', 0)
+        self.account.progress['run'] = index + 1
+        return fleet_plan.run(self.account.address, index, self.account.progress)
+
+    def plan_dapp(self, dapp_name: str, steps: list) -> str:
+        if dapp_name in self.dapps:
+            return dapp_name
+        names = list(self.dapps)
+        return names[int(steps[0][0] * len(names))]
+
+    @rpc_operation('deposit', 'bridge')
+    async def wait_deposit(self, receipt):
+        l2_hash = priority_hash(receipt)
+        if l2_hash is None:
+            await self.poll_deposit()
+            return
+
+        l2_receipt = await asyncio.wrap_future(deposit_tracker.track(l2_hash, self.account.address))
+        if l2_receipt is not None and l2_receipt['status'] == 1:
+            self.account.state.invalidate(l2_receipt['blockNumber'])
+            logging.success(f'{self.account.address} | Main Bridge | Депозит исполнен в zkSync Era: {SCAN}/tx/{l2_hash}')
+            return
+
+        if l2_receipt is not None:
+            logging.error(f'{self.account.address} | Main Bridge | Депозит не исполнен в zkSync Era: {SCAN}/tx/{l2_hash}')
+        await self.poll_deposit()
+
+    async def poll_deposit(self):
+        await asyncio.sleep(random.randint(60, 120))
+        attempt = 0
+        while attempt < 5:
+            self.account.state.invalidate()
+            if await self.account.get_native_balance() > 0:
+                break
+            attempt += 1
+            await asyncio.sleep(random.randint(60, 120))
+
+    @rpc_operation('stake_runner')
+    async def stake_runner(self, dapp, dapp_name, to_token):
+        await asyncio.sleep(random.randint(*SLEEP_TRANSACTIONS))
+
+        if dapp_name == 'spacefi' and self.account.progress['spacefi_deposit'] > 0 and await self.account.check_enough_fee():
+            journal.begin(self.account.address, 'spacefi', 'add_liquidity', 'spacefi_deposit')
+            if await dapp.add_liquidity(to_token):
+                self.account.progress['spacefi_deposit'] -= 1
+                await offload(self.account.save_db)
+            else:
+                await offload(journal.abandon, self.account.address)
+        elif dapp_name == 'syncswap' and self.account.progress['syncswap_deposit'] > 0 and await self.account.check_enough_fee():
+            journal.begin(self.account.address, 'syncswap', 'add_liquidity', 'syncswap_deposit')
+            if await dapp.add_liquidity():
+                self.account.progress['syncswap_deposit'] -= 1
+                await offload(self.account.save_db)
+            else:
+                await offload(journal.abandon, self.account.address)
+
+    @rpc_operation('choice_token_pair')
+    async def choice_token_pair(self, dapp_name: str, tokens: dict, to_token: str, draw: float = None) -> tuple:
+        from_token = to_token
+        random_dex = random.choice(['syncswap', 'spacefi'])
+
+        if not await self.account.check_enough_fee():
+            return 'eth', 'eth'
+        elif from_token != 'eth' and await self.account.get_native_balance() < 0.000635 * 10 ** 18:
+            if dapp_name == 'woofi' and from_token != 'usdc':
+                await self.dapps[random_dex].swap(from_token, 'eth', await self.get_amount(from_token))
+                await asyncio.sleep(random.randint(*SLEEP_TRANSACTIONS))
+                return await self.choice_token_pair(dapp_name, tokens, 'eth', draw)
+            else:
+                return from_token, 'eth'
+
+        if dapp_name == 'woofi':
+            to_token = 'usdc' if from_token == 'eth' else 'eth'
+            if from_token not in ['eth', 'usdc']:
+                await self.dapps[random_dex].swap(from_token, to_token, await self.get_amount(from_token))
+                await asyncio.sleep(random.randint(*SLEEP_TRANSACTIONS))
+                from_token, to_token = await self.choice_token_pair(dapp_name, tokens, to_token, draw)
+
+            return from_token, to_token
+
+        tokens_temp = {token: p for token, p in tokens.items() if token != from_token}
+        return from_token, pick(tokens_temp, draw)
+
+    async def choice_best_dapp(self, from_token: str, to_token: str, amount: int):
+        rows = await quote_venues(self.dapps, from_token, to_token, amount)
+        logging.info(f'{self.account.address} | Котировки {value_for_logs(from_token, amount)} -> {to_token}:\n'
+                     f'{format_table(rows, to_token)}')
+        return best_venue(rows)
+
+    @rpc_operation('balances')
+    async def get_amount(self, from_token: str, volumes: bool = False, fraction: float = None) -> int:
+        if from_token == 'eth' and volumes:
+            amount = await self.account.get_native_balance() - int((fraction or random.uniform(*MIN_BALANCE_FOR_GAS)) * 10 ** 18)
+        elif from_token == 'eth':
+            amount = (await self.account.get_native_balance() - 0.00038 * 10 ** 18) * (fraction or random.uniform(*BALANCE_PERCENTAGE))
+        else:
+            amount = (await self.account.get_token_data(TOKENS[from_token]))['balance_wei']
+
+        return int(amount)
+
+    @rpc_operation('gas_tracker')
+    async def gas_tracker(self):
+        gas_price = Web3.from_wei(await gas_oracle.gas_price_async(self.w3_eth), 'gwei')
+        while gas_price > GAS_THRESHOLD:
+            print(f'Gas price: {round(gas_price, 1)}')
+            await asyncio.sleep(30)
+            gas_price = Web3.from_wei(await gas_oracle.gas_price_async(self.w3_eth), 'gwei')
+
+
+async def run_wallet(wallet: WalletHandle, db: dict, semaphore: asyncio.Semaphore):
+    while wallet.address in db:
+        async with semaphore:
+            account = wallet.load()
+            account.init_db(db)
+            try:
+                with rpc_tags(wallet=account.address):
+                    await Runner(account).start()
+            except Exception as err:
+                logging.error(f'{account.address} | {err}')
+
+        if wallet.address in db:
+            await asyncio.sleep(random.randint(*SLEEP_WALLETS))
+    wallet.release()
+
+
+async def run_accounts(wallets: list[WalletHandle], db: dict):
+    semaphore = asyncio.Semaphore(ASYNC_WALLETS)
+    random.shuffle(wallets)
+
+    try:
+        await asyncio.gather(*[run_wallet(wallet, db, semaphore) for wallet in wallets if wallet.address in db])
+    finally:
+        await close_session()
+        await close_sessions()
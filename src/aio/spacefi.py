@@ -0,0 +1,143 @@
+import time
+import random
+import asyncio
+from web3 import Web3
+from loguru import logger as logging
+
+from src.gas import gas_oracle, gas_model, gas_key
+from src.rpc_metrics import rpc_operation
+from src.quotes import quote_engine
+from src.utils import value_for_logs
+from src.contracts import get_contract
+from src.aio.account import AsyncAccount
+from src.aio.utils import check_allowance, confirm_approve, send_transaction, wait_for_receipt
+from config import TOKENS, SPACEFI_ROUTER_ADDRESS, LIQUIDITY_AMOUNT
+
+
+class SpaceFi:
+    def __init__(self, account: AsyncAccount, retries: int = 1):
+        self.w3 = account.w3
+        self.retries = retries
+        self.account = account
+        self.router_address = Web3.to_checksum_address(SPACEFI_ROUTER_ADDRESS)
+        self.router = get_contract(self.w3, self.router_address, 'spacefi_router')
+
+    @rpc_operation('swap', 'spacefi')
+    async def swap(self, from_token: str, to_token: str, amount: int, retry: int = 0) -> bool:
+        address = Web3.to_checksum_address(self.account.address)
+        from_token_address = Web3.to_checksum_address(TOKENS[from_token])
+        to_token_address = Web3.to_checksum_address(TOKENS[to_token])
+
+        deadline = int(time.time() + 1800)
+
+        try:
+            swap_gas = gas_key('spacefi', 'swap', from_token, to_token)
+            approval = None
+            try:
+                gas_price = await gas_oracle.gas_price_async(self.w3)
+                amount_out = (await self.get_amount_out(from_token, to_token, amount))[-1]
+
+                if from_token == 'eth':
+                    swap_txn = await self.router.functions.swapExactETHForTokens(
+                        amount_out,
+                        [from_token_address, to_token_address],
+                        address,
+                        deadline
+                    ).build_transaction({
+                        'from': address,
+                        'value': amount,
+                        'gas': 0,
+                        'maxFeePerGas': gas_price,
+                        'maxPriorityFeePerGas': gas_price,
+                    })
+                else:
+                    approval = await check_allowance(self.w3, from_token_address, address, self.router_address, amount, self.account.key, swap_gas)
+
+                    txn_info = {
+                        'from': address,
+                        'value': 0,
+                        'gas': 0,
+                        'maxFeePerGas': gas_price,
+                        'maxPriorityFeePerGas': gas_price,
+                    }
+                    params = [amount, amount_out, [from_token_address, to_token_address], address, deadline]
+
+                    if to_token == 'eth':
+                        swap_txn = await self.router.functions.swapExactTokensForETH(*params).build_transaction(txn_info)
+                    else:
+                        swap_txn = await self.router.functions.swapExactTokensForTokens(*params).build_transaction(txn_info)
+
+                swap_txn['gas'] = await gas_model.gas_limit_async(self.w3, swap_txn, swap_gas)
+                swap_txn_hash = await send_transaction(self.w3, swap_txn, address, self.account.key, gas_key=swap_gas)
+                status = (await wait_for_receipt(self.w3, swap_txn_hash, address)).status
+            finally:
+                await confirm_approve(self.w3, approval, address)
+
+            if status == 1:
+                trx = f'https://explorer.zksync.io/tx/{swap_txn_hash.hex()}'
+                logging.success(f'{address} | SpaceFi swap: {value_for_logs(from_token, amount)} -> '
+                                f'{value_for_logs(to_token, amount_out)} | TRANSACTION: {trx}')
+                return True
+            else:
+                logging.error(f'{address} | SpaceFi swap {retry}/{self.retries} | {value_for_logs(from_token, amount)}'
+                              f' -> {to_token}')
+
+        except Exception as err:
+            logging.error(f'{address} | SpaceFi swap {retry}/{self.retries} | {value_for_logs(from_token, amount)}'
+                          f' -> {to_token} | {err}')
+
+        if retry < self.retries:
+            await asyncio.sleep(random.randint(35, 60))
+            return await self.swap(from_token, to_token, amount, retry + 1)
+        return False
+
+    @rpc_operation('add_liquidity', 'spacefi')
+    async def add_liquidity(self, to_token: str) -> bool:
+        address = Web3.to_checksum_address(self.account.address)
+        amount = int(random.uniform(*LIQUIDITY_AMOUNT) * 10 ** 18)
+
+        try:
+            token_balance = (await self.account.get_token_data(TOKENS[to_token]))['balance_wei']
+            token_amount = (await self.get_amount_out('eth', to_token, amount))[-1]
+
+            if amount > await self.account.get_native_balance() or token_amount > token_balance:
+                return False
+
+            gas_price = await gas_oracle.gas_price_async(self.w3)
+            txn = await self.router.functions.addLiquidityETH(
+                Web3.to_checksum_address(TOKENS[to_token]),
+                token_amount,
+                int(token_amount * 0.995),
+                int(amount * 0.995),
+                address,
+                int(time.time() + 1800)
+            ).build_transaction({
+                'from': address,
+                'value': amount,
+                'gas': 0,
+                'maxFeePerGas': gas_price,
+                'maxPriorityFeePerGas': gas_price,
+            })
+
+            liquidity_gas = gas_key('spacefi', 'add_liquidity', 'eth', to_token)
+            txn['gas'] = await gas_model.gas_limit_async(self.w3, txn, liquidity_gas)
+            swap_txn_hash = await send_transaction(self.w3, txn, address, self.account.key, gas_key=liquidity_gas)
+            status = (await wait_for_receipt(self.w3, swap_txn_hash, address)).status
+
+            if status == 1:
+                trx = f'https://explorer.zksync.io/tx/{swap_txn_hash.hex()}'
+                logging.success(f'{address} | SpaceFi add liquidity: eth & {to_token}: {value_for_logs(to_token, token_amount)} | TRANSACTION: {trx}')
+                return True
+            else:
+                logging.error(f'{address} | SpaceFi add liquidity')
+                return False
+        except Exception as err:
+            logging.error(f'{address} | SpaceFi add liquidity error: {err}')
+            return False
+
+    async def get_amount_out(self, from_token: str, to_token: str, amount: int):
+        return [amount, await quote_engine.spacefi_amount_out_async(self.w3, from_token, to_token, amount)]
+
+    @rpc_operation('quote', 'spacefi')
+    async def get_quote(self, from_token: str, to_token: str, amount: int) -> dict:
+        return {'amount_out': (await self.get_amount_out(from_token, to_token, amount))[-1], 'gas': None}
@@ -0,0 +1,157 @@
+import time
+import random
+import asyncio
+from web3 import Web3
+from eth_abi import encode
+from loguru import logger as logging
+
+from src.gas import gas_oracle, gas_model, gas_key
+from src.rpc_metrics import rpc_operation
+from src.utils import value_for_logs
+from src.pools import pool_cache
+from src.quotes import quote_engine
+from src.contracts import get_contract
+from src.aio.account import AsyncAccount
+from src.aio.utils import check_allowance, confirm_approve, send_transaction, wait_for_receipt
+from config import TOKENS, LIQUIDITY_AMOUNT, SYNCSWAP_ROUTER_ADDRESS
+
+
+class SyncSwap:
+    def __init__(self, account: AsyncAccount, slippage: float = 0.5, retries: int = 1) -> None:
+        self.w3 = account.w3
+        self.account = account
+        self.retries = retries
+        self.slippage = slippage
+        self.router_address = Web3.to_checksum_address(SYNCSWAP_ROUTER_ADDRESS)
+
+    @rpc_operation('swap', 'syncswap')
+    async def swap(self, from_token: str, to_token: str, amount: int, retry: int = 0) -> bool:
+        address = Web3.to_checksum_address(self.account.address)
+        from_token_address = Web3.to_checksum_address(TOKENS[from_token])
+
+        try:
+            swap_gas = gas_key('syncswap', 'swap', from_token, to_token)
+            approval = None
+            try:
+                if from_token != 'eth':
+                    approval = await check_allowance(self.w3, from_token_address, address, self.router_address, amount, self.account.key, swap_gas)
+
+                pool_address = await self.get_pool_address(from_token, to_token)
+
+                if pool_address == TOKENS['zero_address']:
+                    logging.error(f"{address} | SyncSwap | Pool not exists")
+                    return False
+
+                swap_data = encode(
+                    ["address", "address", "uint8"],
+                    [from_token_address, address, 1]
+                )
+
+                steps = [{
+                    "pool": pool_address,
+                    "data": swap_data,
+                    "callback": TOKENS['zero_address'],
+                    "callbackData": "0x",
+                }]
+
+                paths = [{
+                    "steps": steps,
+                    "tokenIn": from_token_address if from_token != 'eth' else TOKENS['zero_address'],
+                    "amountIn": amount,
+                }]
+
+                router = get_contract(self.w3, self.router_address, 'syncswap_router')
+                amount_out = await self.get_amount_out(from_token, to_token, amount)
+
+                swap_txn = await router.functions.swap(
+                    paths,
+                    int(amount_out - (amount_out * self.slippage // 1000)),
+                    int(time.time() + 1800)
+                ).build_transaction({
+                    'from': address,
+                    'value': amount if from_token.lower() == 'eth' else 0,
+                    'gas': 0,
+                    'gasPrice': await gas_oracle.gas_price_async(self.w3)
+                })
+
+                swap_txn['gas'] = await gas_model.gas_limit_async(self.w3, swap_txn, swap_gas)
+                swap_txn_hash = await send_transaction(self.w3, swap_txn, address, self.account.key, gas_key=swap_gas)
+                status = (await wait_for_receipt(self.w3, swap_txn_hash, address)).status
+            finally:
+                await confirm_approve(self.w3, approval, address)
+
+            if status == 1:
+                trx = f'https://explorer.zksync.io/tx/{swap_txn_hash.hex()}'
+                logging.success(f'{address} | SyncSwap swap: {value_for_logs(from_token, amount)} -> '
+                                f'{value_for_logs(to_token, amount_out)} | TRANSACTION: {trx}')
+                return True
+            else:
+                logging.error(f'{address} | SyncSwap swap {retry}/{self.retries} | {value_for_logs(from_token, amount)}'
+                              f' -> {to_token}')
+
+        except Exception as err:
+            logging.error(f'{address} | SyncSwap swap {retry}/{self.retries} | {value_for_logs(from_token, amount)}'
+                          f' -> {to_token} | {err}')
+
+        if retry < self.retries:
+            await asyncio.sleep(random.randint(35, 60))
+            return await self.swap(from_token, to_token, amount, retry + 1)
+        return False
+
+    @rpc_operation('add_liquidity', 'syncswap')
+    async def add_liquidity(self, from_token: str = 'usdc', to_token: str = 'eth') -> bool:
+        address = Web3.to_checksum_address(self.account.address)
+        pool_address = await self.get_pool_address(from_token, to_token)
+
+        router = get_contract(self.w3, self.router_address, 'syncswap_router')
+
+        amount = int(random.uniform(*LIQUIDITY_AMOUNT) * 10 ** 18)
+
+        if amount > await self.account.get_native_balance():
+            return False
+
+        try:
+            txn = await router.functions.addLiquidity2(
+                pool_address,
+                [
+                    [Web3.to_checksum_address(TOKENS['usdc']), 0],
+                    [Web3.to_checksum_address(TOKENS['zero_address']), amount]
+                ],
+                encode(["address"], [address]),
+                0,
+                TOKENS['zero_address'],
+                "0x"
+            ).build_transaction({
+                'from': address,
+                'value': amount,
+                'gas': 0,
+                'gasPrice': await gas_oracle.gas_price_async(self.w3)
+            })
+
+            liquidity_gas = gas_key('syncswap', 'add_liquidity', from_token, to_token)
+            txn['gas'] = await gas_model.gas_limit_async(self.w3, txn, liquidity_gas)
+            swap_txn_hash = await send_transaction(self.w3, txn, address, self.account.key, gas_key=liquidity_gas)
+            status = (await wait_for_receipt(self.w3, swap_txn_hash, address)).status
+
+            if status == 1:
+                trx = f'https://explorer.zksync.io/tx/{swap_txn_hash.hex()}'
+                logging.success(f'{address} | SyncSwap add liquidity: {from_token} & {to_token} | TRANSACTION: {trx}')
+                return True
+            else:
+                logging.error(f'{address} | SyncSwap add liquidity {from_token} & {to_token}')
+                return False
+        except Exception as err:
+            logging.error(f'{address} | SyncSwap add liquidity error: {err}')
+            return False
+
+    async def get_pool_address(self, from_token: str, to_token: str):
+        return await pool_cache.get_pool_async(self.w3, from_token, to_token)
+
+    async def get_amount_out(self, from_token: str, to_token: str, amount: int):
+        return await quote_engine.syncswap_amount_out_async(self.w3, from_token, to_token, amount, self.account.address)
+
+    @rpc_operation('quote', 'syncswap')
+    async def get_quote(self, from_token: str, to_token: str, amount: int) -> dict:
+        if await self.get_pool_address(from_token, to_token) == TOKENS['zero_address']:
+            raise ValueError('Pool not exists')
+        return {'amount_out': await self.get_amount_out(from_token, to_token, amount), 'gas': None}
@@ -0,0 +1,89 @@
+import re
+import asyncio
+from web3.exceptions import TimeExhausted
+from concurrent.futures import Future
+
+from src.gas import gas_oracle, gas_model, gas_key
+from src.allowances import allowance_ledger
+from src.rpc_metrics import rpc_operation
+from src import journal
+from src.store import offload
+from src.nonce import nonce_manager
+from src.state import get_state
+from src.contracts import get_contract
+from src.receipts import get_watcher, hash_key
+from config import PIPELINE_APPROVE
+
+
+@rpc_operation('approve')
+async def check_allowance(chain, token_address, address, router_address, amount, key, swap_gas: str = None):
+    if allowance_ledger.covers(address, token_address, router_address, amount):
+        allowance_ledger.spend(address, token_address, router_address, amount)
+        return
+
+    token = get_contract(chain, token_address, 'erc20_abi')
+    allowance = await token.functions.allowance(address, router_address).call()
+    allowance_ledger.store(address, token_address, router_address, allowance)
+    if allowance >= amount:
+        allowance_ledger.spend(address, token_address, router_address, amount)
+        return
+
+    approve_amount = allowance_ledger.approve_amount(amount)
+    approve_txn = await token.functions.approve(router_address, approve_amount).build_transaction({
+        'from': address,
+        'gas': 0,
+        'gasPrice': await gas_oracle.gas_price_async(chain)
+    })
+    approve_gas = gas_key('approve', token_address, router_address)
+    approve_txn['gas'] = await gas_model.gas_limit_async(chain, approve_txn, approve_gas)
+
+    approve_txn_hash = await send_transaction(chain, approve_txn, address, key, 'approve', gas_key=approve_gas)
+    approval = {'hash': approve_txn_hash, 'token': token_address, 'spender': router_address, 'amount': approve_amount, 'spend': amount}
+    if PIPELINE_APPROVE and swap_gas and gas_model.ready(swap_gas):
+        approval['receipt'] = get_watcher(chain.provider.endpoint_uri).watch(approve_txn_hash)
+        return approval
+
+    await confirm_approve(chain, approval, address)
+
+
+async def confirm_approve(chain, approval: dict, address):
+    if approval is None:
+        return
+
+    if (await wait_for_receipt(chain, approval['hash'], address, future=approval.get('receipt'))).status == 1:
+        allowance_ledger.store(address, approval['token'], approval['spender'], approval['amount'])
+    allowance_ledger.spend(address, approval['token'], approval['spender'], approval['spend'])
+
+
+async def send_transaction(chain, txn, address, key, kind: str = 'tx', retry: bool = True, gas_key: str = None):
+    txn['nonce'] = await nonce_manager.allocate_async(chain, address)
+    signed_txn = chain.eth.account.sign_transaction(txn, key)
+    await offload(journal.record, chain, address, signed_txn.hash, txn['nonce'], kind)
+
+    try:
+        txn_hash = await chain.eth.send_raw_transaction(signed_txn.rawTransaction)
+        if gas_key:
+            gas_model.track(txn_hash, gas_key, txn['gas'])
+        return txn_hash
+    except Exception as err:
+        nonce_manager.resync(chain, address)
+        if isinstance(err, ValueError):
+            await offload(journal.discard, signed_txn.hash)
+        if retry and re.search(r'nonce (is )?too low', str(err), re.IGNORECASE):
+            return await send_transaction(chain, txn, address, key, kind, False, gas_key)
+        raise
+
+
+async def wait_for_receipt(chain, txn_hash, address, timeout: int = 300, future: Future = None):
+    watcher = get_watcher(chain.provider.endpoint_uri)
+
+    try:
+        receipt = await asyncio.wait_for(asyncio.wrap_future(future or watcher.watch(txn_hash)), timeout)
+        await offload(journal.resolve, txn_hash, receipt.status)
+        await offload(gas_model.observe, txn_hash, receipt)
+        get_state(address).apply(receipt)
+        return receipt
+    except asyncio.TimeoutError:
+        watcher.forget(txn_hash)
+        nonce_manager.resync(chain, address)
+        raise TimeExhausted(f'Transaction {hash_key(txn_hash)} is not in the chain after {timeout} seconds')
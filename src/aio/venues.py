@@ -0,0 +1,32 @@
+import time
+import asyncio
+
+from src.venues import failed_row, rank
+from config import QUOTE_DEADLINE
+
+
+async def timed_quote(dapp, from_token: str, to_token: str, amount: int) -> dict:
+    started = time.monotonic()
+    quote = await dapp.get_quote(from_token, to_token, amount)
+    return {**quote, 'latency': time.monotonic() - started}
+
+
+async def quote_venues(dapps: dict, from_token: str, to_token: str, amount: int, deadline: float = QUOTE_DEADLINE) -> list[dict]:
+    tasks = {
+        asyncio.ensure_future(timed_quote(dapp, from_token, to_token, amount)): name
+        for name, dapp in dapps.items()
+    }
+    done, pending = await asyncio.wait(tasks, timeout=deadline)
+    for task in pending:
+        task.cancel()
+
+    rows = []
+    for task, name in tasks.items():
+        if task in pending:
+            rows.append(failed_row(name, 'timeout', deadline))
+        elif task.exception() is not None:
+            rows.append(failed_row(name, str(task.exception()) or type(task.exception()).__name__))
+        else:
+            rows.append({'venue': name, 'error': None, **task.result()})
+
+    return rank(rows)
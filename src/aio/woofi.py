@@ -0,0 +1,87 @@
+import random
+import asyncio
+from web3 import Web3
+from loguru import logger as logging
+
+from src.gas import gas_oracle, gas_model, gas_key
+from src.rpc_metrics import rpc_operation
+from src.utils import value_for_logs
+from src.contracts import get_contract
+from src.aio.account import AsyncAccount
+from src.aio.utils import check_allowance, confirm_approve, send_transaction, wait_for_receipt
+from config import TOKENS, WOOFI_ROUTER_ADDRESS
+
+
+class WooFi:
+    def __init__(self, account: AsyncAccount, slippage: float = 0.5, retries: int = 2):
+        self.w3 = account.w3
+        self.account = account
+        self.retries = retries
+        self.slippage = slippage
+        self.router_address = Web3.to_checksum_address(WOOFI_ROUTER_ADDRESS)
+        self.router = get_contract(self.w3, self.router_address, 'woofi_router')
+
+    @rpc_operation('swap', 'woofi')
+    async def swap(self, from_token: str, to_token: str, amount: int, retry: int = 0) -> bool:
+        eth = "0xEeeeeEeeeEeEeeEeEeEeeEEEeeeeEeeeeeeeEEeE"
+        address = Web3.to_checksum_address(self.account.address)
+        from_token_address = Web3.to_checksum_address(TOKENS[from_token] if from_token != 'eth' else eth)
+        to_token_address = Web3.to_checksum_address(TOKENS[to_token] if to_token != 'eth' else eth)
+
+        try:
+            swap_gas = gas_key('woofi', 'swap', from_token, to_token)
+            approval = None
+            try:
+                if from_token != 'eth':
+                    approval = await check_allowance(self.w3, from_token_address, address, self.router_address, amount, self.account.key, swap_gas)
+
+                amount_out = await self.router.functions.tryQuerySwap(from_token_address, to_token_address, amount).call()
+                gas_price = await gas_oracle.gas_price_async(self.w3)
+
+                swap_txn = await self.router.functions.swap(
+                    from_token_address,
+                    to_token_address,
+                    amount,
+                    int(amount_out - (amount_out * self.slippage // 1000)),
+                    address,
+                    address
+                ).build_transaction({
+                    'from': address,
+                    'value': amount if from_token == 'eth' else 0,
+                    'gas': 0,
+                    'maxFeePerGas': gas_price,
+                    'maxPriorityFeePerGas': gas_price
+                })
+
+                swap_txn['gas'] = await gas_model.gas_limit_async(self.w3, swap_txn, swap_gas)
+                swap_txn_hash = await send_transaction(self.w3, swap_txn, address, self.account.key, gas_key=swap_gas)
+                status = (await wait_for_receipt(self.w3, swap_txn_hash, address)).status
+            finally:
+                await confirm_approve(self.w3, approval, address)
+
+            if status == 1:
+                trx = f'https://explorer.zksync.io/tx/{swap_txn_hash.hex()}'
+                logging.success(f'{address} | WOOFi swap: {value_for_logs(from_token, amount)} -> '
+                                f'{value_for_logs(to_token, amount_out)} | TRANSACTION: {trx}')
+                return True
+            else:
+                logging.error(f'{address} | WOOFi swap {retry}/{self.retries} | {value_for_logs(from_token, amount)}'
+                              f' -> {to_token}')
+
+        except Exception as err:
+            logging.error(f'{address} | WOOFi swap {retry}/{self.retries} | {value_for_logs(from_token, amount)}'
+                          f' -> {to_token} | {err}')
+
+        if retry < self.retries:
+            await asyncio.sleep(random.randint(35, 60))
+            return await self.swap(from_token, to_token, amount, retry + 1)
+        return False
+
+    @rpc_operation('quote', 'woofi')
+    async def get_quote(self, from_token: str, to_token: str, amount: int) -> dict:
+        eth = "0xEeeeeEeeeEeEeeEeEeEeeEEEeeeeEeeeeeeeEEeE"
+        from_token_address = Web3.to_checksum_address(TOKENS[from_token] if from_token != 'eth' else eth)
+        to_token_address = Web3.to_checksum_address(TOKENS[to_token] if to_token != 'eth' else eth)
+
+        amount_out = await self.router.functions.tryQuerySwap(from_token_address, to_token_address, amount).call()
+        return {'amount_out': amount_out, 'gas': None}
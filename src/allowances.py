@@ -0,0 +1,50 @@
+import threading
+from web3 import Web3
+
+from config import APPROVE_HEADROOM
+
+MAX_UINT256 = 2 ** 256 - 1
+
+
+def allowance_key(owner: str, token: str, spender: str) -> tuple[str, str, str]:
+    return Web3.to_checksum_address(owner), Web3.to_checksum_address(token), Web3.to_checksum_address(spender)
+
+
+class AllowanceLedger:
+    def __init__(self, headroom: float = APPROVE_HEADROOM):
+        self.headroom = headroom
+        self.lock = threading.Lock()
+        self.allowances = dict()
+        self.hits = 0
+        self.misses = 0
+
+    def covers(self, owner: str, token: str, spender: str, amount: int) -> bool:
+        with self.lock:
+            allowance = self.allowances.get(allowance_key(owner, token, spender))
+            if allowance is not None and allowance >= amount:
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+
+    def store(self, owner: str, token: str, spender: str, allowance: int):
+        with self.lock:
+            self.allowances[allowance_key(owner, token, spender)] = allowance
+
+    def spend(self, owner: str, token: str, spender: str, amount: int):
+        key = allowance_key(owner, token, spender)
+        with self.lock:
+            allowance = self.allowances.get(key)
+            if allowance is not None and allowance != MAX_UINT256:
+                self.allowances[key] = max(0, allowance - amount)
+
+    def approve_amount(self, amount: int) -> int:
+        if not self.headroom:
+            return MAX_UINT256
+        return int(amount * max(self.headroom, 1))
+
+    def stats(self) -> dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+allowance_ledger = AllowanceLedger()
@@ -0,0 +1,102 @@
+import json
+import time
+import random
+import threading
+import requests
+from loguru import logger as logging
+
+from src.providers import create_session
+from config import PROXY, API_POOL_SIZE, API_TIMEOUT, API_RETRIES, API_BACKOFF, API_CACHE_TTL
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def get_proxy():
+    proxy = PROXY.split(':')
+    if len(proxy) != 4:
+        return None
+    return f'http://{proxy[2]}:{proxy[3]}@{proxy[0]}:{proxy[1]}'
+
+
+def cache_key(url: str, data: dict = None) -> tuple:
+    return url, json.dumps(data, sort_keys=True) if data else None
+
+
+def backoff_delay(attempt: int, retry_after: str = None) -> float:
+    try:
+        if retry_after:
+            return min(float(retry_after), 60)
+    except ValueError:
+        pass
+    return API_BACKOFF * 2 ** attempt + random.uniform(0, API_BACKOFF)
+
+
+class ResponseCache:
+    def __init__(self, ttl: float = API_CACHE_TTL):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.responses = dict()
+
+    def get(self, key: tuple):
+        with self.lock:
+            cached = self.responses.get(key)
+            if cached and time.monotonic() - cached[1] < self.ttl:
+                return cached[0]
+            self.responses.pop(key, None)
+
+    def put(self, key: tuple, response):
+        with self.lock:
+            self.responses[key] = (response, time.monotonic())
+
+
+class ApiClient:
+    def __init__(self, timeout=API_TIMEOUT, retries: int = API_RETRIES):
+        self.timeout = timeout
+        self.retries = retries
+        self.proxy = get_proxy()
+        self.session = create_session(API_POOL_SIZE)
+        self.cache = ResponseCache()
+
+    def send(self, url: str, data: dict, proxies: dict):
+        if data:
+            return self.session.post(url, json=data, proxies=proxies, timeout=self.timeout)
+        return self.session.get(url, proxies=proxies, timeout=self.timeout)
+
+    def get_api_call_data(self, url: str, data: dict = None, use_proxy: bool = False, cache: bool = False):
+        key = cache_key(url, data)
+        if cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        proxies = {'http': self.proxy, 'https': self.proxy} if use_proxy and self.proxy else None
+        attempt = 0
+        while True:
+            try:
+                response = self.send(url, data, proxies)
+            except requests.exceptions.ProxyError:
+                if proxies is None:
+                    raise
+                logging.warning(f'Прокси недоступен, повторяем запрос без прокси: {url}')
+                proxies = None
+                continue
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+                time.sleep(backoff_delay(attempt))
+                attempt += 1
+                continue
+
+            if response.status_code == 200:
+                api_data = response.json()
+                if cache:
+                    self.cache.put(key, api_data)
+                return api_data
+
+            if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                return False
+            time.sleep(backoff_delay(attempt, response.headers.get('Retry-After')))
+            attempt += 1
+
+
+api_client = ApiClient()
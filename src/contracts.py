@@ -0,0 +1,37 @@
+import os
+import json
+from web3 import Web3, AsyncWeb3
+
+ABIS_DIR = 'ABIs'
+
+
+def load_abis(path: str = ABIS_DIR) -> dict[str, list]:
+    abis = dict()
+    for file_name in sorted(os.listdir(path)):
+        name, ext = os.path.splitext(file_name)
+        if ext != '.json':
+            continue
+        with open(os.path.join(path, file_name)) as file:
+            abis[name] = json.load(file)
+
+    return abis
+
+
+ABIS = load_abis()
+_contracts = dict()
+
+
+def get_abi(name: str) -> list:
+    return ABIS[name]
+
+
+def get_contract(w3, address: str, abi_name: str):
+    address = Web3.to_checksum_address(address)
+    key = (w3.provider.endpoint_uri, isinstance(w3, AsyncWeb3), address, abi_name)
+
+    contract = _contracts.get(key)
+    if contract is None:
+        contract = w3.eth.contract(address=address, abi=ABIS[abi_name])
+        _contracts[key] = contract
+
+    return contract
@@ -0,0 +1,100 @@
+import time
+import threading
+from web3 import Web3
+from loguru import logger as logging
+from eth_utils import event_abi_to_log_topic
+from web3.datastructures import AttributeDict
+from web3._utils.method_formatters import receipt_formatter
+from concurrent.futures import Future
+
+from src.providers import get_web3
+from src.contracts import get_abi
+from src.receipts import hash_key
+from src.rpc_metrics import rpc_operation
+from config import RPC, OFFICIAL_BRIDGE, DEPOSIT_POLL_INTERVAL, DEPOSIT_TIMEOUT
+
+NEW_PRIORITY_REQUEST = event_abi_to_log_topic(
+    next(item for item in get_abi('main_bridge') if item.get('name') == 'NewPriorityRequest')
+)
+
+
+def priority_hash(receipt) -> str:
+    for log in receipt.get('logs', []):
+        if log['address'].lower() != OFFICIAL_BRIDGE.lower() or not log['topics']:
+            continue
+        if bytes(log['topics'][0]) == NEW_PRIORITY_REQUEST:
+            return Web3.to_hex(bytes(log['data'])[32:64])
+
+
+class DepositTracker:
+    def __init__(self, endpoint=RPC, poll_interval: float = DEPOSIT_POLL_INTERVAL, timeout: float = DEPOSIT_TIMEOUT):
+        self.w3 = get_web3(endpoint)
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.pending = dict()
+        self.thread = None
+        self.executed = 0
+        self.expired = 0
+
+    def track(self, l2_hash, address: str) -> Future:
+        l2_hash = hash_key(l2_hash)
+
+        with self.lock:
+            entry = self.pending.get(l2_hash)
+            if entry is None:
+                entry = (Future(), time.monotonic() + self.timeout, address)
+                self.pending[l2_hash] = entry
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+
+        return entry[0]
+
+    @rpc_operation('deposit_tracker', 'bridge')
+    def run(self):
+        while True:
+            with self.lock:
+                if not self.pending:
+                    self.thread = None
+                    return
+                hashes = list(self.pending)
+
+            try:
+                self.resolve(hashes)
+            except Exception as err:
+                logging.warning(f'Deposit tracker | {err}')
+
+            self.expire()
+            time.sleep(self.poll_interval)
+
+    def resolve(self, hashes: list[str]):
+        receipts = self.w3.provider.make_batch_request([('eth_getTransactionReceipt', [l2_hash]) for l2_hash in hashes])
+
+        for l2_hash, receipt in zip(hashes, receipts):
+            if receipt is None:
+                continue
+            with self.lock:
+                entry = self.pending.pop(l2_hash, None)
+                self.executed += entry is not None
+            if entry is not None and entry[0].set_running_or_notify_cancel():
+                entry[0].set_result(AttributeDict.recursive(receipt_formatter(receipt)))
+
+    def expire(self):
+        now = time.monotonic()
+        with self.lock:
+            expired = [(l2_hash, entry) for l2_hash, entry in self.pending.items() if entry[1] <= now]
+            for l2_hash, _ in expired:
+                del self.pending[l2_hash]
+            self.expired += len(expired)
+
+        for l2_hash, (future, _, address) in expired:
+            logging.warning(f'{address} | Депозит {l2_hash} не исполнен в zkSync Era за {self.timeout} секунд')
+            if future.set_running_or_notify_cancel():
+                future.set_result(None)
+
+    def stats(self) -> dict[str, int]:
+        return {'executed': self.executed, 'expired': self.expired}
+
+
+deposit_tracker = DepositTracker()
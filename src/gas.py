@@ -0,0 +1,130 @@
+import time
+import threading
+from web3 import Web3
+
+from src.store import get_store, offload
+from config import GAS_PRICE_TTL, GAS_MODEL_MIN_SAMPLES, GAS_MODEL_MARGIN, GAS_MODEL_WINDOW
+
+
+class GasOracle:
+    def __init__(self, ttl: float = GAS_PRICE_TTL):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.prices = dict()
+        self.hits = 0
+        self.misses = 0
+
+    def gas_price(self, w3: Web3) -> int:
+        gas_price = self.cached(w3)
+        if gas_price is None:
+            gas_price = self.store(w3, w3.eth.gas_price)
+        return gas_price
+
+    async def gas_price_async(self, w3) -> int:
+        gas_price = self.cached(w3)
+        if gas_price is None:
+            gas_price = self.store(w3, await w3.eth.gas_price)
+        return gas_price
+
+    def cached(self, w3):
+        with self.lock:
+            cached = self.prices.get(w3.provider.endpoint_uri)
+            if cached and time.monotonic() - cached[1] < self.ttl:
+                self.hits += 1
+                return cached[0]
+
+    def store(self, w3, gas_price: int) -> int:
+        with self.lock:
+            self.misses += 1
+            self.prices[w3.provider.endpoint_uri] = (gas_price, time.monotonic())
+        return gas_price
+
+    def stats(self) -> dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+def gas_key(venue: str, method: str, *tokens: str) -> str:
+    return ':'.join([venue, method, *tokens])
+
+
+class GasModel:
+    def __init__(self, min_samples: int = GAS_MODEL_MIN_SAMPLES, margin: float = GAS_MODEL_MARGIN,
+                 window: int = GAS_MODEL_WINDOW):
+        self.min_samples = min_samples
+        self.margin = margin
+        self.window = window
+        self.lock = threading.Lock()
+        self.samples = None
+        self.estimates = None
+        self.pending = dict()
+        self.hits = 0
+        self.misses = 0
+
+    def load(self):
+        if self.samples is None:
+            self.samples = get_store().load_gas_samples()
+            self.estimates = get_store().load_gas_estimates()
+
+    def limit(self, key: str):
+        with self.lock:
+            self.load()
+            if self.learned(key):
+                self.hits += 1
+                return max(int(max(self.samples[key]) * (1 + self.margin)), self.estimates[key])
+            self.misses += 1
+
+    def learned(self, key: str) -> bool:
+        return bool(self.min_samples) and len(self.samples.get(key, [])) >= self.min_samples and key in self.estimates
+
+    def ready(self, key: str) -> bool:
+        with self.lock:
+            self.load()
+            return self.learned(key)
+
+    def estimated(self, key: str, estimate: int) -> int:
+        with self.lock:
+            self.load()
+            self.estimates[key] = estimate
+        get_store().save_gas_estimate(key, estimate)
+        return estimate
+
+    def gas_limit(self, w3: Web3, txn: dict, key: str, scale: float = 1) -> int:
+        limit = self.limit(key)
+        if limit is None:
+            limit = self.estimated(key, int(w3.eth.estimate_gas(txn) * scale))
+        return limit
+
+    async def gas_limit_async(self, w3, txn: dict, key: str, scale: float = 1) -> int:
+        limit = self.limit(key)
+        if limit is None:
+            limit = await offload(self.estimated, key, int(await w3.eth.estimate_gas(txn) * scale))
+        return limit
+
+    def track(self, txn_hash, key: str, gas_limit: int):
+        with self.lock:
+            self.pending[Web3.to_hex(txn_hash)] = (key, gas_limit)
+
+    def observe(self, txn_hash, receipt):
+        with self.lock:
+            entry = self.pending.pop(Web3.to_hex(txn_hash), None)
+            if entry is None:
+                return
+
+            key, gas_limit = entry
+            self.load()
+            if receipt.status == 1:
+                samples = (self.samples.get(key, []) + [receipt.gasUsed])[-self.window:]
+            elif receipt.gasUsed >= gas_limit * 0.95:
+                samples = []
+            else:
+                return
+            self.samples[key] = samples
+
+        get_store().save_gas_samples(key, samples)
+
+    def stats(self) -> dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+gas_oracle = GasOracle()
+gas_model = GasModel()
@@ -1,13 +1,13 @@
-import time
-import json
 import random
-import requests
 from web3 import Web3
 from loguru import logger as logging
 
+from src.gas import gas_oracle, gas_model, gas_key
+from src.rpc_metrics import rpc_operation
+from src.api import api_client
 from src.account import Account
-from src.utils import check_allowance, value_for_logs
-from config import TOKENS, INCH_ROUTER_ADDRESS, GAS_THRESHOLD
+from src.utils import check_allowance, confirm_approve, send_transaction, wait_for_receipt, value_for_logs
+from config import TOKENS, INCH_ROUTER_ADDRESS
 
 
 class Inch:
@@ -17,6 +17,7 @@ class Inch:
         self.retries = retries
         self.router_address = Web3.to_checksum_address(INCH_ROUTER_ADDRESS)
 
+    @rpc_operation('swap', 'inch')
     def swap(self, from_token: str, to_token: str, amount: int, retry: int = 0) -> bool:
         eth = "0xEeeeeEeeeEeEeeEeEeEeeEEEeeeeEeeeeeeeEEeE"
         address = Web3.to_checksum_address(self.account.address)
@@ -25,27 +26,33 @@ class Inch:
             from_token_address = Web3.to_checksum_address(TOKENS[from_token] if from_token != 'eth' else eth)
             to_token_address = Web3.to_checksum_address(TOKENS[to_token] if to_token != 'eth' else eth)
 
-            if from_token != 'eth':
-                token = self.w3.eth.contract(address=from_token_address, abi=json.load(open('ABIs/erc20_abi.json')))
-                check_allowance(self.w3, token, address, self.router_address, amount, self.account.key)
+            swap_gas = gas_key('inch', 'swap', from_token, to_token)
+            approval = None
+            try:
+                if from_token != 'eth':
+                    approval = yield from check_allowance(self.w3, from_token_address, address, self.router_address, amount, self.account.key, swap_gas)
 
-            swap_quote = f'https://api-defillama.1inch.io/v5.0/{self.w3.eth.chain_id}/swap?fromTokenAddress={from_token_address}&toTokenAddress={to_token_address}&amount={amount}&fromAddress={address}&slippage=5'
-            # swap_quote = f'https://api.1inch.io/v5.0/{self.w3.eth.chain_id}/swap?fromTokenAddress={from_token_address}&toTokenAddress={to_token_address}&amount={amount}&fromAddress={address}&slippage={5}'
+                swap_quote = f'https://api-defillama.1inch.io/v5.0/{self.w3.eth.chain_id}/swap?fromTokenAddress={from_token_address}&toTokenAddress={to_token_address}&amount={amount}&fromAddress={address}&slippage=5'
+                # swap_quote = f'https://api.1inch.io/v5.0/{self.w3.eth.chain_id}/swap?fromTokenAddress={from_token_address}&toTokenAddress={to_token_address}&amount={amount}&fromAddress={address}&slippage={5}'
 
-            tx = self.get_api_call_data(swap_quote)
+                if approval:
+                    swap_quote += '&disableEstimate=true'
 
-            tx = tx['tx']
-            tx['nonce'] = self.w3.eth.get_transaction_count(address)
-            tx['to'] = self.router_address
-            tx['value'] = int(tx['value'])
-            tx['maxFeePerGas'] = self.w3.eth.gas_price
-            tx['maxPriorityFeePerGas'] = self.w3.eth.gas_price
-            tx['chainId'] = self.w3.eth.chain_id
-            tx['gas'] = random.randint(900000, 950000) if GAS_THRESHOLD < 21 else self.w3.eth.estimate_gas(tx)
-            del tx['gasPrice']
+                tx = self.get_api_call_data(swap_quote)
 
-            swap_txn_hash = self.sign_trans(tx, self.account.key)
-            status = self.w3.eth.wait_for_transaction_receipt(swap_txn_hash, timeout=300).status
+                tx = tx['tx']
+                tx['to'] = self.router_address
+                tx['value'] = int(tx['value'])
+                tx['maxFeePerGas'] = gas_oracle.gas_price(self.w3)
+                tx['maxPriorityFeePerGas'] = gas_oracle.gas_price(self.w3)
+                tx['chainId'] = self.w3.eth.chain_id
+                tx['gas'] = gas_model.gas_limit(self.w3, tx, swap_gas)
+                del tx['gasPrice']
+
+                swap_txn_hash = send_transaction(self.w3, tx, address, self.account.key, gas_key=swap_gas)
+                status = (yield from wait_for_receipt(self.w3, swap_txn_hash, address)).status
+            finally:
+                yield from confirm_approve(self.w3, approval, address)
 
             if status == 1:
                 trx = f'https://explorer.zksync.io/tx/{swap_txn_hash.hex()}'
@@ -56,8 +63,8 @@ class Inch:
                 logging.error(f'{address} | 1inch swap {retry}/{self.retries} | {value_for_logs(from_token, amount)}'
                               f' -> {to_token}')
                 if retry < self.retries:
-                    time.sleep(random.randint(35, 60))
-                    self.swap(from_token, to_token, amount, retry + 1)
+                    yield random.randint(35, 60)
+                    return (yield from self.swap(from_token, to_token, amount, retry + 1))
                 else:
                     return False
 
@@ -65,24 +72,21 @@ class Inch:
             logging.error(f'{address} | 1inch swap {retry}/{self.retries} | {value_for_logs(from_token, amount)}'
                           f' -> {to_token} | {err}')
             if retry < self.retries:
-                time.sleep(random.randint(35, 60))
-                self.swap(from_token, to_token, amount, retry + 1)
+                yield random.randint(35, 60)
+                return (yield from self.swap(from_token, to_token, amount, retry + 1))
             else:
                 return False
 
-    def sign_trans(self, swap_txn, key):
-        signed_swap_txn = self.w3.eth.account.sign_transaction(swap_txn, key)
-        swap_txn_hash = self.w3.eth.send_raw_transaction(signed_swap_txn.rawTransaction)
-        return swap_txn_hash
-
     @staticmethod
-    def get_api_call_data(url):
-        try:
-            response = requests.get(url)
-        except Exception:
-            response = requests.get(url)
-        if response.status_code == 200:
-            api_data = response.json()
-            return api_data
-        else:
-            return False
+    def get_api_call_data(url, cache=False):
+        return api_client.get_api_call_data(url, cache=cache)
+
+    @rpc_operation('quote', 'inch')
+    def get_quote(self, from_token: str, to_token: str, amount: int) -> dict:
+        eth = "0xEeeeeEeeeEeEeeEeEeEeeEEEeeeeEeeeeeeeEEeE"
+        from_token_address = Web3.to_checksum_address(TOKENS[from_token] if from_token != 'eth' else eth)
+        to_token_address = Web3.to_checksum_address(TOKENS[to_token] if to_token != 'eth' else eth)
+
+        quote_url = f'https://api-defillama.1inch.io/v5.0/324/quote?fromTokenAddress={from_token_address}&toTokenAddress={to_token_address}&amount={amount}'
+        quote = self.get_api_call_data(quote_url, cache=True)
+        return {'amount_out': int(quote['toTokenAmount']), 'gas': quote.get('estimatedGas')}
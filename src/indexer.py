@@ -0,0 +1,162 @@
+import time
+import threading
+from web3 import Web3
+from loguru import logger as logging
+
+from src.store import get_store
+from src.state import L2_ETH_TOKEN, TRANSFER, MINT
+from src.multicall import STABLES, get_balances
+from src.rpc_metrics import rpc_operation
+from config import TOKENS, INDEXER_POLL_INTERVAL, INDEXER_BLOCK_RANGE, INDEXER_CHECKPOINT_INTERVAL
+
+TOPIC_CHUNK = 500
+MAX_CATCHUP_RANGES = 50
+TRANSFER_TOPIC = Web3.to_hex(TRANSFER)
+MINT_TOPIC = Web3.to_hex(MINT)
+
+
+def address_topic(address: str) -> str:
+    return '0x' + '00' * 12 + address[2:].lower()
+
+
+class BalanceIndexer:
+    def __init__(self, poll_interval: float = INDEXER_POLL_INTERVAL, block_range: int = INDEXER_BLOCK_RANGE,
+                 checkpoint_interval: float = INDEXER_CHECKPOINT_INTERVAL):
+        self.poll_interval = poll_interval
+        self.max_block_range = block_range
+        self.block_range = block_range
+        self.checkpoint_interval = checkpoint_interval
+        self.lock = threading.Lock()
+        self.tokens = {L2_ETH_TOKEN: 'eth', **{TOKENS[symbol].lower(): symbol for symbol in STABLES}}
+        self.w3 = None
+        self.addresses = []
+        self.balances = dict()
+        self.block = None
+        self.synced_at = 0
+        self.checkpoint_at = 0
+        self.thread = None
+        self.stopped = threading.Event()
+        self.logs = 0
+        self.reads = 0
+
+    def start(self, w3: Web3, addresses: list[str]):
+        self.w3 = w3
+        self.addresses = sorted({Web3.to_checksum_address(address) for address in addresses})
+        self.load()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.checkpoint()
+
+    def load(self):
+        block, balances = get_store().load_balances()
+        head = self.w3.eth.block_number
+
+        if block is None or set(self.addresses) - set(balances) or head - block > self.max_block_range * MAX_CATCHUP_RANGES:
+            self.seed(head)
+            return
+
+        with self.lock:
+            self.block = block
+            self.balances = {address: balances[address] for address in self.addresses}
+
+    @rpc_operation('balance_indexer')
+    def seed(self, block: int):
+        balances = get_balances(self.w3, self.addresses, block_identifier=block)
+        with self.lock:
+            self.block = block
+            self.balances = balances
+            self.synced_at = time.monotonic()
+        self.checkpoint()
+
+    def checkpoint(self):
+        with self.lock:
+            block, balances = self.block, {address: dict(row) for address, row in self.balances.items()}
+        if block is not None:
+            get_store().save_balances(block, balances)
+            self.checkpoint_at = time.monotonic()
+
+    @rpc_operation('balance_indexer')
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                self.sync()
+            except Exception as err:
+                self.block_range = max(1, self.block_range // 2)
+                logging.warning(f'Balance indexer | {err}')
+
+            if time.monotonic() - self.checkpoint_at >= self.checkpoint_interval:
+                self.checkpoint()
+            self.stopped.wait(self.poll_interval)
+
+    def sync(self):
+        batch = self.w3.provider.pinned_batch()
+        head = int(batch([('eth_blockNumber', [])])[0], 16)
+
+        while self.block < head and not self.stopped.is_set():
+            to_block = min(head, self.block + self.block_range)
+            logs = self.fetch(batch, self.block + 1, to_block)
+            with self.lock:
+                self.apply(logs)
+                self.block = to_block
+            self.logs += len(logs)
+
+        self.block_range = min(self.block_range * 2, self.max_block_range)
+        self.synced_at = time.monotonic()
+
+    def fetch(self, batch, from_block: int, to_block: int) -> list[dict]:
+        log_filter = {'fromBlock': hex(from_block), 'toBlock': hex(to_block), 'address': list(self.tokens)}
+        calls = []
+        for i in range(0, len(self.addresses), TOPIC_CHUNK):
+            topics = [address_topic(address) for address in self.addresses[i:i + TOPIC_CHUNK]]
+            calls.append(('eth_getLogs', [{**log_filter, 'topics': [[TRANSFER_TOPIC, MINT_TOPIC], topics]}]))
+            calls.append(('eth_getLogs', [{**log_filter, 'topics': [TRANSFER_TOPIC, None, topics]}]))
+
+        results = batch(calls)
+        if any(result is None for result in results):
+            raise ValueError(f'eth_getLogs {from_block}-{to_block} не выполнен')
+
+        logs = dict()
+        for result in results:
+            for log in result:
+                logs[(log['transactionHash'], log['logIndex'])] = log
+        return [logs[key] for key in sorted(logs, key=lambda key: (int(logs[key]['blockNumber'], 16), int(key[1], 16)))]
+
+    def apply(self, logs: list[dict]):
+        for log in logs:
+            symbol = self.tokens.get(log['address'].lower())
+            if symbol is None or log.get('removed'):
+                continue
+
+            parties = [Web3.to_checksum_address('0x' + topic[-40:]) for topic in log['topics'][1:]]
+            if len(parties) == 2:
+                sender, recipient = parties
+            elif len(parties) == 1 and symbol == 'eth' and log['topics'][0] == MINT_TOPIC:
+                sender, recipient = None, parties[0]
+            else:
+                continue
+
+            value = int(log['data'], 16)
+            if sender in self.balances:
+                self.balances[sender][symbol] = self.balances[sender].get(symbol, 0) - value
+            if recipient in self.balances:
+                self.balances[recipient][symbol] = self.balances[recipient].get(symbol, 0) + value
+
+    def get(self, address: str, block: int = 0):
+        with self.lock:
+            live = time.monotonic() - self.synced_at < self.poll_interval * 10
+            balances = self.balances.get(address)
+            if not live or balances is None or self.block < block:
+                return None
+            self.reads += 1
+            return dict(balances)
+
+    def stats(self) -> dict[str, int]:
+        return {'block': self.block, 'logs': self.logs, 'reads': self.reads}
+
+
+balance_indexer = BalanceIndexer()
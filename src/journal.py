@@ -0,0 +1,107 @@
+import time
+import uuid
+import threading
+from web3 import Web3
+from loguru import logger as logging
+from concurrent.futures import TimeoutError
+
+from src.store import get_store
+from src.rpc_metrics import rpc_operation
+from src.receipts import get_watcher
+from config import RECONCILE_TIMEOUT
+
+_intents = dict()
+_lock = threading.Lock()
+
+
+def begin(address: str, dapp: str, action: str, progress: str = None) -> dict:
+    intent = {'id': uuid.uuid4().hex, 'dapp': dapp, 'action': action, 'progress': progress}
+    with _lock:
+        _intents[address] = intent
+    return intent
+
+
+def current(address: str):
+    with _lock:
+        return _intents.get(address)
+
+
+def end(address: str):
+    with _lock:
+        intent = _intents.pop(address, None)
+    return intent and intent['id']
+
+
+def abandon(address: str):
+    intent_id = end(address)
+    if intent_id:
+        get_store().journal_abandon(intent_id)
+
+
+def record(chain, address: str, txn_hash, nonce: int, kind: str):
+    get_store().journal_record(Web3.to_hex(txn_hash), address, chain.provider.endpoint_uri, nonce, kind, current(address))
+
+
+def resolve(txn_hash, status: int):
+    get_store().journal_resolve(Web3.to_hex(txn_hash), status)
+
+
+def discard(txn_hash):
+    get_store().journal_discard(Web3.to_hex(txn_hash))
+
+
+def apply_intent(progress: dict, key: str):
+    if key == 'bridge':
+        progress[key] = False
+    else:
+        progress[key] -= 1
+
+
+@rpc_operation('reconcile')
+def reconcile(db: dict, timeout: float = RECONCILE_TIMEOUT):
+    store = get_store()
+    entries = store.journal_entries()
+    if not entries:
+        return
+
+    logging.info(f'Журнал | Незавершенных транзакций: {len(entries)}, проверяем по блокчейну')
+
+    futures = {
+        entry['txn_hash']: get_watcher(entry['endpoint']).watch(entry['txn_hash'])
+        for entry in entries if entry['status'] is None
+    }
+    deadline = time.monotonic() + timeout
+    for entry in entries:
+        future = futures.get(entry['txn_hash'])
+        if future is None:
+            continue
+        try:
+            entry['status'] = future.result(max(deadline - time.monotonic(), 0)).status
+        except TimeoutError:
+            get_watcher(entry['endpoint']).forget(entry['txn_hash'])
+            logging.warning(f'{entry["address"]} | Транзакция {entry["txn_hash"]} не найдена в сети')
+
+    intents = dict()
+    for entry in entries:
+        if entry['intent'] is None:
+            store.journal_discard(entry['txn_hash'])
+            continue
+        intents.setdefault(entry['intent']['id'], []).append(entry)
+
+    for intent_id, intent_entries in intents.items():
+        address, intent = intent_entries[0]['address'], intent_entries[0]['intent']
+        completed = any(entry['kind'] == 'tx' and entry['status'] == 1 for entry in intent_entries)
+
+        if completed and intent['progress'] and address in db:
+            progress = db[address]
+            apply_intent(progress, intent['progress'])
+            logging.info(f'{address} | Журнал | Учтена завершенная транзакция: {intent["dapp"]} {intent["action"]}')
+
+            if progress['transactions'] <= 0:
+                del db[address]
+                store.delete(address, intent_id)
+            else:
+                store.save(address, progress, intent_id)
+        else:
+            for entry in intent_entries:
+                store.journal_discard(entry['txn_hash'])
@@ -0,0 +1,61 @@
+import hashlib
+from web3 import Web3
+from loguru import logger as logging
+from eth_account import Account as EvmAccount
+
+from src.store import get_store
+
+
+def iter_keys(path: str):
+    with open(path, 'r') as keys_file:
+        for line in keys_file:
+            key = line.strip()
+            if key:
+                yield key
+
+
+def key_fingerprint(key: str) -> str:
+    return hashlib.sha256(key.removeprefix('0x').lower().encode()).hexdigest()
+
+
+class WalletHandle:
+    __slots__ = ('key', 'address', 'account_class', 'account')
+
+    def __init__(self, key: str, address: str, account_class):
+        self.key = key
+        self.address = address
+        self.account_class = account_class
+        self.account = None
+
+    def load(self):
+        if self.account is None:
+            self.account = self.account_class(self.key)
+        return self.account
+
+    def release(self):
+        self.account = None
+
+
+def load_wallets(path: str, account_class) -> list[WalletHandle]:
+    store = get_store()
+    index = store.load_key_index()
+    wallets, derived, seen, duplicates = [], dict(), set(), 0
+
+    for key in iter_keys(path):
+        fingerprint = key_fingerprint(key)
+        if fingerprint in seen:
+            duplicates += 1
+            continue
+        seen.add(fingerprint)
+
+        address = index.get(fingerprint)
+        if address is None:
+            address = Web3.to_checksum_address(EvmAccount.from_key(key).address)
+            derived[fingerprint] = address
+        wallets.append(WalletHandle(key, address, account_class))
+
+    if duplicates:
+        logging.warning(f'{path} | Пропущено повторяющихся ключей: {duplicates}')
+    if derived:
+        store.save_key_index(derived)
+    return wallets
@@ -1,19 +1,24 @@
-import json
 import random
 from web3 import Web3
 from loguru import logger as logging
 
+from src.gas import gas_oracle, gas_model, gas_key
+from src.rpc_metrics import rpc_operation
 from src.account import Account
+from src.providers import get_web3
+from src.utils import send_transaction, wait_for_receipt
+from src.contracts import get_contract
 from config import OFFICIAL_BRIDGE, BRIDGE_AMOUNT, ETHEREUM_RPC
 
 
 class MainBridge:
     def __init__(self, account: Account):
-        self.w3 = Web3(Web3.HTTPProvider(ETHEREUM_RPC))
+        self.w3 = get_web3(ETHEREUM_RPC)
         self.account = account
         self.router_address = Web3.to_checksum_address(OFFICIAL_BRIDGE)
-        self.router = self.w3.eth.contract(address=self.router_address, abi=json.load(open('ABIs/main_bridge.json')))
+        self.router = get_contract(self.w3, self.router_address, 'main_bridge')
 
+    @rpc_operation('deposit', 'bridge')
     def deposit(self):
         gas_limit = random.randint(700000, 850000)
 
@@ -25,7 +30,7 @@ class MainBridge:
             logging.warning(f'{self.account.address} | Main Bridge | Недостаточно баланса')
 
         try:
-            base_cost = self.router.functions.l2TransactionBaseCost(self.w3.eth.gas_price, gas_limit, 800).call()
+            base_cost = self.router.functions.l2TransactionBaseCost(gas_oracle.gas_price(self.w3), gas_limit, 800).call()
 
             txn = self.router.functions.requestL2Transaction(
                 self.account.address,
@@ -39,19 +44,18 @@ class MainBridge:
                 'from': self.account.address,
                 'value': amount + base_cost,
                 'gas': 0,
-                'gasPrice': self.w3.eth.gas_price,
-                'nonce': self.w3.eth.get_transaction_count(self.account.address)
+                'gasPrice': gas_oracle.gas_price(self.w3)
             })
 
-            txn['gas'] = self.w3.eth.estimate_gas(txn)
-            signed_txn = self.w3.eth.account.sign_transaction(txn, self.account.key)
-            txn_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            status = self.w3.eth.wait_for_transaction_receipt(signed_txn, timeout=300).status
+            deposit_gas = gas_key('bridge', 'deposit')
+            txn['gas'] = gas_model.gas_limit(self.w3, txn, deposit_gas)
+            txn_hash = send_transaction(self.w3, txn, self.account.address, self.account.key, gas_key=deposit_gas)
+            receipt = yield from wait_for_receipt(self.w3, txn_hash, self.account.address)
 
-            if status == 1:
+            if receipt.status == 1:
                 trx = f'https://etherscan.io/tx/{txn_hash.hex()}'
                 logging.success(f'{self.account.address} | Main Bridge | Ethereum -> ZkSync Era | TRANSACTION: {trx}')
-                return True
+                return receipt
             else:
                 logging.error(f'{self.account.address} Error Main Bridge')
                 return False
@@ -0,0 +1,83 @@
+from web3 import Web3
+from eth_abi import decode
+
+from src.contracts import get_contract
+from config import TOKENS, MULTICALL_ADDRESS, MULTICALL_BATCH_SIZE
+
+STABLES = ['usdc', 'usdt', 'busd']
+DECIMALS = dict()
+
+
+def split_batches(calls: list[tuple[str, str]]) -> list[list]:
+    return [
+        [(target, True, Web3.to_bytes(hexstr=data)) for target, data in calls[i:i + MULTICALL_BATCH_SIZE]]
+        for i in range(0, len(calls), MULTICALL_BATCH_SIZE)
+    ]
+
+
+def unpack_results(results: list) -> list:
+    return [return_data if success and return_data else None for success, return_data in results]
+
+
+def aggregate(w3: Web3, calls: list[tuple[str, str]], block_identifier='latest') -> list:
+    multicall = get_contract(w3, MULTICALL_ADDRESS, 'multicall3')
+    results = []
+
+    for batch in split_batches(calls):
+        results.extend(unpack_results(multicall.functions.aggregate3(batch).call(block_identifier=block_identifier)))
+
+    return results
+
+
+def decimals_calls(w3, symbols: list[str]) -> list[tuple[str, str]]:
+    calls = []
+    for symbol in symbols:
+        token = get_contract(w3, TOKENS[symbol], 'erc20_abi')
+        calls.append((token.address, token.encodeABI(fn_name='decimals')))
+
+    return calls
+
+
+def store_decimals(symbols: list[str], results: list):
+    for symbol, data in zip(symbols, results):
+        DECIMALS[symbol] = decode(['uint8'], data)[0]
+
+
+def load_decimals(w3: Web3, symbols: list[str]):
+    missing = [symbol for symbol in symbols if symbol not in DECIMALS]
+    if missing:
+        store_decimals(missing, aggregate(w3, decimals_calls(w3, missing)))
+
+
+def balance_calls(w3, addresses: list[str], symbols: list[str]) -> list[tuple[str, str]]:
+    multicall = get_contract(w3, MULTICALL_ADDRESS, 'multicall3')
+    tokens = [get_contract(w3, TOKENS[symbol], 'erc20_abi') for symbol in symbols]
+
+    calls = []
+    for address in addresses:
+        calls.append((multicall.address, multicall.encodeABI(fn_name='getEthBalance', args=[address])))
+        for token in tokens:
+            calls.append((token.address, token.encodeABI(fn_name='balanceOf', args=[address])))
+
+    return calls
+
+
+def parse_balances(addresses: list[str], symbols: list[str], results: list) -> dict[str, dict[str, int]]:
+    step = len(symbols) + 1
+    balances = dict()
+
+    for i, address in enumerate(addresses):
+        row = results[i * step:(i + 1) * step]
+        failed = [symbol for symbol, data in zip(['eth'] + symbols, row) if data is None]
+        if failed:
+            raise ValueError(f'{address} | Multicall: не удалось получить баланс {", ".join(failed)}')
+        balances[address] = {symbol: decode(['uint256'], data)[0] for symbol, data in zip(['eth'] + symbols, row)}
+
+    return balances
+
+
+def get_balances(w3: Web3, addresses: list[str], symbols: list[str] = None, block_identifier='latest') -> dict[str, dict[str, int]]:
+    symbols = STABLES if symbols is None else symbols
+    addresses = [Web3.to_checksum_address(address) for address in addresses]
+    results = aggregate(w3, balance_calls(w3, addresses, symbols), block_identifier)
+    return parse_balances(addresses, symbols, results)
@@ -0,0 +1,39 @@
+import threading
+from web3 import Web3
+
+
+class NonceManager:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.nonces = dict()
+
+    def allocate(self, w3: Web3, address: str) -> int:
+        nonce = self.cached(w3, address)
+        if nonce is None:
+            nonce = w3.eth.get_transaction_count(address, 'pending')
+        return self.reserve(w3, address, nonce)
+
+    async def allocate_async(self, w3, address: str) -> int:
+        nonce = self.cached(w3, address)
+        if nonce is None:
+            nonce = await w3.eth.get_transaction_count(address, 'pending')
+        return self.reserve(w3, address, nonce)
+
+    def cached(self, w3, address: str):
+        with self.lock:
+            return self.nonces.get((w3.provider.endpoint_uri, address))
+
+    def reserve(self, w3, address: str, nonce: int) -> int:
+        key = (w3.provider.endpoint_uri, address)
+        with self.lock:
+            nonce = max(nonce, self.nonces.get(key, 0))
+            self.nonces[key] = nonce + 1
+
+        return nonce
+
+    def resync(self, w3, address: str):
+        with self.lock:
+            self.nonces.pop((w3.provider.endpoint_uri, address), None)
+
+
+nonce_manager = NonceManager()
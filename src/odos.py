@@ -1,13 +1,13 @@
-import time
-import json
 import random
-import requests
 from web3 import Web3
 from loguru import logger as logging
 
+from src.gas import gas_oracle, gas_model, gas_key
+from src.rpc_metrics import rpc_operation
+from src.api import api_client
 from src.account import Account
-from src.utils import check_allowance, value_for_logs
-from config import TOKENS, ODOS_ROUTER_ADDRESS, PROXY, GAS_THRESHOLD
+from src.utils import check_allowance, confirm_approve, send_transaction, wait_for_receipt, value_for_logs
+from config import TOKENS, ODOS_ROUTER_ADDRESS, GAS_THRESHOLD
 
 
 class Odos:
@@ -17,40 +17,43 @@ class Odos:
         self.account = account
         self.router_address = Web3.to_checksum_address(ODOS_ROUTER_ADDRESS)
 
+    @rpc_operation('swap', 'odos')
     def swap(self, from_token: str, to_token: str, amount: int, retry: int = 0) -> bool:
         address = Web3.to_checksum_address(self.account.address)
         from_token_address = Web3.to_checksum_address(TOKENS[from_token] if from_token != 'eth' else TOKENS['zero_address'])
         to_token_address = Web3.to_checksum_address(TOKENS[to_token] if to_token != 'eth' else TOKENS['zero_address'])
 
         try:
-            if from_token != 'eth':
-                token = self.w3.eth.contract(address=from_token_address, abi=json.load(open('ABIs/erc20_abi.json')))
-                check_allowance(self.w3, token, address, self.router_address, amount, self.account.key)
-
-            quote = self.quote(address, from_token_address, to_token_address, amount)
-
-            assemble_request_body = {
-                "userAddr": address,
-                "pathId": quote["pathId"]
-            }
-
-            swap_txn = self.get_api_call_data("https://api.odos.xyz/sor/assemble", assemble_request_body)
-            amountOut = int(swap_txn['outputTokens'][0]['amount'])
-
-            swap_txn = swap_txn['transaction']
-            swap_txn['to'] = self.router_address
-            swap_txn['chainId'] = self.w3.eth.chain_id
-            swap_txn['value'] = int(swap_txn['value'])
-            swap_txn['nonce'] = self.w3.eth.get_transaction_count(address)
-            swap_txn['maxFeePerGas'] = self.w3.eth.gas_price
-            swap_txn['maxPriorityFeePerGas'] = self.w3.eth.gas_price
-            swap_txn['gas'] = int(self.w3.eth.estimate_gas(swap_txn) * 0.75)
-            del swap_txn['gasPrice']
-
-            signed_swap_txn = self.w3.eth.account.sign_transaction(swap_txn, self.account.key)
-            swap_txn_hash = self.w3.eth.send_raw_transaction(signed_swap_txn.rawTransaction)
-            status = self.w3.eth.wait_for_transaction_receipt(swap_txn_hash, timeout=300).status
-            time.sleep(10)
+            swap_gas = gas_key('odos', 'swap', from_token, to_token)
+            approval = None
+            try:
+                if from_token != 'eth':
+                    approval = yield from check_allowance(self.w3, from_token_address, address, self.router_address, amount, self.account.key, swap_gas)
+
+                quote = self.quote(address, from_token_address, to_token_address, amount)
+
+                assemble_request_body = {
+                    "userAddr": address,
+                    "pathId": quote["pathId"]
+                }
+
+                swap_txn = self.get_api_call_data("https://api.odos.xyz/sor/assemble", assemble_request_body)
+                amountOut = int(swap_txn['outputTokens'][0]['amount'])
+
+                swap_txn = swap_txn['transaction']
+                swap_txn['to'] = self.router_address
+                swap_txn['chainId'] = self.w3.eth.chain_id
+                swap_txn['value'] = int(swap_txn['value'])
+                swap_txn['maxFeePerGas'] = gas_oracle.gas_price(self.w3)
+                swap_txn['maxPriorityFeePerGas'] = gas_oracle.gas_price(self.w3)
+                swap_txn['gas'] = gas_model.gas_limit(self.w3, swap_txn, swap_gas, 0.75)
+                del swap_txn['gasPrice']
+
+                swap_txn_hash = send_transaction(self.w3, swap_txn, address, self.account.key, gas_key=swap_gas)
+                status = (yield from wait_for_receipt(self.w3, swap_txn_hash, address)).status
+            finally:
+                yield from confirm_approve(self.w3, approval, address)
+            yield 10
 
             if status == 1:
                 trx = f'https://explorer.zksync.io/tx/{swap_txn_hash.hex()}'
@@ -61,8 +64,8 @@ class Odos:
                 logging.error(f'{address} | Odos swap {retry}/{self.retries} | {value_for_logs(from_token, amount)}'
                               f' -> {to_token}')
                 if retry < self.retries:
-                    time.sleep(random.randint(30, 40))
-                    self.swap(from_token, to_token, amount, retry + 1)
+                    yield random.randint(30, 40)
+                    return (yield from self.swap(from_token, to_token, amount, retry + 1))
                 else:
                     return False
 
@@ -70,12 +73,12 @@ class Odos:
             logging.error(f'{address} | Odos swap {retry}/{self.retries} | {value_for_logs(from_token, amount)}'
                           f' -> {to_token} | {err}')
             if retry < self.retries:
-                time.sleep(random.randint(30, 40))
-                self.swap(from_token, to_token, amount, retry + 1)
+                yield random.randint(30, 40)
+                return (yield from self.swap(from_token, to_token, amount, retry + 1))
             else:
                 return False
 
-    def quote(self, address: str, from_token_address: str, to_token_address: str, amount: int):
+    def quote(self, address: str, from_token_address: str, to_token_address: str, amount: int, cache: bool = False):
         quote_url = 'https://api.odos.xyz/sor/quote/v2'
 
         quote_request_body = {
@@ -98,38 +101,25 @@ class Odos:
             "compact": True,
         }
 
-        return self.get_api_call_data(quote_url, quote_request_body)
+        return self.get_api_call_data(quote_url, quote_request_body, cache=cache)
 
     @staticmethod
-    def get_api_call_data(url, data=None):
-        proxy = PROXY.split(':')
-        headers = {"Content-Type": "application/json"}
-
-        try:
-            proxy = f'http://{proxy[2]}:{proxy[3]}@{proxy[0]}:{proxy[1]}'
-            proxies = {
-                'http': proxy,
-                'https': proxy,
-            }
-
-            if data:
-                response = requests.post(url=url, json=data, headers=headers, proxies=proxies)
-            else:
-                response = requests.get(url=url, proxies=proxies)
-        except Exception:
-            if data:
-                response = requests.post(url=url, json=data, headers=headers)
-            else:
-                response = requests.get(url=url)
-        if response.status_code == 200:
-            api_data = response.json()
-            return api_data
-        else:
-            return False
+    def get_api_call_data(url, data=None, cache=False):
+        return api_client.get_api_call_data(url, data, use_proxy=True, cache=cache)
 
+    @rpc_operation('check_response', 'odos')
     def check_response(self):
         try:
-            return self.get_api_call_data(f'https://api.odos.xyz/pricing/token/324/{TOKENS["usdc"]}?currencyId=ETH')
+            return self.get_api_call_data(f'https://api.odos.xyz/pricing/token/324/{TOKENS["usdc"]}?currencyId=ETH', cache=True)
         except Exception as err:
             logging.error(f'Error: {err}')
             return False
+
+    @rpc_operation('quote', 'odos')
+    def get_quote(self, from_token: str, to_token: str, amount: int) -> dict:
+        address = Web3.to_checksum_address(self.account.address)
+        from_token_address = Web3.to_checksum_address(TOKENS[from_token] if from_token != 'eth' else TOKENS['zero_address'])
+        to_token_address = Web3.to_checksum_address(TOKENS[to_token] if to_token != 'eth' else TOKENS['zero_address'])
+
+        quote = self.quote(address, from_token_address, to_token_address, amount, cache=True)
+        return {'amount_out': int(quote['outAmounts'][0]), 'gas': int(quote['gasEstimate'])}
@@ -0,0 +1,89 @@
+import random
+import threading
+
+from src.store import get_store
+from config import MAX_CONTINUOUS_TRANS, BALANCE_PERCENTAGE, MIN_BALANCE_FOR_GAS, PLAN_SEED
+
+DAPPS = ['odos', 'inch', 'woofi', 'spacefi', 'syncswap']
+
+
+def new_seed() -> int:
+    return PLAN_SEED if PLAN_SEED is not None else random.SystemRandom().randrange(2 ** 32)
+
+
+def run_rng(seed: int, address: str, run: int) -> random.Random:
+    return random.Random(f'{seed}:{address}:{run}')
+
+
+def split_iters(transactions: int, rng: random.Random) -> list[int]:
+    iters = rng.randint(1, MAX_CONTINUOUS_TRANS) if transactions > MAX_CONTINUOUS_TRANS else rng.randint(1, transactions)
+    count, rest = divmod(transactions, iters)
+    return [iters] * count + ([rest] if rest else [])
+
+
+def compile_run(rng: random.Random, transactions: int, volumes: bool) -> list:
+    size = min(rng.randint(10, 13), transactions)
+    if volumes:
+        return [['odos', [[round(rng.random(), 4), round(rng.uniform(*MIN_BALANCE_FOR_GAS), 6)] for _ in range(size)]]]
+
+    return [
+        [rng.choice(DAPPS), [[round(rng.random(), 4), round(rng.uniform(*BALANCE_PERCENTAGE), 4)] for _ in range(iters)]]
+        for iters in split_iters(size, rng)
+    ]
+
+
+def compile_wallet(seed: int, address: str, progress: dict) -> list:
+    runs, remaining = [], progress['transactions']
+    while remaining > 0:
+        run = compile_run(run_rng(seed, address, len(runs)), remaining, progress['volumes'])
+        runs.append(run)
+        remaining -= sum(len(steps) for _, steps in run)
+    return runs
+
+
+def pick(weights: dict[str, float], draw: float = None) -> str:
+    if draw is None:
+        return random.choices(list(weights), list(weights.values()))[0]
+
+    threshold, total = draw * sum(weights.values()), 0
+    for name, weight in weights.items():
+        total += weight
+        if threshold < total:
+            return name
+    return name
+
+
+class FleetPlan:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.seed = None
+        self.plans = None
+
+    def load(self):
+        if self.plans is None:
+            self.seed, self.plans = get_store().load_plans()
+            if self.seed is None:
+                self.seed = new_seed()
+                get_store().save_plans(self.seed, self.plans)
+
+    def compile(self, db: dict[str, dict], seed: int) -> dict[str, list]:
+        plans = {address: compile_wallet(seed, address, progress) for address, progress in db.items()}
+        get_store().save_plans(seed, plans)
+        with self.lock:
+            self.seed, self.plans = seed, plans
+        return plans
+
+    def run(self, address: str, index: int, progress: dict) -> list:
+        with self.lock:
+            self.load()
+            runs = self.plans.get(address, [])
+            if index < len(runs):
+                return runs[index]
+            seed = self.seed
+
+        if progress['transactions'] <= 0:
+            return []
+        return compile_run(run_rng(seed, address, index), progress['transactions'], progress['volumes'])
+
+
+fleet_plan = FleetPlan()
@@ -0,0 +1,79 @@
+import itertools
+import threading
+from web3 import Web3
+from eth_abi import decode
+
+from src.store import get_store
+from src.rpc_metrics import rpc_operation
+from src.contracts import get_contract
+from src.multicall import STABLES, aggregate
+from config import TOKENS, SYNCSWAP_CLASSIC_POOL_FACTORY_ADDRESS, SYNCSWAP_STABLE_POOL_FACTORY_ADDRESS
+
+
+def get_factory(from_token: str, to_token: str) -> str:
+    if from_token in STABLES and to_token in STABLES:
+        return Web3.to_checksum_address(SYNCSWAP_STABLE_POOL_FACTORY_ADDRESS)
+    return Web3.to_checksum_address(SYNCSWAP_CLASSIC_POOL_FACTORY_ADDRESS)
+
+
+def pool_key(factory: str, token_a: str, token_b: str) -> tuple[str, str, str]:
+    token_a, token_b = sorted([Web3.to_checksum_address(token_a), Web3.to_checksum_address(token_b)])
+    return Web3.to_checksum_address(factory), token_a, token_b
+
+
+class PoolCache:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pools = None
+
+    def cached(self, key: tuple[str, str, str]):
+        with self.lock:
+            if self.pools is None:
+                self.pools = get_store().load_pools()
+            return self.pools.get(key)
+
+    def store(self, pools: dict[tuple[str, str, str], str]):
+        with self.lock:
+            self.pools.update(pools)
+        get_store().save_pools(pools)
+
+    def get_pool(self, w3: Web3, from_token: str, to_token: str) -> str:
+        key = pool_key(get_factory(from_token, to_token), TOKENS[from_token], TOKENS[to_token])
+        pool = self.cached(key)
+        if pool is None:
+            pool = get_contract(w3, key[0], 'syncswap_classic_pool').functions.getPool(key[1], key[2]).call()
+            self.store({key: pool})
+        return pool
+
+    async def get_pool_async(self, w3, from_token: str, to_token: str) -> str:
+        key = pool_key(get_factory(from_token, to_token), TOKENS[from_token], TOKENS[to_token])
+        pool = self.cached(key)
+        if pool is None:
+            pool = await get_contract(w3, key[0], 'syncswap_classic_pool').functions.getPool(key[1], key[2]).call()
+            self.store({key: pool})
+        return pool
+
+    @rpc_operation('warm_pools')
+    def warm(self, w3: Web3):
+        symbols = [symbol for symbol in TOKENS if symbol != 'zero_address']
+        keys = {
+            pool_key(get_factory(from_token, to_token), TOKENS[from_token], TOKENS[to_token])
+            for from_token, to_token in itertools.combinations(symbols, 2)
+        }
+        missing = [key for key in keys if self.cached(key) is None]
+        if not missing:
+            return
+
+        calls = []
+        for factory, token_a, token_b in missing:
+            contract = get_contract(w3, factory, 'syncswap_classic_pool')
+            calls.append((factory, contract.encodeABI(fn_name='getPool', args=[token_a, token_b])))
+
+        pools = {
+            key: Web3.to_checksum_address(decode(['address'], data)[0])
+            for key, data in zip(missing, aggregate(w3, calls)) if data
+        }
+        self.store(pools)
+
+
+pool_cache = PoolCache()
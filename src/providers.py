@@ -0,0 +1,239 @@
+import re
+import json
+import time
+import threading
+import requests
+from web3 import Web3
+from web3.providers.base import JSONBaseProvider
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from src.rpc_metrics import rpc_stats, rpc_accounting
+from config import RPC, RPC_POOL_SIZE, RPC_TIMEOUT, RPC_HEDGE_DELAY, RPC_COOLDOWN
+
+BROADCAST_METHODS = {'eth_sendRawTransaction', 'eth_getTransactionCount'}
+ENDPOINT_ERRORS = re.compile(r'rate limit|limit exceeded|too many requests|header not found|unavailable|timeout', re.I)
+KNOWN_TRANSACTION = re.compile(r'already known|known transaction|already imported', re.I)
+LATENCY_ALPHA = 0.2
+
+_providers = dict()
+_pools = list()
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class PooledHTTPProvider(Web3.HTTPProvider):
+    def __init__(self, endpoint_uri: str, session: requests.Session, timeout=RPC_TIMEOUT):
+        super().__init__(endpoint_uri, request_kwargs={'timeout': timeout})
+        self.session = session
+
+    def make_request(self, method, params):
+        request_data = self.encode_rpc_request(method, params)
+        response = self.session.post(self.endpoint_uri, data=request_data, **self.get_request_kwargs())
+        response.raise_for_status()
+        return self.decode_rpc_response(response.content)
+
+    def make_batch_request(self, calls: list[tuple[str, list]]) -> list:
+        if not calls:
+            return []
+
+        batch = [{'jsonrpc': '2.0', 'method': method, 'params': params, 'id': i} for i, (method, params) in enumerate(calls)]
+        started = time.perf_counter()
+        response = self.session.post(self.endpoint_uri, data=json.dumps(batch), **self.get_request_kwargs())
+        response.raise_for_status()
+
+        payload = response.json()
+        if not isinstance(payload, list):
+            raise ValueError(f'Batch запрос отклонен: {payload.get("error", payload) if isinstance(payload, dict) else payload}')
+
+        results = [None] * len(calls)
+        errors = [True] * len(calls)
+        for item in payload:
+            index = item.get('id') if isinstance(item, dict) else None
+            if not isinstance(index, int) or not 0 <= index < len(calls):
+                raise ValueError(f'Batch ответ с неизвестным id: {item}')
+            if 'result' in item:
+                results[index] = item['result']
+                errors[index] = False
+
+        elapsed = (time.perf_counter() - started) / len(calls)
+        for (method, _), error in zip(calls, errors):
+            rpc_stats.record(method, elapsed, error)
+
+        return results
+
+
+class Endpoint:
+    def __init__(self, uri: str, provider):
+        self.uri = uri
+        self.provider = provider
+        self.latency = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.failures = 0
+        self.down_until = 0
+
+    def healthy(self, now: float) -> bool:
+        return self.down_until <= now
+
+
+class EndpointPool:
+    def __init__(self, endpoints: list[Endpoint], cooldown: float = RPC_COOLDOWN):
+        self.lock = threading.Lock()
+        self.endpoints = endpoints
+        self.primary = endpoints[0]
+        self.cooldown = cooldown
+        _pools.append(self)
+
+    def ranked(self, method: str = None) -> list[Endpoint]:
+        now = time.monotonic()
+        with self.lock:
+            healthy = sorted([endpoint for endpoint in self.endpoints if endpoint.healthy(now)], key=lambda e: e.latency)
+            down = sorted([endpoint for endpoint in self.endpoints if not endpoint.healthy(now)], key=lambda e: e.down_until)
+
+            if method not in BROADCAST_METHODS:
+                return healthy + down
+
+            if not self.primary.healthy(now) and healthy:
+                self.primary = healthy[0]
+            return [self.primary] + [endpoint for endpoint in healthy + down if endpoint is not self.primary]
+
+    def success(self, endpoint: Endpoint, seconds: float):
+        with self.lock:
+            endpoint.requests += 1
+            endpoint.failures = 0
+            endpoint.latency = seconds if not endpoint.latency else endpoint.latency + LATENCY_ALPHA * (seconds - endpoint.latency)
+
+    def cancelled(self, endpoint: Endpoint, seconds: float):
+        with self.lock:
+            endpoint.latency = max(endpoint.latency, seconds)
+
+    def failure(self, endpoint: Endpoint, seconds: float):
+        with self.lock:
+            endpoint.requests += 1
+            endpoint.errors += 1
+            endpoint.failures += 1
+            endpoint.latency = max(endpoint.latency, seconds)
+            endpoint.down_until = time.monotonic() + self.cooldown * min(2 ** (endpoint.failures - 1), 8)
+
+
+def split_endpoints(endpoint) -> list[str]:
+    return endpoint.split() if isinstance(endpoint, str) else list(endpoint)
+
+
+def endpoints_key(endpoint) -> str:
+    return ' '.join(split_endpoints(endpoint))
+
+
+def check_response(response):
+    if isinstance(response, dict) and 'error' in response and ENDPOINT_ERRORS.search(str(response['error'])):
+        raise ValueError(response['error'])
+
+
+def known_transaction(method: str, params, response):
+    if method == 'eth_sendRawTransaction' and 'error' in response and KNOWN_TRANSACTION.search(str(response['error'])):
+        return {'jsonrpc': '2.0', 'id': response.get('id'), 'result': Web3.to_hex(Web3.keccak(hexstr=params[0]))}
+    return response
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(RPC_POOL_SIZE, thread_name_prefix='rpc-hedge')
+    return _executor
+
+
+class RoutedHTTPProvider(JSONBaseProvider):
+    _middlewares = Web3.HTTPProvider._middlewares
+
+    def __init__(self, endpoints: list[str], hedge_delay: float = RPC_HEDGE_DELAY):
+        super().__init__()
+        self.endpoint_uri = endpoints_key(endpoints)
+        self.pool = EndpointPool([Endpoint(uri, PooledHTTPProvider(uri, create_session())) for uri in endpoints])
+        self.hedge_delay = hedge_delay
+
+    def call(self, endpoint: Endpoint, request):
+        started = time.perf_counter()
+        try:
+            response = request(endpoint.provider)
+            check_response(response)
+        except Exception:
+            self.pool.failure(endpoint, time.perf_counter() - started)
+            raise
+
+        self.pool.success(endpoint, time.perf_counter() - started)
+        return response
+
+    def failover(self, endpoints: list[Endpoint], request):
+        for endpoint in endpoints[:-1]:
+            try:
+                return self.call(endpoint, request)
+            except Exception:
+                pass
+        return self.call(endpoints[-1], request)
+
+    def hedged(self, endpoints: list[Endpoint], request):
+        pending, error = set(), None
+        for i, endpoint in enumerate(endpoints):
+            pending.add(get_executor().submit(self.call, endpoint, request))
+            timeout = self.hedge_delay if i + 1 < len(endpoints) else None
+            while pending:
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        return future.result()
+                    error = future.exception()
+                if not done or i + 1 < len(endpoints):
+                    break
+
+        raise error
+
+    def make_request(self, method, params):
+        endpoints = self.pool.ranked(method)
+        request = lambda provider: provider.make_request(method, params)
+
+        if self.hedge_delay and len(endpoints) > 1 and method not in BROADCAST_METHODS:
+            response = self.hedged(endpoints, request)
+        else:
+            response = self.failover(endpoints, request)
+
+        return known_transaction(method, params, response)
+
+    def make_batch_request(self, calls: list[tuple[str, list]]) -> list:
+        return self.failover(self.pool.ranked(), lambda provider: provider.make_batch_request(calls))
+
+    def pinned_batch(self):
+        endpoint = self.pool.ranked()[0]
+        return lambda calls: self.call(endpoint, lambda provider: provider.make_batch_request(calls))
+
+
+def create_session(pool_size: int = RPC_POOL_SIZE) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_web3(endpoint=RPC) -> Web3:
+    key = endpoints_key(endpoint)
+    w3 = _providers.get(key)
+    if w3 is None:
+        w3 = Web3(RoutedHTTPProvider(split_endpoints(endpoint)))
+        w3.middleware_onion.inject(rpc_accounting, 'rpc_accounting', layer=0)
+        _providers[key] = w3
+
+    return w3
+
+
+def endpoint_stats() -> list[dict]:
+    rows = []
+    for pool in _pools:
+        with pool.lock:
+            rows.extend(
+                {'endpoint': endpoint.uri, 'requests': endpoint.requests, 'errors': endpoint.errors,
+                 'latency': endpoint.latency, 'primary': endpoint is pool.primary}
+                for endpoint in pool.endpoints
+            )
+    return rows
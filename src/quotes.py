@@ -0,0 +1,281 @@
+import time
+import threading
+from web3 import Web3
+from eth_abi import decode
+from loguru import logger as logging
+
+from src.contracts import get_contract
+from src.multicall import aggregate
+from src.aio.multicall import aggregate as aggregate_async
+from src.pools import pool_cache, pool_key, get_factory
+from config import TOKENS, MULTICALL_ADDRESS, SPACEFI_ROUTER_ADDRESS, QUOTE_TTL, QUOTE_FEE_TTL
+
+MAX_FEE = 100000
+STABLE_A = 1000
+MAX_LOOP_LIMIT = 256
+SPACEFI_FEE = (997, 1000)
+
+
+def within1(a: int, b: int) -> bool:
+    return abs(a - b) <= 1
+
+
+def compute_d(xp0: int, xp1: int, a: int = STABLE_A) -> int:
+    s = xp0 + xp1
+    if s == 0:
+        return 0
+
+    d, na = s, a * 2
+    for _ in range(MAX_LOOP_LIMIT):
+        dp = d * d // xp0 * d // xp1 // 4
+        prev_d = d
+        d = (na * s + 2 * dp) * d // ((na - 1) * d + 3 * dp)
+        if within1(d, prev_d):
+            break
+
+    return d
+
+
+def get_y(x: int, d: int, a: int = STABLE_A) -> int:
+    na = a * 2
+    c = d * d // (x * 2) * d // (na * 2)
+    b = x + d // na
+
+    y = d
+    for _ in range(MAX_LOOP_LIMIT):
+        y_prev = y
+        y = (y * y + c) // (y * 2 + b - d)
+        if within1(y, y_prev):
+            break
+
+    return y
+
+
+def classic_amount_out(fee: int, amount_in: int, reserve_in: int, reserve_out: int) -> int:
+    if amount_in == 0:
+        return 0
+
+    amount_in_with_fee = amount_in * (MAX_FEE - fee)
+    return amount_in_with_fee * reserve_out // (reserve_in * MAX_FEE + amount_in_with_fee)
+
+
+def stable_amount_out(fee: int, amount_in: int, reserves: tuple, multipliers: tuple, token0_in: bool, a: int = STABLE_A) -> int:
+    if amount_in == 0:
+        return 0
+
+    adjusted = (reserves[0] * multipliers[0], reserves[1] * multipliers[1])
+    i, j = (0, 1) if token0_in else (1, 0)
+
+    fee_deducted_amount_in = amount_in - amount_in * fee // MAX_FEE
+    d = compute_d(*adjusted, a)
+    y = get_y(adjusted[i] + fee_deducted_amount_in * multipliers[i], d, a)
+    return (adjusted[j] - y - 1) // multipliers[j]
+
+
+def spacefi_amount_out(amount_in: int, reserve_in: int, reserve_out: int) -> int:
+    if amount_in <= 0:
+        raise ValueError('SpaceFi: INSUFFICIENT_INPUT_AMOUNT')
+    if reserve_in <= 0 or reserve_out <= 0:
+        raise ValueError('SpaceFi: INSUFFICIENT_LIQUIDITY')
+
+    amount_in_with_fee = amount_in * SPACEFI_FEE[0]
+    return amount_in_with_fee * reserve_out // (reserve_in * SPACEFI_FEE[1] + amount_in_with_fee)
+
+
+class QuoteEngine:
+    def __init__(self, ttl: float = QUOTE_TTL, fee_ttl: float = QUOTE_FEE_TTL):
+        self.ttl = ttl
+        self.fee_ttl = fee_ttl
+        self.lock = threading.Lock()
+        self.pools = dict()
+        self.reserves = dict()
+        self.fees = dict()
+        self.trusted = dict()
+        self.spacefi_factory = None
+        self.hits = 0
+        self.misses = 0
+
+    def plan(self, w3, venue: str, pool: str, token_in: str, token_out: str, amount: int, sender: str = None,
+             factory: str = None) -> list[tuple[str, str, str, list]]:
+        now = time.monotonic()
+        with self.lock:
+            info = self.pools.get(pool)
+            reserves = self.reserves.get(pool)
+            fee = self.fees.get((pool, token_in, sender))
+            trusted = self.trusted.get((pool, token_in))
+
+        abi_name = 'syncswap_pool' if venue == 'syncswap' else 'spacefi_pair'
+        contract = get_contract(w3, pool, abi_name)
+        calls = []
+
+        if info is None:
+            calls.append(('token0', pool, contract.encodeABI(fn_name='token0'), ['address']))
+            if venue == 'syncswap':
+                calls.append(('pool_type', pool, contract.encodeABI(fn_name='poolType'), ['uint16']))
+                calls.append(('multiplier0', pool, contract.encodeABI(fn_name='token0PrecisionMultiplier'), ['uint256']))
+                calls.append(('multiplier1', pool, contract.encodeABI(fn_name='token1PrecisionMultiplier'), ['uint256']))
+
+        if reserves is None or trusted is None or now - reserves[3] >= self.ttl:
+            multicall = get_contract(w3, MULTICALL_ADDRESS, 'multicall3')
+            reserves_types = ['uint256', 'uint256'] if venue == 'syncswap' else ['uint112', 'uint112', 'uint32']
+            calls.append(('block', multicall.address, multicall.encodeABI(fn_name='getBlockNumber'), ['uint256']))
+            calls.append(('reserves', pool, contract.encodeABI(fn_name='getReserves'), reserves_types))
+
+        if venue == 'syncswap' and (fee is None or now - fee[1] >= self.fee_ttl):
+            factory_contract = get_contract(w3, factory, 'syncswap_classic_pool')
+            data = factory_contract.encodeABI(fn_name='getSwapFee', args=[pool, sender, token_in, token_out, b''])
+            calls.append(('fee', factory_contract.address, data, ['uint24']))
+
+        if not trusted:
+            if venue == 'syncswap':
+                pool_data = get_contract(w3, pool, 'syncswap_pool_data')
+                data = pool_data.encodeABI(fn_name='getAmountOut', args=[token_in, amount, sender])
+                calls.append(('quote', pool, data, ['uint256']))
+            else:
+                router = get_contract(w3, SPACEFI_ROUTER_ADDRESS, 'spacefi_router')
+                data = router.encodeABI(fn_name='getAmountsOut', args=[amount, [token_in, token_out]])
+                calls.append(('quote', router.address, data, ['uint256[]']))
+
+        return calls
+
+    def fetch(self, w3, calls: list) -> dict:
+        if not self.count(calls):
+            return dict()
+        return self.decode(calls, aggregate(w3, [(target, data) for _, target, data, _ in calls]))
+
+    async def fetch_async(self, w3, calls: list) -> dict:
+        if not self.count(calls):
+            return dict()
+        return self.decode(calls, await aggregate_async(w3, [(target, data) for _, target, data, _ in calls]))
+
+    def count(self, calls: list) -> bool:
+        with self.lock:
+            if calls:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return bool(calls)
+
+    @staticmethod
+    def decode(calls: list, results: list) -> dict:
+        return {name: decode(types, data) if data else None for (name, _, _, types), data in zip(calls, results)}
+
+    def settle(self, results: dict, venue: str, pool: str, token_in: str, token_out: str, amount: int, sender: str = None,
+               factory: str = None) -> int:
+        now = time.monotonic()
+        with self.lock:
+            if results.get('token0'):
+                self.pools[pool] = {
+                    'token0': Web3.to_checksum_address(results['token0'][0]),
+                    'stable': bool(results.get('pool_type')) and results['pool_type'][0] == 2,
+                    'multipliers': (
+                        results['multiplier0'][0] if results.get('multiplier0') else 1,
+                        results['multiplier1'][0] if results.get('multiplier1') else 1
+                    )
+                }
+            if results.get('reserves'):
+                block = results['block'][0] if results.get('block') else None
+                self.reserves[pool] = (results['reserves'][0], results['reserves'][1], block, now)
+            if results.get('fee'):
+                self.fees[(pool, token_in, sender)] = (results['fee'][0], now)
+
+            info = self.pools.get(pool)
+            reserves = self.reserves.get(pool)
+            fee = self.fees.get((pool, token_in, sender))
+            trusted = self.trusted.get((pool, token_in))
+
+        remote = None
+        if results.get('quote'):
+            remote = results['quote'][0] if venue == 'syncswap' else results['quote'][0][-1]
+        if trusted is False and remote is not None:
+            return remote
+
+        if info is None or reserves is None or (venue == 'syncswap' and fee is None):
+            if remote is None:
+                raise ValueError(f'Не удалось получить состояние пула {pool}')
+            return remote
+
+        token0_in = info['token0'] == token_in
+        reserve_in, reserve_out = (reserves[0], reserves[1]) if token0_in else (reserves[1], reserves[0])
+
+        if venue == 'spacefi':
+            local = spacefi_amount_out(amount, reserve_in, reserve_out)
+        elif info['stable']:
+            local = stable_amount_out(fee[0], amount, reserves[:2], info['multipliers'], token0_in)
+        else:
+            local = classic_amount_out(fee[0], amount, reserve_in, reserve_out)
+
+        if trusted is None and remote is not None:
+            with self.lock:
+                self.trusted[(pool, token_in)] = local == remote
+            if local != remote:
+                logging.warning(f'Котировки | Локальный расчет для пула {pool} не совпал с контрактом '
+                                f'({local} != {remote}), используем eth_call')
+                return remote
+
+        return local
+
+    def syncswap_args(self, pool: str, from_token: str, to_token: str, amount: int, sender: str) -> tuple:
+        token_in = Web3.to_checksum_address(TOKENS[from_token])
+        token_out = Web3.to_checksum_address(TOKENS[to_token])
+        factory = get_factory(from_token, to_token)
+        return 'syncswap', pool, token_in, token_out, amount, Web3.to_checksum_address(sender), factory
+
+    def syncswap_amount_out(self, w3: Web3, from_token: str, to_token: str, amount: int, sender: str) -> int:
+        pool = pool_cache.get_pool(w3, from_token, to_token)
+        args = self.syncswap_args(pool, from_token, to_token, amount, sender)
+        return self.settle(self.fetch(w3, self.plan(w3, *args)), *args)
+
+    async def syncswap_amount_out_async(self, w3, from_token: str, to_token: str, amount: int, sender: str) -> int:
+        pool = await pool_cache.get_pool_async(w3, from_token, to_token)
+        args = self.syncswap_args(pool, from_token, to_token, amount, sender)
+        return self.settle(await self.fetch_async(w3, self.plan(w3, *args)), *args)
+
+    def spacefi_key(self, from_token: str, to_token: str) -> tuple[str, str, str]:
+        return pool_key(self.spacefi_factory, TOKENS[from_token], TOKENS[to_token])
+
+    def spacefi_pair(self, w3: Web3, from_token: str, to_token: str) -> str:
+        if self.spacefi_factory is None:
+            router = get_contract(w3, SPACEFI_ROUTER_ADDRESS, 'spacefi_router')
+            self.spacefi_factory = Web3.to_checksum_address(router.functions.factory().call())
+
+        key = self.spacefi_key(from_token, to_token)
+        pair = pool_cache.cached(key)
+        if pair is None:
+            pair = get_contract(w3, key[0], 'spacefi_factory').functions.getPair(key[1], key[2]).call()
+            pool_cache.store({key: pair})
+        return pair
+
+    async def spacefi_pair_async(self, w3, from_token: str, to_token: str) -> str:
+        if self.spacefi_factory is None:
+            router = get_contract(w3, SPACEFI_ROUTER_ADDRESS, 'spacefi_router')
+            self.spacefi_factory = Web3.to_checksum_address(await router.functions.factory().call())
+
+        key = self.spacefi_key(from_token, to_token)
+        pair = pool_cache.cached(key)
+        if pair is None:
+            pair = await get_contract(w3, key[0], 'spacefi_factory').functions.getPair(key[1], key[2]).call()
+            pool_cache.store({key: pair})
+        return pair
+
+    def spacefi_amount_out(self, w3: Web3, from_token: str, to_token: str, amount: int) -> int:
+        pair = self.spacefi_pair(w3, from_token, to_token)
+        if pair == TOKENS['zero_address']:
+            raise ValueError('SpaceFi: PAIR_NOT_EXISTS')
+
+        args = ('spacefi', pair, Web3.to_checksum_address(TOKENS[from_token]), Web3.to_checksum_address(TOKENS[to_token]), amount)
+        return self.settle(self.fetch(w3, self.plan(w3, *args)), *args)
+
+    async def spacefi_amount_out_async(self, w3, from_token: str, to_token: str, amount: int) -> int:
+        pair = await self.spacefi_pair_async(w3, from_token, to_token)
+        if pair == TOKENS['zero_address']:
+            raise ValueError('SpaceFi: PAIR_NOT_EXISTS')
+
+        args = ('spacefi', pair, Web3.to_checksum_address(TOKENS[from_token]), Web3.to_checksum_address(TOKENS[to_token]), amount)
+        return self.settle(await self.fetch_async(w3, self.plan(w3, *args)), *args)
+
+    def stats(self) -> dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+quote_engine = QuoteEngine()
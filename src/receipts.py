@@ -0,0 +1,107 @@
+import time
+import threading
+from web3 import Web3
+from hexbytes import HexBytes
+from loguru import logger as logging
+from web3.datastructures import AttributeDict
+from web3.exceptions import TimeExhausted
+from web3._utils.method_formatters import receipt_formatter
+from concurrent.futures import Future
+
+from src.providers import get_web3
+from src.rpc_metrics import rpc_operation
+from config import RECEIPT_POLL_INTERVAL
+
+_watchers = dict()
+_watchers_lock = threading.Lock()
+
+
+def hash_key(txn_hash) -> str:
+    return Web3.to_hex(HexBytes(txn_hash))
+
+
+class ReceiptWatcher:
+    def __init__(self, endpoint: str, poll_interval: float = RECEIPT_POLL_INTERVAL):
+        self.w3 = get_web3(endpoint)
+        self.poll_interval = poll_interval
+        self.lock = threading.Lock()
+        self.pending = dict()
+        self.deadlines = dict()
+        self.thread = None
+
+    def watch(self, txn_hash, timeout: float = None) -> Future:
+        txn_hash = hash_key(txn_hash)
+
+        with self.lock:
+            future = self.pending.get(txn_hash)
+            if future is None:
+                future = Future()
+                self.pending[txn_hash] = future
+            if timeout is not None:
+                self.deadlines[txn_hash] = min(self.deadlines.get(txn_hash, (float('inf'), 0)), (time.monotonic() + timeout, timeout))
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+
+        return future
+
+    def forget(self, txn_hash):
+        with self.lock:
+            self.pending.pop(hash_key(txn_hash), None)
+            self.deadlines.pop(hash_key(txn_hash), None)
+
+    @rpc_operation('receipt_watcher')
+    def run(self):
+        last_block = None
+
+        while True:
+            with self.lock:
+                if not self.pending:
+                    self.thread = None
+                    return
+                hashes = list(self.pending)
+
+            try:
+                block = self.w3.eth.block_number
+                if block != last_block:
+                    self.resolve(hashes)
+                    last_block = block
+            except Exception as err:
+                logging.warning(f'Receipt watcher | {err}')
+
+            self.expire()
+            time.sleep(self.poll_interval)
+
+    def resolve(self, hashes: list[str]):
+        receipts = self.w3.provider.make_batch_request([('eth_getTransactionReceipt', [txn_hash]) for txn_hash in hashes])
+
+        for txn_hash, receipt in zip(hashes, receipts):
+            if receipt is None:
+                continue
+            with self.lock:
+                future = self.pending.pop(txn_hash, None)
+                self.deadlines.pop(txn_hash, None)
+            if future is not None and future.set_running_or_notify_cancel():
+                future.set_result(AttributeDict.recursive(receipt_formatter(receipt)))
+
+    def expire(self):
+        now = time.monotonic()
+        with self.lock:
+            expired = [(txn_hash, timeout) for txn_hash, (deadline, timeout) in self.deadlines.items() if deadline <= now]
+            futures = [self.pending.pop(txn_hash, None) for txn_hash, _ in expired]
+            for txn_hash, _ in expired:
+                del self.deadlines[txn_hash]
+
+        for (txn_hash, timeout), future in zip(expired, futures):
+            if future is not None and future.set_running_or_notify_cancel():
+                future.set_exception(TimeExhausted(f'Transaction {txn_hash} is not in the chain after {timeout} seconds'))
+
+
+def get_watcher(endpoint: str) -> ReceiptWatcher:
+    with _watchers_lock:
+        watcher = _watchers.get(endpoint)
+        if watcher is None:
+            watcher = ReceiptWatcher(endpoint)
+            _watchers[endpoint] = watcher
+
+    return watcher
@@ -0,0 +1,156 @@
+import json
+import time
+import inspect
+import functools
+import threading
+import contextlib
+import contextvars
+from collections import defaultdict
+from loguru import logger as logging
+
+from config import RPC_METRICS_PATH
+
+_tags = contextvars.ContextVar('rpc_tags', default={})
+TAG_NAMES = ('wallet', 'dex', 'operation')
+
+
+@contextlib.contextmanager
+def rpc_tags(**tags):
+    previous = _tags.get()
+    _tags.set({**previous, **{name: value for name, value in tags.items() if value is not None}})
+    try:
+        yield
+    finally:
+        _tags.set(previous)
+
+
+def tag_steps(steps, **tags):
+    value = None
+    while True:
+        with rpc_tags(**tags):
+            try:
+                delay = steps.send(value)
+            except StopIteration as stop:
+                return stop.value
+        value = yield delay
+
+
+def rpc_operation(operation: str, dex: str = None):
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                with rpc_tags(dex=dex, operation=operation):
+                    return await fn(*args, **kwargs)
+        elif inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                return (yield from tag_steps(fn(*args, **kwargs), dex=dex, operation=operation))
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with rpc_tags(dex=dex, operation=operation):
+                    return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class RpcStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = defaultdict(lambda: [0, 0.0, 0])
+
+    def record(self, method: str, seconds: float, error: bool = False):
+        tags = _tags.get()
+        key = (method, *(tags.get(name, '-') for name in TAG_NAMES))
+        with self.lock:
+            entry = self.calls[key]
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] += error
+
+    def rows(self) -> list[dict]:
+        with self.lock:
+            items = list(self.calls.items())
+        return [
+            {'method': key[0], **dict(zip(TAG_NAMES, key[1:])), 'calls': calls, 'seconds': round(seconds, 6), 'errors': errors}
+            for key, (calls, seconds, errors) in items
+        ]
+
+    def prometheus(self) -> str:
+        lines = []
+        for metric, field, help_text in [
+            ('zksync_rpc_requests_total', 'calls', 'JSON-RPC requests'),
+            ('zksync_rpc_request_seconds_total', 'seconds', 'Time spent in JSON-RPC requests'),
+            ('zksync_rpc_errors_total', 'errors', 'Failed JSON-RPC requests'),
+        ]:
+            lines.append(f'# HELP {metric} {help_text}')
+            lines.append(f'# TYPE {metric} counter')
+            for row in self.rows():
+                labels = ','.join(f'{name}="{row[name]}"' for name in ('method',) + TAG_NAMES)
+                lines.append(f'{metric}{{{labels}}} {row[field]}')
+        return '\n'.join(lines) + '\n'
+
+    def export(self, path: str = RPC_METRICS_PATH):
+        if not path:
+            return
+        with open(path, 'w') as file:
+            if path.endswith('.json'):
+                json.dump({'generated': time.time(), 'calls': self.rows()}, file, indent=2)
+            else:
+                file.write(self.prometheus())
+
+    def summary(self, limit: int = 25) -> list[str]:
+        totals = defaultdict(lambda: [0, 0.0, 0])
+        wallets = set()
+        for row in self.rows():
+            entry = totals[(row['dex'], row['operation'], row['method'])]
+            entry[0] += row['calls']
+            entry[1] += row['seconds']
+            entry[2] += row['errors']
+            if row['wallet'] != '-':
+                wallets.add(row['wallet'])
+
+        lines = [f'{"dex":<10} {"operation":<22} {"method":<26} {"calls":>7} {"per wallet":>10} {"avg, ms":>8} {"errors":>6}']
+        for (dex, operation, method), (calls, seconds, errors) in sorted(totals.items(), key=lambda item: -item[1][0])[:limit]:
+            per_wallet = f'{calls / len(wallets):.1f}' if wallets else '-'
+            lines.append(f'{dex:<10} {operation:<22} {method:<26} {calls:>7} {per_wallet:>10} '
+                         f'{seconds / calls * 1000:>8.1f} {errors:>6}')
+        lines.append(f'Всего RPC запросов: {sum(entry[0] for entry in totals.values())}, кошельков: {len(wallets)}')
+        return lines
+
+    def report(self):
+        for line in self.summary():
+            logging.info(f'RPC | {line}')
+        self.export()
+
+
+def is_error(response) -> bool:
+    return not isinstance(response, dict) or 'error' in response
+
+
+def rpc_accounting(make_request, w3):
+    def middleware(method, params):
+        started = time.perf_counter()
+        response = None
+        try:
+            response = make_request(method, params)
+            return response
+        finally:
+            rpc_stats.record(method, time.perf_counter() - started, is_error(response))
+    return middleware
+
+
+async def async_rpc_accounting(make_request, w3):
+    async def middleware(method, params):
+        started = time.perf_counter()
+        response = None
+        try:
+            response = await make_request(method, params)
+            return response
+        finally:
+            rpc_stats.record(method, time.perf_counter() - started, is_error(response))
+    return middleware
+
+
+rpc_stats = RpcStats()
@@ -1,22 +1,32 @@
-import time
 import random
 from web3 import Web3
 from loguru import logger as logging
 
+from src import journal
+from src.gas import gas_oracle
+from src.plan import fleet_plan, pick
+from src.deposits import deposit_tracker, priority_hash
+from src.rpc_metrics import rpc_operation, tag_steps
+from src.scheduler import drive
+from src.utils import value_for_logs
+from src.venues import quote_venues, best_venue, format_table
 from src.inch import Inch
 from src.odos import Odos
 from src.woofi import WooFi
+from src.keys import WalletHandle
 from src.account import Account
+from src.providers import get_web3
 from src.spacefi import SpaceFi
 from src.syncswap import SyncSwap
 from src.main_bridge import MainBridge
 from config import TOKENS, SLEEP_TRANSACTIONS, MIN_BALANCE_FOR_GAS, BALANCE_PERCENTAGE, BRIDGE, GAS_THRESHOLD
+from config import ETHEREUM_RPC, SLEEP_WALLETS, BEST_EXECUTION, SCAN
 
 
 class Runner:
     def __init__(self, account: Account):
         self.account = account
-        self.w3_eth = Web3(Web3.HTTPProvider("https://eth.llamarpc.com"))
+        self.w3_eth = get_web3(ETHEREUM_RPC)
         self.tokens = {'eth': 0.35, 'usdc': 0.25, 'usdt': 0.2, 'busd': 0.2}  # token: proba
         self.dapps = {
             'odos': Odos(self.account),
@@ -27,6 +37,9 @@ class Runner:
         }
 
     def start(self):
+        drive(self.steps())
+
+    def steps(self):
         address = self.account.address
         transactions = self.account.db[address]["transactions"]
 
@@ -40,9 +53,9 @@ class Runner:
             del self.dapps['odos']
 
         if self.account.progress['volumes']:
-            self.volumes_runner()
+            yield from self.volumes_runner()
         else:
-            self.base_runner()
+            yield from self.base_runner()
         
         completed_trx = transactions - self.account.progress["transactions"]
         if completed_trx == 0:
@@ -63,43 +76,43 @@ class Runner:
             self.account.progress['bridge'] = False
 
         if self.account.progress['bridge']:
-            status = MainBridge(self.account).deposit()
+            journal.begin(self.account.address, 'bridge', 'deposit', 'bridge')
+            receipt = yield from MainBridge(self.account).deposit()
             self.account.progress['bridge'] = False
             self.account.save_db()
-            time.sleep(random.randint(60, 120))
-            attempt = 0
-            while status and self.account.get_native_balance() == 0 and attempt < 5:
-                attempt += 1
-                time.sleep(random.randint(60, 120))
-
-        iters_per_dapps = self.account.init_iters_per_dapps()
-        for iters in iters_per_dapps:
-            self.gas_tracker()
-            dapp_name = random.choice(list(self.dapps.keys()))
+            if receipt:
+                yield from self.wait_deposit(receipt)
+
+        for dapp_name, steps in self.next_run():
+            yield from self.gas_tracker()
+            dapp_name = self.plan_dapp(dapp_name, steps)
             dapp = self.dapps[dapp_name]
-            from_token, to_token = self.choice_token_pair(dapp_name, self.tokens, from_token)
+            from_token, to_token = yield from self.choice_token_pair(dapp_name, self.tokens, from_token, steps[0][0])
 
-            for _ in range(iters):
-                amount = self.get_amount(from_token)
+            for i, (token_draw, size_draw) in enumerate(steps):
+                amount = self.get_amount(from_token, fraction=size_draw)
                 if amount < 0 or from_token == to_token:
                     logging.error(f'{self.account.address} | Недостаточно ETH для оплаты газа')
                     return
 
-                if not dapp.swap(from_token, to_token, amount):
-                    break
+                if BEST_EXECUTION:
+                    dapp_name = self.choice_best_dapp(from_token, to_token, amount) or dapp_name
+                    dapp = self.dapps[dapp_name]
 
-                self.stake_runner(dapp, dapp_name, to_token)
+                journal.begin(self.account.address, dapp_name, 'swap', 'transactions')
+                if not (yield from dapp.swap(from_token, to_token, amount)):
+                    journal.abandon(self.account.address)
+                    break
 
                 self.account.progress['transactions'] -= 1
                 self.account.save_db()
-                from_token, to_token = self.choice_token_pair(dapp_name, self.tokens, to_token)
-                time.sleep(random.randint(*SLEEP_TRANSACTIONS))
 
-    def volumes_runner(self):
-        transactions_threshold = random.randint(10, 13)
-        transactions = self.account.progress['transactions']
-        transactions = transactions_threshold if transactions > transactions_threshold else transactions
+                yield from self.stake_runner(dapp, dapp_name, to_token)
+                token_draw = steps[i + 1][0] if i + 1 < len(steps) else token_draw
+                from_token, to_token = yield from self.choice_token_pair(dapp_name, self.tokens, to_token, token_draw)
+                yield random.randint(*SLEEP_TRANSACTIONS)
 
+    def volumes_runner(self):
         dapp = self.dapps['odos']
 
         try:
@@ -110,45 +123,99 @@ class Runner:
 
         if from_token == 'usdt':
             amount = self.get_amount(from_token, True)
-            if not dapp.swap(from_token, 'eth', amount):
+            if not (yield from dapp.swap(from_token, 'eth', amount)):
                 return
             from_token = 'eth'
-            time.sleep(random.randint(*SLEEP_TRANSACTIONS))
+            yield random.randint(*SLEEP_TRANSACTIONS)
 
         odos_tokens = self.tokens
         del odos_tokens['usdt']
 
-        from_token, to_token = self.choice_token_pair('odos', odos_tokens, from_token)
+        steps = [step for _, run_steps in self.next_run() for step in run_steps]
+        if not steps:
+            return
+        from_token, to_token = yield from self.choice_token_pair('odos', odos_tokens, from_token, steps[0][0])
 
-        for _ in range(transactions):
-            self.gas_tracker()
+        for i, (token_draw, size_draw) in enumerate(steps):
+            yield from self.gas_tracker()
 
-            amount = self.get_amount(from_token, True)
+            amount = self.get_amount(from_token, True, size_draw)
             if amount < 0 or from_token == to_token:
                 logging.error(f'{self.account.address} | Недостаточно ETH для оплаты газа')
                 return
 
-            if not dapp.swap(from_token, to_token, amount):
+            journal.begin(self.account.address, 'odos', 'swap', 'transactions')
+            if not (yield from dapp.swap(from_token, to_token, amount)):
+                journal.abandon(self.account.address)
                 break
 
             self.account.progress['transactions'] -= 1
             self.account.save_db()
-            from_token, to_token = self.choice_token_pair('odos', odos_tokens, to_token)
-            time.sleep(random.randint(*SLEEP_TRANSACTIONS))
+            token_draw = steps[i + 1][0] if i + 1 < len(steps) else token_draw
+            from_token, to_token = yield from self.choice_token_pair('odos', odos_tokens, to_token, token_draw)
+            yield random.randint(*SLEEP_TRANSACTIONS)
+
+    def next_run(self) -> list:
+        index = self.account.progress.get('run', 0)
+        self.account.progress['run'] = index + 1
+        return fleet_plan.run(self.account.address, index, self.account.progress)
+
+    def plan_dapp(self, dapp_name: str, steps: list) -> str:
+        if dapp_name in self.dapps:
+            return dapp_name
+        names = list(self.dapps)
+        return names[int(steps[0][0] * len(names))]
+
+    @rpc_operation('deposit', 'bridge')
+    def wait_deposit(self, receipt):
+        l2_hash = priority_hash(receipt)
+        if l2_hash is None:
+            yield from self.poll_deposit()
+            return
 
+        deposit = deposit_tracker.track(l2_hash, self.account.address)
+        yield deposit
+        l2_receipt = deposit.result()
+        if l2_receipt is not None and l2_receipt['status'] == 1:
+            self.account.state.invalidate(l2_receipt['blockNumber'])
+            logging.success(f'{self.account.address} | Main Bridge | Депозит исполнен в zkSync Era: {SCAN}/tx/{l2_hash}')
+            return
+
+        if l2_receipt is not None:
+            logging.error(f'{self.account.address} | Main Bridge | Депозит не исполнен в zkSync Era: {SCAN}/tx/{l2_hash}')
+        yield from self.poll_deposit()
+
+    def poll_deposit(self):
+        yield random.randint(60, 120)
+        attempt = 0
+        while attempt < 5:
+            self.account.state.invalidate()
+            if self.account.get_native_balance() > 0:
+                break
+            attempt += 1
+            yield random.randint(60, 120)
+
+    @rpc_operation('stake_runner')
     def stake_runner(self, dapp, dapp_name, to_token):
-        time.sleep(random.randint(*SLEEP_TRANSACTIONS))
+        yield random.randint(*SLEEP_TRANSACTIONS)
 
         if dapp_name == 'spacefi' and self.account.check_enough_fee() and self.account.progress['spacefi_deposit'] > 0:
-            if dapp.add_liquidity(to_token):
+            journal.begin(self.account.address, 'spacefi', 'add_liquidity', 'spacefi_deposit')
+            if (yield from dapp.add_liquidity(to_token)):
                 self.account.progress['spacefi_deposit'] -= 1
                 self.account.save_db()
+            else:
+                journal.abandon(self.account.address)
         elif dapp_name == 'syncswap' and self.account.check_enough_fee() and self.account.progress['syncswap_deposit'] > 0:
-            if dapp.add_liquidity():
+            journal.begin(self.account.address, 'syncswap', 'add_liquidity', 'syncswap_deposit')
+            if (yield from dapp.add_liquidity()):
                 self.account.progress['syncswap_deposit'] -= 1
                 self.account.save_db()
+            else:
+                journal.abandon(self.account.address)
 
-    def choice_token_pair(self, dapp_name: str, tokens: dict, to_token: str) -> tuple:
+    @rpc_operation('choice_token_pair')
+    def choice_token_pair(self, dapp_name: str, tokens: dict, to_token: str, draw: float = None) -> tuple:
         from_token = to_token
         random_dex = random.choice(['syncswap', 'spacefi'])
 
@@ -156,39 +223,54 @@ class Runner:
             return 'eth', 'eth'
         elif from_token != 'eth' and self.account.get_native_balance() < 0.000635 * 10 ** 18:
             if dapp_name == 'woofi' and from_token != 'usdc':
-                self.dapps[random_dex].swap(from_token, 'eth', self.get_amount(from_token))
-                time.sleep(random.randint(*SLEEP_TRANSACTIONS))
-                return self.choice_token_pair(dapp_name, tokens, 'eth')
+                yield from self.dapps[random_dex].swap(from_token, 'eth', self.get_amount(from_token))
+                yield random.randint(*SLEEP_TRANSACTIONS)
+                return (yield from self.choice_token_pair(dapp_name, tokens, 'eth', draw))
             else:
                 return from_token, 'eth'
 
         if dapp_name == 'woofi':
             to_token = 'usdc' if from_token == 'eth' else 'eth'
             if from_token not in ['eth', 'usdc']:
-                self.dapps[random_dex].swap(from_token, to_token, self.get_amount(from_token))
-                time.sleep(random.randint(*SLEEP_TRANSACTIONS))
-                from_token, to_token = self.choice_token_pair(dapp_name, tokens, to_token)
+                yield from self.dapps[random_dex].swap(from_token, to_token, self.get_amount(from_token))
+                yield random.randint(*SLEEP_TRANSACTIONS)
+                from_token, to_token = yield from self.choice_token_pair(dapp_name, tokens, to_token, draw)
 
             return from_token, to_token
 
         tokens_temp = {token: p for token, p in tokens.items() if token != from_token}
-        proba = [p / sum(list(tokens_temp.values())) for p in list(tokens_temp.values())]
-        to_token = random.choices(list(tokens_temp.keys()), proba)[0]
-        return from_token, to_token
+        return from_token, pick(tokens_temp, draw)
+
+    def choice_best_dapp(self, from_token: str, to_token: str, amount: int):
+        rows = quote_venues(self.dapps, from_token, to_token, amount)
+        logging.info(f'{self.account.address} | Котировки {value_for_logs(from_token, amount)} -> {to_token}:\n'
+                     f'{format_table(rows, to_token)}')
+        return best_venue(rows)
 
-    def get_amount(self, from_token: str, volumes: bool = False) -> int:
+    @rpc_operation('balances')
+    def get_amount(self, from_token: str, volumes: bool = False, fraction: float = None) -> int:
         if from_token == 'eth' and volumes:
-            amount = self.account.get_native_balance() - int(random.uniform(*MIN_BALANCE_FOR_GAS) * 10 ** 18)
+            amount = self.account.get_native_balance() - int((fraction or random.uniform(*MIN_BALANCE_FOR_GAS)) * 10 ** 18)
         elif from_token == 'eth':
-            amount = (self.account.get_native_balance() - 0.00038 * 10 ** 18) * random.uniform(*BALANCE_PERCENTAGE)
+            amount = (self.account.get_native_balance() - 0.00038 * 10 ** 18) * (fraction or random.uniform(*BALANCE_PERCENTAGE))
         else:
             amount = self.account.get_token_data(TOKENS[from_token])['balance_wei']
 
         return int(amount)
 
+    @rpc_operation('gas_tracker')
     def gas_tracker(self):
-        gas_price = Web3.from_wei(self.w3_eth.eth.gas_price, 'gwei')
+        gas_price = Web3.from_wei(gas_oracle.gas_price(self.w3_eth), 'gwei')
         while gas_price > GAS_THRESHOLD:
             print(f'Gas price: {round(gas_price, 1)}')
-            time.sleep(30)
-            gas_price = Web3.from_wei(self.w3_eth.eth.gas_price, 'gwei')
+            yield 30
+            gas_price = Web3.from_wei(gas_oracle.gas_price(self.w3_eth), 'gwei')
+
+
+def wallet_steps(wallet: WalletHandle, db: dict):
+    account = wallet.load()
+    while account.address in db:
+        account.init_db(db)
+        yield from tag_steps(Runner(account).steps(), wallet=account.address)
+        yield random.randint(*SLEEP_WALLETS)
+    wallet.release()
@@ -0,0 +1,125 @@
+import time
+import heapq
+import itertools
+import threading
+from loguru import logger as logging
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+
+from src.rpc_metrics import rpc_stats
+from config import WORKERS, STATS_INTERVAL
+
+
+class Scheduler:
+    def __init__(self, workers: int = WORKERS, stats_interval: int = STATS_INTERVAL):
+        self.workers = workers
+        self.stats_interval = stats_interval
+        self.executor = ThreadPoolExecutor(workers)
+        self.condition = threading.Condition()
+        self.counter = itertools.count()
+        self.timers = []
+        self.active = 0
+        self.waiting = 0
+        self.steps = 0
+        self.completed = 0
+        self.failed = 0
+        self.max_queue = 0
+        self.started_at = time.monotonic()
+
+    def add(self, name: str, steps, delay: float = 0):
+        with self.condition:
+            heapq.heappush(self.timers, (time.monotonic() + delay, next(self.counter), name, steps))
+            self.condition.notify()
+
+    def run(self):
+        next_report = time.monotonic() + self.stats_interval
+
+        with self.condition:
+            while self.timers or self.active or self.waiting:
+                now = time.monotonic()
+                while self.timers and self.timers[0][0] <= now and self.active < self.workers:
+                    _, _, name, steps = heapq.heappop(self.timers)
+                    self.active += 1
+                    self.executor.submit(self.step, name, steps)
+
+                self.max_queue = max(self.max_queue, self.queue_depth(now))
+                if now >= next_report:
+                    self.report()
+                    next_report = now + self.stats_interval
+
+                timeout = next_report - now
+                if self.timers and self.active < self.workers:
+                    timeout = min(timeout, self.timers[0][0] - now)
+                self.condition.wait(max(timeout, 0))
+
+        self.executor.shutdown()
+        self.report()
+
+    def step(self, name: str, steps):
+        delay, done, failed = 0, False, False
+        try:
+            delay = next(steps)
+        except StopIteration:
+            done = True
+        except Exception as err:
+            logging.error(f'{name} | {err}')
+            done, failed = True, True
+
+        with self.condition:
+            self.active -= 1
+            self.steps += 1
+            self.failed += failed
+            if done:
+                self.completed += 1
+            elif isinstance(delay, Future):
+                self.waiting += 1
+                delay.add_done_callback(lambda _: self.wake(name, steps))
+            else:
+                heapq.heappush(self.timers, (time.monotonic() + delay, next(self.counter), name, steps))
+            self.condition.notify()
+
+    def wake(self, name: str, steps):
+        with self.condition:
+            self.waiting -= 1
+            heapq.heappush(self.timers, (time.monotonic(), next(self.counter), name, steps))
+            self.condition.notify()
+
+    def queue_depth(self, now: float) -> int:
+        return sum(1 for ready_at, *_ in self.timers if ready_at <= now)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        minutes = max(now - self.started_at, 1) / 60
+        return {
+            'active': self.active,
+            'queued': self.queue_depth(now),
+            'max_queued': self.max_queue,
+            'sleeping': len(self.timers) - self.queue_depth(now),
+            'waiting': self.waiting,
+            'steps': self.steps,
+            'completed': self.completed,
+            'failed': self.failed,
+            'steps_per_min': round(self.steps / minutes, 2),
+            'wallets_per_min': round(self.completed / minutes, 3),
+        }
+
+    def report(self):
+        stats = self.stats()
+        logging.info(f'Scheduler | Активно: {stats["active"]}/{self.workers} | Очередь: {stats["queued"]} '
+                     f'(макс. {stats["max_queued"]}) | Ожидают: {stats["sleeping"]} | Ждут событий: {stats["waiting"]} | '
+                     f'Шагов: {stats["steps"]} ({stats["steps_per_min"]}/мин) | '
+                     f'Завершено кошельков: {stats["completed"]} ({stats["wallets_per_min"]}/мин) | '
+                     f'Ошибок: {stats["failed"]}')
+        rpc_stats.export()
+
+
+def drive(steps):
+    try:
+        delay = next(steps)
+        while True:
+            if isinstance(delay, Future):
+                wait([delay])
+            else:
+                time.sleep(delay)
+            delay = next(steps)
+    except StopIteration as stop:
+        return stop.value
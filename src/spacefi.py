@@ -1,13 +1,16 @@
 import time
-import json
 import random
 from web3 import Web3
 from loguru import logger as logging
 
 
+from src.gas import gas_oracle, gas_model, gas_key
+from src.rpc_metrics import rpc_operation
+from src.quotes import quote_engine
 from src.account import Account
-from src.utils import check_allowance, value_for_logs
-from config import TOKENS, SPACEFI_ROUTER_ADDRESS, LIQUIDITY_AMOUNT, GAS_THRESHOLD
+from src.contracts import get_contract
+from src.utils import check_allowance, confirm_approve, send_transaction, wait_for_receipt, value_for_logs
+from config import TOKENS, SPACEFI_ROUTER_ADDRESS, LIQUIDITY_AMOUNT
 
 
 class SpaceFi:
@@ -16,8 +19,9 @@ class SpaceFi:
         self.retries = retries
         self.account = account
         self.router_address = Web3.to_checksum_address(SPACEFI_ROUTER_ADDRESS)
-        self.router = self.w3.eth.contract(self.router_address, abi=json.load(open('ABIs/spacefi_router.json')))
+        self.router = get_contract(self.w3, self.router_address, 'spacefi_router')
 
+    @rpc_operation('swap', 'spacefi')
     def swap(self, from_token: str, to_token: str, amount: int, retry: int = 0) -> bool:
         address = Web3.to_checksum_address(self.account.address)
         from_token_address = Web3.to_checksum_address(TOKENS[from_token])
@@ -26,47 +30,48 @@ class SpaceFi:
         deadline = int(time.time() + 1800)
 
         try:
-            if from_token == 'eth':
-                amount_out = self.get_amount_out(from_token, to_token, amount)[-1]
-
-                swap_txn = self.router.functions.swapExactETHForTokens(
-                    amount_out,
-                    [from_token_address, to_token_address],
-                    address,
-                    deadline
-                ).build_transaction({
-                    'from': address,
-                    'value': amount if from_token.lower() == 'eth' else 0,
-                    'nonce': self.w3.eth.get_transaction_count(address),
-                    'gas': 0,
-                    'maxFeePerGas': self.w3.eth.gas_price,
-                    'maxPriorityFeePerGas': self.w3.eth.gas_price,
-                })
-            else:
-                token = self.w3.eth.contract(address=from_token_address, abi=json.load(open('ABIs/erc20_abi.json')))
-                amount_out = self.get_amount_out(from_token, to_token, amount)[-1]
-
-                check_allowance(self.w3, token, address, self.router_address, amount, self.account.key)
-
-                txn_info = {
-                    'from': address,
-                    'value': amount if from_token.lower() == 'eth' else 0,
-                    'nonce': self.w3.eth.get_transaction_count(address),
-                    'gas': 0,
-                    'maxFeePerGas': self.w3.eth.gas_price,
-                    'maxPriorityFeePerGas': self.w3.eth.gas_price,
-                }
-                params = [amount, amount_out, [from_token_address, to_token_address], address, deadline]
-
-                if to_token == 'eth':
-                    swap_txn = self.router.functions.swapExactTokensForETH(*params).build_transaction(txn_info)
+            swap_gas = gas_key('spacefi', 'swap', from_token, to_token)
+            approval = None
+            try:
+                if from_token == 'eth':
+                    amount_out = self.get_amount_out(from_token, to_token, amount)[-1]
+
+                    swap_txn = self.router.functions.swapExactETHForTokens(
+                        amount_out,
+                        [from_token_address, to_token_address],
+                        address,
+                        deadline
+                    ).build_transaction({
+                        'from': address,
+                        'value': amount if from_token.lower() == 'eth' else 0,
+                        'gas': 0,
+                        'maxFeePerGas': gas_oracle.gas_price(self.w3),
+                        'maxPriorityFeePerGas': gas_oracle.gas_price(self.w3),
+                    })
                 else:
-                    swap_txn = self.router.functions.swapExactTokensForTokens(*params).build_transaction(txn_info)
-
-            swap_txn['gas'] = random.randint(870000, 950000) if GAS_THRESHOLD < 21 else self.w3.eth.estimate_gas(swap_txn)
-            signed_swap_txn = self.w3.eth.account.sign_transaction(swap_txn, self.account.key)
-            swap_txn_hash = self.w3.eth.send_raw_transaction(signed_swap_txn.rawTransaction)
-            status = self.w3.eth.wait_for_transaction_receipt(swap_txn_hash, timeout=300).status
+                    amount_out = self.get_amount_out(from_token, to_token, amount)[-1]
+
+                    approval = yield from check_allowance(self.w3, from_token_address, address, self.router_address, amount, self.account.key, swap_gas)
+
+                    txn_info = {
+                        'from': address,
+                        'value': amount if from_token.lower() == 'eth' else 0,
+                        'gas': 0,
+                        'maxFeePerGas': gas_oracle.gas_price(self.w3),
+                        'maxPriorityFeePerGas': gas_oracle.gas_price(self.w3),
+                    }
+                    params = [amount, amount_out, [from_token_address, to_token_address], address, deadline]
+
+                    if to_token == 'eth':
+                        swap_txn = self.router.functions.swapExactTokensForETH(*params).build_transaction(txn_info)
+                    else:
+                        swap_txn = self.router.functions.swapExactTokensForTokens(*params).build_transaction(txn_info)
+
+                swap_txn['gas'] = gas_model.gas_limit(self.w3, swap_txn, swap_gas)
+                swap_txn_hash = send_transaction(self.w3, swap_txn, address, self.account.key, gas_key=swap_gas)
+                status = (yield from wait_for_receipt(self.w3, swap_txn_hash, address)).status
+            finally:
+                yield from confirm_approve(self.w3, approval, address)
 
             if status == 1:
                 trx = f'https://explorer.zksync.io/tx/{swap_txn_hash.hex()}'
@@ -77,8 +82,8 @@ class SpaceFi:
                 logging.error(f'{address} | SpaceFi swap {retry}/{self.retries} | {value_for_logs(from_token, amount)}'
                               f' -> {to_token}')
                 if retry < self.retries:
-                    time.sleep(random.randint(35, 60))
-                    self.swap(from_token, to_token, amount, retry + 1)
+                    yield random.randint(35, 60)
+                    return (yield from self.swap(from_token, to_token, amount, retry + 1))
                 else:
                     return False
 
@@ -86,11 +91,12 @@ class SpaceFi:
             logging.error(f'{address} | SpaceFi swap {retry}/{self.retries} | {value_for_logs(from_token, amount)}'
                           f' -> {to_token} | {err}')
             if retry < self.retries:
-                time.sleep(random.randint(35, 60))
-                self.swap(from_token, to_token, amount, retry + 1)
+                yield random.randint(35, 60)
+                return (yield from self.swap(from_token, to_token, amount, retry + 1))
             else:
                 return False
 
+    @rpc_operation('add_liquidity', 'spacefi')
     def add_liquidity(self, to_token: str) -> bool:
         address = Web3.to_checksum_address(self.account.address)
         amount = int(random.uniform(*LIQUIDITY_AMOUNT) * 10 ** 18)
@@ -112,16 +118,15 @@ class SpaceFi:
             ).build_transaction({
                     'from': address,
                     'value': amount,
-                    'nonce': self.w3.eth.get_transaction_count(address),
                     'gas': 0,
-                    'maxFeePerGas': self.w3.eth.gas_price,
-                    'maxPriorityFeePerGas': self.w3.eth.gas_price,
+                    'maxFeePerGas': gas_oracle.gas_price(self.w3),
+                    'maxPriorityFeePerGas': gas_oracle.gas_price(self.w3),
             })
 
-            txn['gas'] = self.w3.eth.estimate_gas(txn)
-            signed_swap_txn = self.w3.eth.account.sign_transaction(txn, self.account.key)
-            swap_txn_hash = self.w3.eth.send_raw_transaction(signed_swap_txn.rawTransaction)
-            status = self.w3.eth.wait_for_transaction_receipt(swap_txn_hash, timeout=300).status
+            liquidity_gas = gas_key('spacefi', 'add_liquidity', 'eth', to_token)
+            txn['gas'] = gas_model.gas_limit(self.w3, txn, liquidity_gas)
+            swap_txn_hash = send_transaction(self.w3, txn, address, self.account.key, gas_key=liquidity_gas)
+            status = (yield from wait_for_receipt(self.w3, swap_txn_hash, address)).status
 
             if status == 1:
                 trx = f'https://explorer.zksync.io/tx/{swap_txn_hash.hex()}'
@@ -134,13 +139,8 @@ class SpaceFi:
             logging.error(f'{address} | SpaceFi add liquidity error: {err}')
 
     def get_amount_out(self, from_token: str, to_token: str, amount: int):
-        amount_out = self.router.functions.getAmountsOut(
-            amount,
-            [
-                Web3.to_checksum_address(TOKENS[from_token]),
-                Web3.to_checksum_address(TOKENS[to_token])
-            ]
-        ).call()
-
-        return amount_out
+        return [amount, quote_engine.spacefi_amount_out(self.w3, from_token, to_token, amount)]
 
+    @rpc_operation('quote', 'spacefi')
+    def get_quote(self, from_token: str, to_token: str, amount: int) -> dict:
+        return {'amount_out': self.get_amount_out(from_token, to_token, amount)[-1], 'gas': None}
@@ -0,0 +1,90 @@
+import time
+import threading
+from web3 import Web3
+
+from src.multicall import STABLES
+from config import TOKENS, ACCOUNT_STATE_TTL
+
+L2_ETH_TOKEN = '0x000000000000000000000000000000000000800a'
+TRANSFER = Web3.keccak(text='Transfer(address,address,uint256)')
+MINT = Web3.keccak(text='Mint(address,uint256)')
+
+_states = dict()
+_states_lock = threading.Lock()
+
+
+def topic_address(topic) -> str:
+    return Web3.to_checksum_address(bytes(topic)[-20:])
+
+
+class AccountState:
+    def __init__(self, address: str, ttl: float = ACCOUNT_STATE_TTL):
+        self.address = Web3.to_checksum_address(address)
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.tokens = {L2_ETH_TOKEN: 'eth', **{TOKENS[symbol].lower(): symbol for symbol in STABLES}}
+        self.balances = dict()
+        self.gas_price = 0
+        self.block = 0
+        self.expires_at = 0
+        self.refreshes = 0
+        self.updates = 0
+
+    def fresh(self) -> bool:
+        with self.lock:
+            return time.monotonic() < self.expires_at and 'eth' in self.balances
+
+    def update(self, balances: dict[str, int], gas_price: int):
+        with self.lock:
+            self.balances = dict(balances)
+            self.gas_price = gas_price
+            self.expires_at = time.monotonic() + self.ttl
+            self.refreshes += 1
+
+    def invalidate(self, block: int = 0):
+        with self.lock:
+            self.expires_at = 0
+            self.block = max(self.block, block)
+
+    def symbol(self, token_address: str):
+        return self.tokens.get(token_address.lower())
+
+    def apply(self, receipt):
+        native = False
+
+        with self.lock:
+            for log in receipt.get('logs', []):
+                symbol = self.tokens.get(log['address'].lower())
+                if symbol is None or len(log['topics']) != 3 or bytes(log['topics'][0]) != TRANSFER:
+                    continue
+
+                value = int.from_bytes(bytes(log['data']), 'big')
+                sender, recipient = topic_address(log['topics'][1]), topic_address(log['topics'][2])
+                if sender == self.address and symbol in self.balances:
+                    self.balances[symbol] -= value
+                if recipient == self.address and symbol in self.balances:
+                    self.balances[symbol] += value
+                native = native or (symbol == 'eth' and self.address in (sender, recipient))
+
+            if native:
+                self.block = max(self.block, receipt['blockNumber'])
+            else:
+                self.balances.pop('eth', None)
+            self.updates += 1
+
+
+def get_state(address: str) -> AccountState:
+    address = Web3.to_checksum_address(address)
+    with _states_lock:
+        state = _states.get(address)
+        if state is None:
+            state = AccountState(address)
+            _states[address] = state
+
+    return state
+
+
+def state_stats() -> dict[str, int]:
+    with _states_lock:
+        states = list(_states.values())
+    return {'refreshes': sum(state.refreshes for state in states), 'updates': sum(state.updates for state in states)}
@@ -0,0 +1,220 @@
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DB_PATH = 'data/progress.db'
+JSON_DB_PATH = 'data/db.json'
+
+
+class ProgressStore:
+    def __init__(self, path: str = DB_PATH, json_path: str = JSON_DB_PATH):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS wallets (address TEXT PRIMARY KEY, progress TEXT NOT NULL)')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS journal (txn_hash TEXT PRIMARY KEY, address TEXT NOT NULL, endpoint TEXT NOT NULL, '
+            'nonce INTEGER NOT NULL, kind TEXT NOT NULL, intent_id TEXT, intent TEXT, status INTEGER, created REAL NOT NULL)'
+        )
+        self.conn.execute('CREATE INDEX IF NOT EXISTS journal_intent ON journal (intent_id)')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS pools (factory TEXT NOT NULL, token_a TEXT NOT NULL, token_b TEXT NOT NULL, '
+            'pool TEXT NOT NULL, PRIMARY KEY (factory, token_a, token_b))'
+        )
+        self.conn.execute('CREATE TABLE IF NOT EXISTS gas_samples (key TEXT PRIMARY KEY, samples TEXT NOT NULL)')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS gas_estimates (key TEXT PRIMARY KEY, estimate INTEGER NOT NULL)')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS plans (address TEXT PRIMARY KEY, plan TEXT NOT NULL)')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS key_index (fingerprint TEXT PRIMARY KEY, address TEXT NOT NULL)')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS balances (address TEXT NOT NULL, symbol TEXT NOT NULL, balance TEXT NOT NULL, '
+            'PRIMARY KEY (address, symbol))'
+        )
+        self.import_json(json_path)
+
+    def import_json(self, json_path: str):
+        with self.lock:
+            if self.conn.execute("SELECT 1 FROM meta WHERE key = 'json_imported'").fetchone():
+                return
+
+            db = dict()
+            if os.path.exists(json_path):
+                with open(json_path) as file:
+                    db = json.load(file)
+
+            self.conn.execute('BEGIN')
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO wallets (address, progress) VALUES (?, ?)',
+                [(address, json.dumps(progress)) for address, progress in db.items()]
+            )
+            self.conn.execute("INSERT INTO meta (key, value) VALUES ('json_imported', '1')")
+            self.conn.execute('COMMIT')
+
+    def load(self) -> dict[str, dict]:
+        with self.lock:
+            rows = self.conn.execute('SELECT address, progress FROM wallets').fetchall()
+        return {address: json.loads(progress) for address, progress in rows}
+
+    def save(self, address: str, progress: dict, intent_id: str = None):
+        with self.lock:
+            self.conn.execute('BEGIN')
+            self.conn.execute(
+                'INSERT INTO wallets (address, progress) VALUES (?, ?) '
+                'ON CONFLICT(address) DO UPDATE SET progress = excluded.progress',
+                (address, json.dumps(progress))
+            )
+            self.conn.execute('DELETE FROM journal WHERE intent_id = ?', (intent_id,))
+            self.conn.execute('COMMIT')
+
+    def delete(self, address: str, intent_id: str = None):
+        with self.lock:
+            self.conn.execute('BEGIN')
+            self.conn.execute('DELETE FROM wallets WHERE address = ?', (address,))
+            self.conn.execute('DELETE FROM journal WHERE intent_id = ?', (intent_id,))
+            self.conn.execute('COMMIT')
+
+    def journal_record(self, txn_hash: str, address: str, endpoint: str, nonce: int, kind: str, intent: dict = None):
+        with self.lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO journal (txn_hash, address, endpoint, nonce, kind, intent_id, intent, status, created) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, NULL, ?)',
+                (txn_hash, address, endpoint, nonce, kind, intent and intent['id'], intent and json.dumps(intent), time.time())
+            )
+
+    def journal_resolve(self, txn_hash: str, status: int):
+        with self.lock:
+            self.conn.execute('DELETE FROM journal WHERE txn_hash = ? AND intent_id IS NULL', (txn_hash,))
+            self.conn.execute('UPDATE journal SET status = ? WHERE txn_hash = ?', (status, txn_hash))
+
+    def journal_discard(self, txn_hash: str):
+        with self.lock:
+            self.conn.execute('DELETE FROM journal WHERE txn_hash = ?', (txn_hash,))
+
+    def journal_abandon(self, intent_id: str):
+        with self.lock:
+            self.conn.execute('DELETE FROM journal WHERE intent_id = ? AND status IS NOT NULL', (intent_id,))
+
+    def journal_entries(self) -> list[dict]:
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT txn_hash, address, endpoint, nonce, kind, intent, status FROM journal ORDER BY created'
+            ).fetchall()
+
+        return [
+            {
+                'txn_hash': txn_hash, 'address': address, 'endpoint': endpoint, 'nonce': nonce, 'kind': kind,
+                'intent': json.loads(intent) if intent else None, 'status': status
+            }
+            for txn_hash, address, endpoint, nonce, kind, intent, status in rows
+        ]
+
+    def load_pools(self) -> dict[tuple[str, str, str], str]:
+        with self.lock:
+            rows = self.conn.execute('SELECT factory, token_a, token_b, pool FROM pools').fetchall()
+        return {(factory, token_a, token_b): pool for factory, token_a, token_b, pool in rows}
+
+    def save_pools(self, pools: dict[tuple[str, str, str], str]):
+        with self.lock:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO pools (factory, token_a, token_b, pool) VALUES (?, ?, ?, ?)',
+                [(*key, pool) for key, pool in pools.items()]
+            )
+
+    def load_gas_samples(self) -> dict[str, list[int]]:
+        with self.lock:
+            rows = self.conn.execute('SELECT key, samples FROM gas_samples').fetchall()
+        return {key: json.loads(samples) for key, samples in rows}
+
+    def save_gas_samples(self, key: str, samples: list[int]):
+        with self.lock:
+            self.conn.execute('INSERT OR REPLACE INTO gas_samples (key, samples) VALUES (?, ?)', (key, json.dumps(samples)))
+
+    def load_gas_estimates(self) -> dict[str, int]:
+        with self.lock:
+            return dict(self.conn.execute('SELECT key, estimate FROM gas_estimates').fetchall())
+
+    def save_gas_estimate(self, key: str, estimate: int):
+        with self.lock:
+            self.conn.execute('INSERT OR REPLACE INTO gas_estimates (key, estimate) VALUES (?, ?)', (key, estimate))
+
+    def load_plans(self) -> tuple[int, dict[str, list]]:
+        with self.lock:
+            seed = self.conn.execute("SELECT value FROM meta WHERE key = 'plan_seed'").fetchone()
+            rows = self.conn.execute('SELECT address, plan FROM plans').fetchall()
+        return int(seed[0]) if seed else None, {address: json.loads(plan) for address, plan in rows}
+
+    def save_plans(self, seed: int, plans: dict[str, list]):
+        with self.lock:
+            self.conn.execute('BEGIN')
+            self.conn.execute('DELETE FROM plans')
+            self.conn.executemany(
+                'INSERT INTO plans (address, plan) VALUES (?, ?)',
+                [(address, json.dumps(plan, separators=(',', ':'))) for address, plan in plans.items()]
+            )
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('plan_seed', ?)", (str(seed),))
+            self.conn.execute('COMMIT')
+
+    def load_key_index(self) -> dict[str, str]:
+        with self.lock:
+            rows = self.conn.execute('SELECT fingerprint, address FROM key_index').fetchall()
+        return dict(rows)
+
+    def save_key_index(self, index: dict[str, str]):
+        with self.lock:
+            self.conn.execute('BEGIN')
+            self.conn.executemany('INSERT OR REPLACE INTO key_index (fingerprint, address) VALUES (?, ?)', list(index.items()))
+            self.conn.execute('COMMIT')
+
+    def load_balances(self) -> tuple[int, dict[str, dict[str, int]]]:
+        with self.lock:
+            block = self.conn.execute("SELECT value FROM meta WHERE key = 'balances_block'").fetchone()
+            rows = self.conn.execute('SELECT address, symbol, balance FROM balances').fetchall()
+
+        balances = dict()
+        for address, symbol, balance in rows:
+            balances.setdefault(address, dict())[symbol] = int(balance)
+        return int(block[0]) if block else None, balances
+
+    def save_balances(self, block: int, balances: dict[str, dict[str, int]]):
+        with self.lock:
+            self.conn.execute('BEGIN')
+            self.conn.execute('DELETE FROM balances')
+            self.conn.executemany(
+                'INSERT INTO balances (address, symbol, balance) VALUES (?, ?, ?)',
+                [(address, symbol, str(balance)) for address, row in balances.items() for symbol, balance in row.items()]
+            )
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('balances_block', ?)", (str(block),))
+            self.conn.execute('COMMIT')
+
+    def replace(self, db: dict[str, dict]):
+        with self.lock:
+            self.conn.execute('BEGIN')
+            self.conn.execute('DELETE FROM wallets')
+            self.conn.executemany(
+                'INSERT INTO wallets (address, progress) VALUES (?, ?)',
+                [(address, json.dumps(progress)) for address, progress in db.items()]
+            )
+            self.conn.execute('COMMIT')
+
+
+_store = None
+_store_lock = threading.Lock()
+_executor = ThreadPoolExecutor(1, thread_name_prefix='store')
+
+
+def get_store() -> ProgressStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ProgressStore()
+    return _store
+
+
+async def offload(fn, *args, **kwargs):
+    return await asyncio.get_running_loop().run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
@@ -1,15 +1,18 @@
 import time
-import json
 import random
 from web3 import Web3
 from eth_abi import encode
 from loguru import logger as logging
 
 
+from src.gas import gas_oracle, gas_model, gas_key
+from src.rpc_metrics import rpc_operation
 from src.account import Account
-from src.utils import check_allowance, value_for_logs
-from config import TOKENS, LIQUIDITY_AMOUNT, SYNCSWAP_ROUTER_ADDRESS, GAS_THRESHOLD
-from config import SYNCSWAP_CLASSIC_POOL_FACTORY_ADDRESS, SYNCSWAP_STABLE_POOL_FACTORY_ADDRESS
+from src.pools import pool_cache
+from src.quotes import quote_engine
+from src.contracts import get_contract
+from src.utils import check_allowance, confirm_approve, send_transaction, wait_for_receipt, value_for_logs
+from config import TOKENS, LIQUIDITY_AMOUNT, SYNCSWAP_ROUTER_ADDRESS
 
 
 class SyncSwap:
@@ -19,61 +22,62 @@ class SyncSwap:
         self.retries = retries
         self.slippage = slippage
         self.router_address = Web3.to_checksum_address(SYNCSWAP_ROUTER_ADDRESS)
-        self.classic_pool_factory_address = Web3.to_checksum_address(SYNCSWAP_CLASSIC_POOL_FACTORY_ADDRESS)
-        self.stable_pool_factory_address = Web3.to_checksum_address(SYNCSWAP_STABLE_POOL_FACTORY_ADDRESS)
 
+    @rpc_operation('swap', 'syncswap')
     def swap(self, from_token: str, to_token: str, amount: int, retry: int = 0) -> bool:
         address = Web3.to_checksum_address(self.account.address)
         from_token_address = Web3.to_checksum_address(TOKENS[from_token])
 
         try:
-            if from_token != 'eth':
-                token = self.w3.eth.contract(address=from_token_address, abi=json.load(open('ABIs/erc20_abi.json')))
-                check_allowance(self.w3, token, address, self.router_address, amount, self.account.key)
+            swap_gas = gas_key('syncswap', 'swap', from_token, to_token)
+            approval = None
+            try:
+                if from_token != 'eth':
+                    approval = yield from check_allowance(self.w3, from_token_address, address, self.router_address, amount, self.account.key, swap_gas)
 
-            pool_address = self.get_pool_address(from_token, to_token)
+                pool_address = self.get_pool_address(from_token, to_token)
 
-            if pool_address == TOKENS['zero_address']:
-                logging.error(f"{address} | SyncSwap | Pool not exists")
-                return False
-
-            swap_data = encode(
-                ["address", "address", "uint8"],
-                [from_token_address, address, 1]
-            )
-
-            steps = [{
-                "pool": pool_address,
-                "data": swap_data,
-                "callback": TOKENS['zero_address'],
-                "callbackData": "0x",
-            }]
-
-            paths = [{
-                "steps": steps,
-                "tokenIn": from_token_address if from_token != 'eth' else TOKENS['zero_address'],
-                "amountIn": amount,
-            }]
-
-            router = self.w3.eth.contract(self.router_address, abi=json.load(open('ABIs/syncswap_router.json')))
-            amount_out = self.get_amount_out(pool_address, from_token_address, amount)
-
-            swap_txn = router.functions.swap(
-                paths,
-                int(amount_out - (amount_out * self.slippage // 1000)),
-                int(time.time() + 1800)
-            ).build_transaction({
-                'from': address,
-                'value': amount if from_token.lower() == 'eth' else 0,
-                'nonce': self.w3.eth.get_transaction_count(address),
-                'gas': 0,
-                'gasPrice': self.w3.eth.gas_price
-            })
+                if pool_address == TOKENS['zero_address']:
+                    logging.error(f"{address} | SyncSwap | Pool not exists")
+                    return False
 
-            swap_txn['gas'] = random.randint(870000, 950000) if GAS_THRESHOLD < 21 else self.w3.eth.estimate_gas(swap_txn)
-            signed_swap_txn = self.w3.eth.account.sign_transaction(swap_txn, self.account.key)
-            swap_txn_hash = self.w3.eth.send_raw_transaction(signed_swap_txn.rawTransaction)
-            status = self.w3.eth.wait_for_transaction_receipt(swap_txn_hash, timeout=300).status
+                swap_data = encode(
+                    ["address", "address", "uint8"],
+                    [from_token_address, address, 1]
+                )
+
+                steps = [{
+                    "pool": pool_address,
+                    "data": swap_data,
+                    "callback": TOKENS['zero_address'],
+                    "callbackData": "0x",
+                }]
+
+                paths = [{
+                    "steps": steps,
+                    "tokenIn": from_token_address if from_token != 'eth' else TOKENS['zero_address'],
+                    "amountIn": amount,
+                }]
+
+                router = get_contract(self.w3, self.router_address, 'syncswap_router')
+                amount_out = self.get_amount_out(from_token, to_token, amount)
+
+                swap_txn = router.functions.swap(
+                    paths,
+                    int(amount_out - (amount_out * self.slippage // 1000)),
+                    int(time.time() + 1800)
+                ).build_transaction({
+                    'from': address,
+                    'value': amount if from_token.lower() == 'eth' else 0,
+                    'gas': 0,
+                    'gasPrice': gas_oracle.gas_price(self.w3)
+                })
+
+                swap_txn['gas'] = gas_model.gas_limit(self.w3, swap_txn, swap_gas)
+                swap_txn_hash = send_transaction(self.w3, swap_txn, address, self.account.key, gas_key=swap_gas)
+                status = (yield from wait_for_receipt(self.w3, swap_txn_hash, address)).status
+            finally:
+                yield from confirm_approve(self.w3, approval, address)
 
             if status == 1:
                 trx = f'https://explorer.zksync.io/tx/{swap_txn_hash.hex()}'
@@ -84,8 +88,8 @@ class SyncSwap:
                 logging.error(f'{address} | SyncSwap swap {retry}/{self.retries} | {value_for_logs(from_token, amount)}'
                               f' -> {to_token}')
                 if retry < self.retries:
-                    time.sleep(random.randint(35, 60))
-                    self.swap(from_token, to_token, amount, retry + 1)
+                    yield random.randint(35, 60)
+                    return (yield from self.swap(from_token, to_token, amount, retry + 1))
                 else:
                     return False
 
@@ -93,16 +97,17 @@ class SyncSwap:
             logging.error(f'{address} | SyncSwap swap {retry}/{self.retries} | {value_for_logs(from_token, amount)}'
                           f' -> {to_token} | {err}')
             if retry < self.retries:
-                time.sleep(random.randint(35, 60))
-                self.swap(from_token, to_token, amount, retry + 1)
+                yield random.randint(35, 60)
+                return (yield from self.swap(from_token, to_token, amount, retry + 1))
             else:
                 return False
 
+    @rpc_operation('add_liquidity', 'syncswap')
     def add_liquidity(self, from_token: str = 'usdc', to_token: str = 'eth') -> bool:
         address = Web3.to_checksum_address(self.account.address)
         pool_address = self.get_pool_address(from_token, to_token)
 
-        router = self.w3.eth.contract(self.router_address, abi=json.load(open('ABIs/syncswap_router.json')))
+        router = get_contract(self.w3, self.router_address, 'syncswap_router')
 
         amount = int(random.uniform(*LIQUIDITY_AMOUNT) * 10 ** 18)
 
@@ -123,15 +128,14 @@ class SyncSwap:
             ).build_transaction({
                 'from': address,
                 'value': amount,
-                'nonce': self.w3.eth.get_transaction_count(address),
                 'gas': 0,
-                'gasPrice': self.w3.eth.gas_price
+                'gasPrice': gas_oracle.gas_price(self.w3)
             })
 
-            txn['gas'] = self.w3.eth.estimate_gas(txn)
-            signed_swap_txn = self.w3.eth.account.sign_transaction(txn, self.account.key)
-            swap_txn_hash = self.w3.eth.send_raw_transaction(signed_swap_txn.rawTransaction)
-            status = self.w3.eth.wait_for_transaction_receipt(swap_txn_hash, timeout=300).status
+            liquidity_gas = gas_key('syncswap', 'add_liquidity', from_token, to_token)
+            txn['gas'] = gas_model.gas_limit(self.w3, txn, liquidity_gas)
+            swap_txn_hash = send_transaction(self.w3, txn, address, self.account.key, gas_key=liquidity_gas)
+            status = (yield from wait_for_receipt(self.w3, swap_txn_hash, address)).status
 
             if status == 1:
                 trx = f'https://explorer.zksync.io/tx/{swap_txn_hash.hex()}'
@@ -144,32 +148,13 @@ class SyncSwap:
             logging.error(f'{address} | SyncSwap add liquidity error: {err}')
 
     def get_pool_address(self, from_token: str, to_token: str):
-        stables = ['usdc', 'usdt', 'busd']
-        if from_token in stables and to_token in stables:
-            pool_factory_address = self.stable_pool_factory_address
-        else:
-            pool_factory_address = self.classic_pool_factory_address
-
-        classic_pool_factory = self.w3.eth.contract(
-            pool_factory_address,
-            abi=json.load(open('ABIs/syncswap_classic_pool.json'))
-        )
-        pool_address = classic_pool_factory.functions.getPool(
-            Web3.to_checksum_address(TOKENS[from_token]),
-            Web3.to_checksum_address(TOKENS[to_token])
-        ).call()
-
-        return pool_address
-
-    def get_amount_out(self, pool_address: str, from_token_address: str, amount: int):
-        pool = self.w3.eth.contract(
-            Web3.to_checksum_address(pool_address),
-            abi=json.load(open('ABIs/syncswap_pool_data.json'))
-        )
-
-        amount_out = pool.functions.getAmountOut(
-            from_token_address,
-            amount,
-            Web3.to_checksum_address(self.account.address)
-        ).call()
-        return amount_out
+        return pool_cache.get_pool(self.w3, from_token, to_token)
+
+    def get_amount_out(self, from_token: str, to_token: str, amount: int):
+        return quote_engine.syncswap_amount_out(self.w3, from_token, to_token, amount, self.account.address)
+
+    @rpc_operation('quote', 'syncswap')
+    def get_quote(self, from_token: str, to_token: str, amount: int) -> dict:
+        if self.get_pool_address(from_token, to_token) == TOKENS['zero_address']:
+            raise ValueError('Pool not exists')
+        return {'amount_out': self.get_amount_out(from_token, to_token, amount), 'gas': None}
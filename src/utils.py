@@ -1,59 +1,123 @@
-import json
-import time
+import re
 import random
 from web3 import Web3
-
+from web3.exceptions import TimeExhausted
+from concurrent.futures import Future
+
+from src.gas import gas_oracle, gas_model, gas_key
+from src.allowances import allowance_ledger
+from src.rpc_metrics import rpc_operation
+from src.store import get_store
+from src.plan import fleet_plan, new_seed
 from src.account import Account
-from config import SPACEFI_DEPOSIT, SYNCSWAP_DEPOSIT, GAS_THRESHOLD
-
-
-def get_accounts(path: str) -> list[Account]:
-    with open(path, 'r') as keys_file:
-        accounts = [Account(line.replace("\n", "")) for line in keys_file.readlines()]
-    return accounts
+from src import journal
+from src.nonce import nonce_manager
+from src.state import get_state
+from src.receipts import get_watcher
+from src.contracts import get_contract
+from config import SPACEFI_DEPOSIT, SYNCSWAP_DEPOSIT, GAS_THRESHOLD, PIPELINE_APPROVE
 
 
 def save_db(db):
-    with open('data/db.json', 'w') as file:
-        json.dump(db, file, indent='\t')
+    get_store().replace(db)
 
 
 def create_db(accounts: list[Account], transactions: list[int], volumes: bool, bridge: bool) -> dict[str, dict[str, int]]:
     db = dict()
+    seed = new_seed()
+    rng = random.Random(seed)
 
     for account in accounts:
         wallet_info = {
             "bridge": bridge,
             "volumes": volumes,
-            "transactions": random.randint(*transactions),
-            "spacefi_deposit": random.randint(*SPACEFI_DEPOSIT),
-            "syncswap_deposit": random.randint(*SYNCSWAP_DEPOSIT)
+            "transactions": rng.randint(*transactions),
+            "spacefi_deposit": rng.randint(*SPACEFI_DEPOSIT),
+            "syncswap_deposit": rng.randint(*SYNCSWAP_DEPOSIT)
         }
 
         db[account.address] = wallet_info
 
-    with open('data/db.json', 'w') as file:
-        json.dump(db, file, indent='\t')
+    save_db(db)
+    fleet_plan.compile(db, seed)
 
     return db
 
 
-def check_allowance(chain, token, address, router_address, amount, key):
+@rpc_operation('approve')
+def check_allowance(chain, token_address, address, router_address, amount, key, swap_gas: str = None):
+    if allowance_ledger.covers(address, token_address, router_address, amount):
+        allowance_ledger.spend(address, token_address, router_address, amount)
+        return
+
+    token = get_contract(chain, token_address, 'erc20_abi')
     allowance = token.functions.allowance(address, router_address).call()
-    # coef = random.choice([1, random.randint(5, 10)])
-    if allowance < amount:
-        approve_txn = token.functions.approve(router_address, amount).build_transaction({
-            'from': address,
-            'gas': 0,
-            'gasPrice': chain.eth.gas_price,
-            'nonce': chain.eth.get_transaction_count(address)
-        })
-        approve_txn['gas'] = chain.eth.estimate_gas(approve_txn)
-
-        signed_approve_txn = chain.eth.account.sign_transaction(approve_txn, key)
-        approve_txn_hash = chain.eth.send_raw_transaction(signed_approve_txn.rawTransaction)
-        chain.eth.wait_for_transaction_receipt(approve_txn_hash, timeout=300)
-        time.sleep(random.randint(15, 20))
+    allowance_ledger.store(address, token_address, router_address, allowance)
+    if allowance >= amount:
+        allowance_ledger.spend(address, token_address, router_address, amount)
+        return
+
+    approve_amount = allowance_ledger.approve_amount(amount)
+    approve_txn = token.functions.approve(router_address, approve_amount).build_transaction({
+        'from': address,
+        'gas': 0,
+        'gasPrice': gas_oracle.gas_price(chain)
+    })
+    approve_gas = gas_key('approve', token_address, router_address)
+    approve_txn['gas'] = gas_model.gas_limit(chain, approve_txn, approve_gas)
+
+    approve_txn_hash = send_transaction(chain, approve_txn, address, key, 'approve', gas_key=approve_gas)
+    approval = {'hash': approve_txn_hash, 'token': token_address, 'spender': router_address, 'amount': approve_amount, 'spend': amount}
+    if PIPELINE_APPROVE and swap_gas and gas_model.ready(swap_gas):
+        approval['receipt'] = get_watcher(chain.provider.endpoint_uri).watch(approve_txn_hash)
+        return approval
+
+    yield from confirm_approve(chain, approval, address)
+
+
+def confirm_approve(chain, approval: dict, address):
+    if approval is None:
+        return
+
+    if (yield from wait_for_receipt(chain, approval['hash'], address, future=approval.get('receipt'))).status == 1:
+        allowance_ledger.store(address, approval['token'], approval['spender'], approval['amount'])
+    allowance_ledger.spend(address, approval['token'], approval['spender'], approval['spend'])
+
+
+def send_transaction(chain, txn, address, key, kind: str = 'tx', retry: bool = True, gas_key: str = None):
+    txn['nonce'] = nonce_manager.allocate(chain, address)
+    signed_txn = chain.eth.account.sign_transaction(txn, key)
+    journal.record(chain, address, signed_txn.hash, txn['nonce'], kind)
+
+    try:
+        txn_hash = chain.eth.send_raw_transaction(signed_txn.rawTransaction)
+        if gas_key:
+            gas_model.track(txn_hash, gas_key, txn['gas'])
+        return txn_hash
+    except Exception as err:
+        nonce_manager.resync(chain, address)
+        if isinstance(err, ValueError):
+            journal.discard(signed_txn.hash)
+        if retry and re.search(r'nonce (is )?too low', str(err), re.IGNORECASE):
+            return send_transaction(chain, txn, address, key, kind, False, gas_key)
+        raise
+
+
+def wait_for_receipt(chain, txn_hash, address, timeout: int = 300, future: Future = None):
+    if future is None or not future.done():
+        future = get_watcher(chain.provider.endpoint_uri).watch(txn_hash, timeout)
+    yield future
+
+    try:
+        receipt = future.result(0)
+    except TimeExhausted:
+        nonce_manager.resync(chain, address)
+        raise
+
+    journal.resolve(txn_hash, receipt.status)
+    gas_model.observe(txn_hash, receipt)
+    get_state(address).apply(receipt)
+    return receipt
 
 
 def value_for_logs(token: str, amount: int) -> str:
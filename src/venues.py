@@ -0,0 +1,70 @@
+import time
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from src.utils import value_for_logs
+from config import QUOTE_DEADLINE, QUOTE_WORKERS
+
+_executor = None
+_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(QUOTE_WORKERS, thread_name_prefix='quote')
+    return _executor
+
+
+def failed_row(venue: str, error: str, latency: float = None) -> dict:
+    return {'venue': venue, 'amount_out': None, 'gas': None, 'latency': latency, 'error': error}
+
+
+def timed_quote(dapp, from_token: str, to_token: str, amount: int) -> dict:
+    started = time.monotonic()
+    quote = dapp.get_quote(from_token, to_token, amount)
+    return {**quote, 'latency': time.monotonic() - started}
+
+
+def rank(rows: list[dict]) -> list[dict]:
+    return sorted(rows, key=lambda row: (not row['amount_out'], -(row['amount_out'] or 0), row['latency'] or 0))
+
+
+def quote_venues(dapps: dict, from_token: str, to_token: str, amount: int, deadline: float = QUOTE_DEADLINE) -> list[dict]:
+    futures = {
+        get_executor().submit(contextvars.copy_context().run, timed_quote, dapp, from_token, to_token, amount): name
+        for name, dapp in dapps.items()
+    }
+    done, _ = wait(futures, timeout=deadline)
+
+    rows = []
+    for future, name in futures.items():
+        if future not in done:
+            rows.append(failed_row(name, 'timeout', deadline))
+        elif future.exception() is not None:
+            rows.append(failed_row(name, str(future.exception()) or type(future.exception()).__name__))
+        else:
+            rows.append({'venue': name, 'error': None, **future.result()})
+
+    return rank(rows)
+
+
+def best_venue(rows: list[dict]):
+    for row in rows:
+        if row['amount_out']:
+            return row['venue']
+
+
+def format_table(rows: list[dict], to_token: str) -> str:
+    lines = []
+    for i, row in enumerate(rows, 1):
+        latency = f'{row["latency"]:.2f}s' if row['latency'] is not None else '-'
+        if row['amount_out']:
+            gas = row['gas'] if row['gas'] is not None else '-'
+            lines.append(f'{i}. {row["venue"]:<9} {value_for_logs(to_token, row["amount_out"]):>16} | gas: {gas} | {latency}')
+        else:
+            lines.append(f'{i}. {row["venue"]:<9} {"-":>16} | {row["error"]} | {latency}')
+
+    return '\n'.join(lines)
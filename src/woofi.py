@@ -1,12 +1,13 @@
-import time
-import json
 import random
 from web3 import Web3
 from loguru import logger as logging
 
+from src.gas import gas_oracle, gas_model, gas_key
+from src.rpc_metrics import rpc_operation
 from src.account import Account
-from src.utils import check_allowance, value_for_logs
-from config import TOKENS, WOOFI_ROUTER_ADDRESS, GAS_THRESHOLD
+from src.contracts import get_contract
+from src.utils import check_allowance, confirm_approve, send_transaction, wait_for_receipt, value_for_logs
+from config import TOKENS, WOOFI_ROUTER_ADDRESS
 
 
 class WooFi:
@@ -16,8 +17,9 @@ class WooFi:
         self.retries = retries
         self.slippage = slippage
         self.router_address = Web3.to_checksum_address(WOOFI_ROUTER_ADDRESS)
-        self.router = self.w3.eth.contract(self.router_address, abi=json.load(open('ABIs/woofi_router.json')))
+        self.router = get_contract(self.w3, self.router_address, 'woofi_router')
 
+    @rpc_operation('swap', 'woofi')
     def swap(self, from_token: str, to_token: str, amount: int, retry: int = 0) -> bool:
         eth = "0xEeeeeEeeeEeEeeEeEeEeeEEEeeeeEeeeeeeeEEeE"
         address = Web3.to_checksum_address(self.account.address)
@@ -25,32 +27,34 @@ class WooFi:
         to_token_address = Web3.to_checksum_address(TOKENS[to_token] if to_token != 'eth' else eth)
 
         try:
-            if from_token != 'eth':
-                token = self.w3.eth.contract(address=from_token_address, abi=json.load(open('ABIs/erc20_abi.json')))
-                check_allowance(self.w3, token, address, self.router_address, amount, self.account.key)
+            swap_gas = gas_key('woofi', 'swap', from_token, to_token)
+            approval = None
+            try:
+                if from_token != 'eth':
+                    approval = yield from check_allowance(self.w3, from_token_address, address, self.router_address, amount, self.account.key, swap_gas)
 
-            amount_out = self.router.functions.tryQuerySwap(from_token_address, to_token_address, amount).call()
+                amount_out = self.router.functions.tryQuerySwap(from_token_address, to_token_address, amount).call()
 
-            swap_txn = self.router.functions.swap(
-                from_token_address,
-                to_token_address,
-                amount,
-                int(amount_out - (amount_out * self.slippage // 1000)),
-                address,
-                address
-            ).build_transaction({
-                'from': address,
-                'value': amount if from_token == 'eth' else 0,
-                'nonce': self.w3.eth.get_transaction_count(address),
-                'gas': 0,
-                'maxFeePerGas': self.w3.eth.gas_price,
-                'maxPriorityFeePerGas': self.w3.eth.gas_price
-            })
+                swap_txn = self.router.functions.swap(
+                    from_token_address,
+                    to_token_address,
+                    amount,
+                    int(amount_out - (amount_out * self.slippage // 1000)),
+                    address,
+                    address
+                ).build_transaction({
+                    'from': address,
+                    'value': amount if from_token == 'eth' else 0,
+                    'gas': 0,
+                    'maxFeePerGas': gas_oracle.gas_price(self.w3),
+                    'maxPriorityFeePerGas': gas_oracle.gas_price(self.w3)
+                })
 
-            swap_txn['gas'] = random.randint(870000, 950000) if GAS_THRESHOLD < 21 else self.w3.eth.estimate_gas(swap_txn)
-            signed_swap_txn = self.w3.eth.account.sign_transaction(swap_txn, self.account.key)
-            swap_txn_hash = self.w3.eth.send_raw_transaction(signed_swap_txn.rawTransaction)
-            status = self.w3.eth.wait_for_transaction_receipt(swap_txn_hash, timeout=300).status
+                swap_txn['gas'] = gas_model.gas_limit(self.w3, swap_txn, swap_gas)
+                swap_txn_hash = send_transaction(self.w3, swap_txn, address, self.account.key, gas_key=swap_gas)
+                status = (yield from wait_for_receipt(self.w3, swap_txn_hash, address)).status
+            finally:
+                yield from confirm_approve(self.w3, approval, address)
 
             if status == 1:
                 trx = f'https://explorer.zksync.io/tx/{swap_txn_hash.hex()}'
@@ -61,8 +65,8 @@ class WooFi:
                 logging.error(f'{address} | WOOFi swap {retry}/{self.retries} | {value_for_logs(from_token, amount)}'
                               f' -> {to_token}')
                 if retry < self.retries:
-                    time.sleep(random.randint(35, 60))
-                    self.swap(from_token, to_token, amount, retry + 1)
+                    yield random.randint(35, 60)
+                    return (yield from self.swap(from_token, to_token, amount, retry + 1))
                 else:
                     return False
 
@@ -70,7 +74,16 @@ class WooFi:
             logging.error(f'{address} | WOOFi swap {retry}/{self.retries} | {value_for_logs(from_token, amount)}'
                           f' -> {to_token} | {err}')
             if retry < self.retries:
-                time.sleep(random.randint(35, 60))
-                self.swap(from_token, to_token, amount, retry + 1)
+                yield random.randint(35, 60)
+                return (yield from self.swap(from_token, to_token, amount, retry + 1))
             else:
                 return False
+
+    @rpc_operation('quote', 'woofi')
+    def get_quote(self, from_token: str, to_token: str, amount: int) -> dict:
+        eth = "0xEeeeeEeeeEeEeeEeEeEeeEEEeeeeEeeeeeeeEEeE"
+        from_token_address = Web3.to_checksum_address(TOKENS[from_token] if from_token != 'eth' else eth)
+        to_token_address = Web3.to_checksum_address(TOKENS[to_token] if to_token != 'eth' else eth)
+
+        amount_out = self.router.functions.tryQuerySwap(from_token_address, to_token_address, amount).call()
+        return {'amount_out': amount_out, 'gas': None}
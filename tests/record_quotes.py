@@ -0,0 +1,111 @@
+import sys
+import json
+import itertools
+from pathlib import Path
+from web3 import Web3
+
+from src.quotes import STABLE_A
+from src.pools import get_factory
+from src.providers import get_web3
+from src.contracts import get_contract
+from config import TOKENS, SPACEFI_ROUTER_ADDRESS
+
+# Запись котировок с zkSync Era для tests/test_quotes.py: python -m tests.record_quotes [rpc]
+FIXTURES = Path(__file__).parent / 'fixtures' / 'quotes.json'
+SENDER = TOKENS['zero_address']
+STABLE_A_ABI = [{'name': 'A', 'type': 'function', 'stateMutability': 'view', 'inputs': [], 'outputs': [{'name': '', 'type': 'uint256'}]}]
+# Доли резерва входного токена для размера свапа
+SIZES = (10 ** 6, 10 ** 3, 20)
+
+
+def call(fn, block: int, default=None):
+    try:
+        return fn.call(block_identifier=block)
+    except Exception:
+        return default
+
+
+def spacefi_quotes(w3: Web3, block: int, from_token: str, to_token: str) -> list[dict]:
+    router = get_contract(w3, SPACEFI_ROUTER_ADDRESS, 'spacefi_router')
+    factory = get_contract(w3, router.functions.factory().call(), 'spacefi_factory')
+    token_in, token_out = Web3.to_checksum_address(TOKENS[from_token]), Web3.to_checksum_address(TOKENS[to_token])
+
+    pair = factory.functions.getPair(token_in, token_out).call(block_identifier=block)
+    if pair == TOKENS['zero_address']:
+        return []
+
+    contract = get_contract(w3, pair, 'spacefi_pair')
+    token0_in = contract.functions.token0().call(block_identifier=block) == token_in
+    reserves = contract.functions.getReserves().call(block_identifier=block)[:2]
+    reserve_in = reserves[0] if token0_in else reserves[1]
+
+    quotes = []
+    for size in SIZES:
+        amount = reserve_in // size
+        amount_out = call(router.functions.getAmountsOut(amount, [token_in, token_out]), block)
+        if amount and amount_out:
+            quotes.append({
+                'venue': 'spacefi', 'pool': pair, 'block': block, 'pair': [from_token, to_token], 'token0_in': token0_in,
+                'stable': False, 'reserves': reserves, 'fee': None, 'multipliers': [1, 1], 'a': None,
+                'amount_in': amount, 'amount_out': amount_out[-1]
+            })
+    return quotes
+
+
+def syncswap_quotes(w3: Web3, block: int, from_token: str, to_token: str) -> list[dict]:
+    token_in, token_out = Web3.to_checksum_address(TOKENS[from_token]), Web3.to_checksum_address(TOKENS[to_token])
+    factory = get_contract(w3, get_factory(from_token, to_token), 'syncswap_classic_pool')
+
+    pool = factory.functions.getPool(token_in, token_out).call(block_identifier=block)
+    if pool == TOKENS['zero_address']:
+        return []
+
+    contract = get_contract(w3, pool, 'syncswap_pool')
+    stable = contract.functions.poolType().call(block_identifier=block) == 2
+    token0_in = contract.functions.token0().call(block_identifier=block) == token_in
+    reserves = contract.functions.getReserves().call(block_identifier=block)[:2]
+    multipliers = [
+        call(contract.functions.token0PrecisionMultiplier(), block, 1),
+        call(contract.functions.token1PrecisionMultiplier(), block, 1)
+    ]
+    a = call(w3.eth.contract(pool, abi=STABLE_A_ABI).functions.A(), block, STABLE_A) if stable else None
+    fee = factory.functions.getSwapFee(pool, SENDER, token_in, token_out, b'').call(block_identifier=block)
+    reserve_in = reserves[0] if token0_in else reserves[1]
+
+    pool_data = get_contract(w3, pool, 'syncswap_pool_data')
+    quotes = []
+    for size in SIZES:
+        amount = reserve_in // size
+        amount_out = call(pool_data.functions.getAmountOut(token_in, amount, SENDER), block)
+        if amount and amount_out:
+            quotes.append({
+                'venue': 'syncswap', 'pool': pool, 'block': block, 'pair': [from_token, to_token], 'token0_in': token0_in,
+                'stable': stable, 'reserves': reserves, 'fee': fee, 'multipliers': multipliers, 'a': a,
+                'amount_in': amount, 'amount_out': amount_out
+            })
+    return quotes
+
+
+def record(w3: Web3) -> list[dict]:
+    block = w3.eth.block_number
+    symbols = [symbol for symbol in TOKENS if symbol != 'zero_address']
+
+    quotes = []
+    for from_token, to_token in itertools.permutations(symbols, 2):
+        quotes += spacefi_quotes(w3, block, from_token, to_token)
+        quotes += syncswap_quotes(w3, block, from_token, to_token)
+    return quotes
+
+
+def main():
+    w3 = get_web3(*sys.argv[1:2])
+    quotes = record(w3)
+
+    FIXTURES.parent.mkdir(exist_ok=True)
+    with open(FIXTURES, 'w') as file:
+        json.dump(quotes, file, indent=2)
+    print(f'Записано {len(quotes)} котировок в {FIXTURES}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+import time
+
+import pytest
+
+from benchmark import fake_chain
+from src.providers import RoutedHTTPProvider
+
+
+@pytest.fixture(scope='module')
+def chain():
+    return fake_chain.FakeChain(block_time=0.05)
+
+
+def endpoint(chain, latency: float = 0, failure_rate: float = 0) -> str:
+    server = fake_chain.serve(chain, latency, 0, failure_rate)
+    return f'http://127.0.0.1:{server.server_port}'
+
+
+def routed(endpoints: list[str], hedge_delay: float = 0, cooldown: float = 30) -> RoutedHTTPProvider:
+    provider = RoutedHTTPProvider(endpoints, hedge_delay)
+    provider.pool.cooldown = cooldown
+    return provider
+
+
+def test_failover_skips_failing_endpoint(chain):
+    provider = routed([endpoint(chain, failure_rate=1), endpoint(chain)])
+    failing, healthy = provider.pool.endpoints
+
+    assert int(provider.make_request('eth_blockNumber', [])['result'], 16) > 0
+    assert (failing.requests, failing.errors, healthy.requests) == (1, 1, 1)
+    assert failing.down_until > time.monotonic()
+
+    provider.make_request('eth_blockNumber', [])
+    assert (failing.requests, healthy.requests) == (1, 2)
+
+
+def test_batch_request_fails_over(chain):
+    provider = routed([endpoint(chain, failure_rate=1), endpoint(chain)])
+    failing, healthy = provider.pool.endpoints
+
+    assert provider.make_batch_request([('eth_chainId', []), ('eth_blockNumber', [])])[0] == hex(fake_chain.CHAIN_ID)
+    assert (failing.errors, healthy.requests) == (1, 1)
+
+
+def test_all_endpoints_failing_raises(chain):
+    provider = routed([endpoint(chain, failure_rate=1), endpoint(chain, failure_rate=1)])
+
+    with pytest.raises(Exception):
+        provider.make_request('eth_blockNumber', [])
+    assert all(endpoint.errors == 1 for endpoint in provider.pool.endpoints)
+
+
+def test_cooldown_doubles_and_expires(chain):
+    provider = routed([endpoint(chain, failure_rate=1), endpoint(chain)], cooldown=0.2)
+    failing, healthy = provider.pool.endpoints
+
+    provider.pool.failure(failing, 0)
+    provider.pool.failure(failing, 0)
+    assert failing.down_until - time.monotonic() == pytest.approx(0.4, abs=0.05)
+    assert provider.pool.ranked()[0] is healthy
+
+    time.sleep(0.45)
+    assert failing.healthy(time.monotonic())
+    provider.make_request('eth_blockNumber', [])
+    assert failing.failures == 3
+
+
+def test_hedged_read_beats_slow_endpoint(chain):
+    provider = routed([endpoint(chain, latency=1), endpoint(chain)], hedge_delay=0.05)
+    slow, fast = provider.pool.endpoints
+
+    started = time.monotonic()
+    provider.make_request('eth_blockNumber', [])
+    assert time.monotonic() - started < 0.5
+    assert fast.requests == 1
+
+    time.sleep(1)
+    assert provider.pool.ranked()[0] is fast
+    assert slow.latency >= fast.latency
+
+
+def test_broadcast_stays_on_primary(chain):
+    provider = routed([endpoint(chain, latency=0.3), endpoint(chain)], hedge_delay=0.05)
+    primary, other = provider.pool.endpoints
+
+    started = time.monotonic()
+    provider.make_request('eth_getTransactionCount', ['0x' + '11' * 20, 'pending'])
+    assert time.monotonic() - started >= 0.3
+    assert (primary.requests, other.requests) == (1, 0)
@@ -0,0 +1,52 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from src.quotes import classic_amount_out, stable_amount_out, spacefi_amount_out
+
+# Котировки с zkSync Era, записанные tests/record_quotes.py: состояние пула и ответ контракта в одном блоке
+FIXTURES = Path(__file__).parent / 'fixtures' / 'quotes.json'
+QUOTES = json.loads(FIXTURES.read_text()) if FIXTURES.exists() else []
+
+
+def quotes(venue: str, stable: bool = False) -> list:
+    return [
+        pytest.param(quote, id=f'{quote["pool"][:10]}-{"-".join(quote["pair"])}-{quote["amount_in"]}')
+        for quote in QUOTES if quote['venue'] == venue and quote['stable'] == stable
+    ]
+
+
+def reserves_in_out(quote: dict) -> tuple[int, int]:
+    reserve0, reserve1 = quote['reserves']
+    return (reserve0, reserve1) if quote['token0_in'] else (reserve1, reserve0)
+
+
+@pytest.mark.parametrize('quote', quotes('spacefi'))
+def test_spacefi_amount_out(quote):
+    assert spacefi_amount_out(quote['amount_in'], *reserves_in_out(quote)) == quote['amount_out']
+
+
+@pytest.mark.parametrize('quote', quotes('syncswap'))
+def test_classic_amount_out(quote):
+    assert classic_amount_out(quote['fee'], quote['amount_in'], *reserves_in_out(quote)) == quote['amount_out']
+
+
+@pytest.mark.parametrize('quote', quotes('syncswap', True))
+def test_stable_amount_out(quote):
+    amount_out = stable_amount_out(
+        quote['fee'], quote['amount_in'], tuple(quote['reserves']), tuple(quote['multipliers']), quote['token0_in'], quote['a']
+    )
+    assert amount_out == quote['amount_out']
+
+
+def test_spacefi_amount_out_rejects_empty_swaps():
+    with pytest.raises(ValueError):
+        spacefi_amount_out(0, 100, 100)
+    with pytest.raises(ValueError):
+        spacefi_amount_out(1, 0, 100)
+
+
+def test_zero_amount_in():
+    assert classic_amount_out(300, 0, 10 ** 12, 10 ** 12) == 0
+    assert stable_amount_out(40, 0, (10 ** 12, 10 ** 24), (10 ** 12, 1), True) == 0
@@ -0,0 +1,47 @@
+import time
+import pytest
+from concurrent.futures import Future
+from web3.exceptions import TimeExhausted
+
+from benchmark import fake_chain
+from src.receipts import ReceiptWatcher
+from src.scheduler import Scheduler
+
+
+@pytest.fixture(scope='module')
+def url():
+    server = fake_chain.serve(fake_chain.FakeChain(block_time=0.01))
+    return f'http://127.0.0.1:{server.server_port}'
+
+
+def test_watch_expires_after_timeout(url):
+    watcher = ReceiptWatcher(url, poll_interval=0.01)
+    future = watcher.watch('0x' + '11' * 32, timeout=0.1)
+
+    with pytest.raises(TimeExhausted):
+        future.result(2)
+    assert not watcher.pending and not watcher.deadlines
+
+
+def test_scheduler_parks_wallet_on_future():
+    receipt, order = Future(), []
+
+    def parked():
+        order.append('parked')
+        yield receipt
+        order.append(receipt.result())
+
+    def busy():
+        for step in range(3):
+            order.append(step)
+            yield 0
+        receipt.set_result('receipt')
+
+    scheduler = Scheduler(workers=1, stats_interval=60)
+    scheduler.add('parked', parked())
+    scheduler.add('busy', busy(), 0.01)
+    started = time.monotonic()
+    scheduler.run()
+
+    assert order == ['parked', 0, 1, 2, 'receipt']
+    assert time.monotonic() - started < 1